@@ -1,18 +1,34 @@
 import os
 import json
-import yaml
-import markdown
-import requests
 import sys
-from flask import Flask, render_template, jsonify, send_from_directory, abort
-from flask import Flask, render_template_string
-import jinja2
-import shutil
+from flask import Flask, render_template, jsonify, send_from_directory, abort, request, make_response, Response, get_template_attribute
+from flask import stream_with_context, copy_current_request_context, has_request_context
+from werkzeug.utils import redirect
 import time
-import urllib3
-import calendar
+import zlib
+import socket
+import io
+import mmap
+import base64
+import hashlib
+import threading
+import gzip
+import mimetypes
+import re
+import math
+import queue
+import copy
+import contextvars
+try:
+    import brotli
+except ImportError:
+    brotli = None
 from datetime import datetime, timedelta
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from urllib.parse import urlparse
+from markupsafe import escape
+# requests / markdown / Pillow / sqlite3 等较重的模块在首次使用时才导入，缩短冷启动时间
 
 
 
@@ -32,6 +48,7 @@ def load_config():
                 config = json.load(f)
             # Vercel 文件系统只读，不尝试复制
             try:
+                import shutil
                 shutil.copy2(default_config_path, config_path)
             except Exception:
                 pass
@@ -86,8 +103,16 @@ def load_config():
         if key not in config['background']:
             config['background'][key] = value
     
+    # 补全 contact
+    default_contact = {
+        "cv": "", "qq": "", "wechat": "", "bilibili": "",
+        "douyin": "", "xiaohongshu": "", "google_scholar": "", "kaggle": ""
+    }
     if 'contact' not in config:
         config['contact'] = {}
+    for key, value in default_contact.items():
+        if key not in config['contact']:
+            config['contact'][key] = value
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 app = Flask(
@@ -96,125 +121,1192 @@ app = Flask(
 )
 load_config()
 
-# 全局缓存
+# 多用户模式：TENANTS_DIR 下的每个 <名称>.json 是一位用户的配置，字段与 config.json 相同，
+# 未填写的字段继承 config.json；另外可以用 hosts 列出绑定的域名、cache_ttl 指定数据刷新间隔（秒），
+# introduction_file 相对于 TENANTS_DIR，默认为 <名称>.md。
+# 请求按域名（TENANT_ROUTING=host）或路径前缀 /<名称>/（TENANT_ROUTING=path）选择用户，
+# 没有匹配的请求使用 config.json 本身；未设置 TENANTS_DIR 时与单用户模式完全相同
+TENANTS_DIR = os.environ.get('TENANTS_DIR', '')
+TENANT_ROUTING = os.environ.get('TENANT_ROUTING', 'host').lower()
+# 重新扫描配置目录的最短间隔（秒），增删改用户配置无需重启
+TENANTS_RELOAD_INTERVAL = int(os.environ.get('TENANTS_RELOAD_INTERVAL', '30'))
+TENANT_NAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+# 与 config.json 按字段合并（而不是整体替换）的配置项
+TENANT_MERGED_SECTIONS = ('theme', 'background', 'contact')
+
+_tenants = {'configs': {}, 'hosts': {}, 'signature': None, 'revision': 0, 'checked': 0}
+_tenants_lock = threading.Lock()
+_tenant_context = contextvars.ContextVar('tenant', default=None)
+
+# 用户配置 = config.json 的副本 + 用户自己的字段；
+# 自我介绍不继承 config.json 的文件，默认是用户配置目录中的 <名称>.md
+def merge_tenant_config(name, overrides):
+    merged = copy.deepcopy(config)
+    merged['introduction_file'] = f'{name}.md'
+    for key, value in overrides.items():
+        if key in TENANT_MERGED_SECTIONS and isinstance(value, dict):
+            merged[key] = dict(merged.get(key) or {}, **value)
+        else:
+            merged[key] = value
+    return merged
+
+# 路径模式下不能用作用户名的前缀：路由（api、metrics、static 等）、项目目录中可直接访问的文件和目录，
+# 以及静态资源扩展名（带指纹的资源、背景图片变体）；否则用户会遮住这些地址
+def tenant_name_reserved(name):
+    if TENANT_ROUTING != 'path':
+        return False
+    lowered = name.lower()
+    prefixes = {rule.rule.lstrip('/').split('/')[0].lower() for rule in app.url_map.iter_rules()}
+    if lowered in prefixes or lowered in (entry.lower() for entry in os.listdir(BASE_DIR)):
+        return True
+    return os.path.splitext(lowered)[1] in ALLOWED_STATIC_EXTENSIONS
+
+# 扫描用户配置目录；文件列表和修改时间都没有变化时不重新读取，读取失败的文件沿用上一次的配置
+def load_tenants():
+    try:
+        file_names = sorted(f for f in os.listdir(TENANTS_DIR) if f.endswith('.json'))
+        signature = [(f, os.path.getmtime(os.path.join(TENANTS_DIR, f))) for f in file_names]
+    except OSError as e:
+        print(f"读取用户配置目录失败: {e}")
+        return
+    if signature == _tenants['signature']:
+        return
+    
+    configs = {}
+    for file_name in file_names:
+        name = file_name[:-len('.json')]
+        if not TENANT_NAME_PATTERN.match(name):
+            print(f"跳过名称不合法的用户配置: {file_name}")
+            continue
+        if tenant_name_reserved(name):
+            print(f"跳过与路由或静态文件重名的用户配置: {file_name}")
+            continue
+        try:
+            with open(os.path.join(TENANTS_DIR, file_name), 'r', encoding='utf-8') as f:
+                configs[name] = merge_tenant_config(name, json.load(f))
+        except Exception as e:
+            print(f"读取用户配置 {file_name} 失败: {e}")
+            if name in _tenants['configs']:
+                configs[name] = _tenants['configs'][name]
+    hosts = {host.lower(): name for name, tenant_config in configs.items() for host in tenant_config.get('hosts', [])}
+    _tenants.update(configs=configs, hosts=hosts, signature=signature, revision=_tenants['revision'] + 1)
+    print(f"已加载 {len(configs)} 个用户配置")
+
+# 返回 {'configs': {名称: 配置}, 'hosts': {域名: 名称}, 'revision': 版本号}，按需重新扫描目录
+def get_tenants():
+    if TENANTS_DIR and time.time() - _tenants['checked'] >= TENANTS_RELOAD_INTERVAL:
+        with _tenants_lock:
+            if time.time() - _tenants['checked'] >= TENANTS_RELOAD_INTERVAL:
+                load_tenants()
+                _tenants['checked'] = time.time()
+    return _tenants
+
+# 当前请求（或由请求派生的后台任务）所属的用户；单用户模式和未匹配的请求为 None
+def current_tenant():
+    tenant = _tenant_context.get()
+    if tenant is None and has_request_context():
+        tenant = request.environ.get('homepage.tenant')
+    return tenant
+
+# 当前用户的配置，没有用户时为 config.json
+def current_config():
+    tenant = current_tenant()
+    if tenant is not None:
+        tenant_config = get_tenants()['configs'].get(tenant)
+        if tenant_config is not None:
+            return tenant_config
+    return config
+
+# 按用户区分的缓存键；单用户模式下与原来的键相同
+def tenant_key(key):
+    tenant = current_tenant()
+    return f'{key}@{tenant}' if tenant else key
+
+# 包装 func，使其在其他线程中运行时仍属于当前用户（contextvars 不会自动传给新线程）
+def with_tenant(func):
+    tenant = current_tenant()
+    def run(*args, **kwargs):
+        token = _tenant_context.set(tenant)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _tenant_context.reset(token)
+    return run
+
+# WSGI 中间件：按域名或路径前缀确定用户，写入 environ['homepage.tenant']；
+# 路径模式下把前缀移入 SCRIPT_NAME，页面中的相对地址和各个路由都无需改动
+class TenantMiddleware:
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    
+    def __call__(self, environ, start_response):
+        tenants = get_tenants()
+        tenant = None
+        if TENANT_ROUTING == 'path':
+            name, sep, rest = environ.get('PATH_INFO', '').lstrip('/').partition('/')
+            if name in tenants['configs']:
+                script_name = environ.get('SCRIPT_NAME', '') + '/' + name
+                if not sep:
+                    # /<名称> 重定向到 /<名称>/，否则页面中的相对地址会解析到上一级目录
+                    query = environ.get('QUERY_STRING')
+                    return redirect(f"{script_name}/{'?' + query if query else ''}", 301)(environ, start_response)
+                environ['SCRIPT_NAME'] = script_name
+                environ['PATH_INFO'] = '/' + rest
+                tenant = name
+        else:
+            host = (environ.get('HTTP_HOST') or environ.get('SERVER_NAME', '')).split(':')[0].lower()
+            tenant = tenants['hosts'].get(host)
+        environ['homepage.tenant'] = tenant
+        return self.wsgi_app(environ, start_response)
+
+if TENANTS_DIR:
+    app.wsgi_app = TenantMiddleware(app.wsgi_app)
+
+# 本地缓存目录（Vercel 等只读环境下写入失败会被忽略）
+CACHE_DIR = os.environ.get('HOMEPAGE_CACHE_DIR', os.path.join(BASE_DIR, '.cache'))
+
+# 全局缓存（进程内状态；github_info 本身保存在 cache_backend 中）
+# refreshing: 正在后台刷新的用户集合（单用户模式下为 {None}）
 _cache = {
-    'github_info': None,
-    'cache_time': 0
+    'refreshing': set()
 }
 CACHE_TTL = 600
 
-# 创建通用的GitHub API请求函数
-def make_github_request(url, timeout=10):
+# stale-while-revalidate：缓存过期后先返回旧数据，同时在后台刷新
+# 超过 CACHE_TTL + CACHE_MAX_STALENESS 的数据不再使用，改为同步重建
+CACHE_STALE_WHILE_REVALIDATE = os.environ.get('CACHE_STALE_WHILE_REVALIDATE', '1') != '0'
+CACHE_MAX_STALENESS = int(os.environ.get('CACHE_MAX_STALENESS', '86400'))
+# 启动时在后台预热缓存
+CACHE_WARMUP = os.environ.get('CACHE_WARMUP', '1') != '0'
+_refresh_lock = threading.Lock()
+
+# 缓存后端: memory（进程内 LRU）、sqlite（多进程共享的本地文件）、redis（Redis 协议服务）
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory').lower()
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '4096' if TENANTS_DIR else '128'))
+# 进程内缓存的总大小上限（按序列化后的字节数估算，0 表示不限制）；多用户模式下默认 256MB
+CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', str(256 * 1024 * 1024) if TENANTS_DIR else '0'))
+CACHE_SQLITE_PATH = os.environ.get('CACHE_SQLITE_PATH', os.path.join(CACHE_DIR, 'cache.sqlite3'))
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://127.0.0.1:6379/0')
+
+# 缓存值序列化：紧凑 JSON + zlib 压缩
+def dump_cache_value(value):
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+def load_cache_value(data):
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+# 进程内 LRU 缓存，直接保存对象，不做序列化
+class MemoryCacheBackend:
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+    
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at, _ = item
+            if expires_at and expires_at < time.time():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value, ttl=None):
+        # 只有限制总大小时才需要估算大小
+        size = len(json.dumps(value, ensure_ascii=False, separators=(',', ':'))) if self.max_bytes else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, time.time() + ttl if ttl else None, size)
+            self._bytes += size
+            # 按最近最少使用的顺序淘汰，至少保留刚写入的一项
+            while len(self._data) > 1 and (len(self._data) > self.max_entries
+                                           or (self.max_bytes and self._bytes > self.max_bytes)):
+                self._remove(next(iter(self._data)))
+                metrics.inc('homepage_cache_evictions_total', cache='memory')
+    
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+# SQLite 文件缓存，同一台机器上的多个 worker 进程共享
+class SQLiteCacheBackend:
+    def __init__(self, path=CACHE_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)')
+        conn.commit()
+    
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            import sqlite3
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+    
+    def get(self, key):
+        row = self._connect().execute('SELECT value, expires_at FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] and row[1] < time.time():
+            self.delete(key)
+            return None
+        return load_cache_value(row[0])
+    
+    def set(self, key, value, ttl=None):
+        conn = self._connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, dump_cache_value(value), time.time() + ttl if ttl else None)
+        )
+        conn.commit()
+    
+    def delete(self, key):
+        conn = self._connect()
+        conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+        conn.commit()
+
+# 极简 Redis 协议（RESP）客户端，只用到 GET / SET PX / DEL，无需额外依赖
+class RedisCacheBackend:
+    def __init__(self, url=CACHE_REDIS_URL, timeout=2):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile('rb')
+        # AUTH / SELECT 失败时关闭连接，下次请求重新建立，避免复用未认证的连接
+        try:
+            if self.password:
+                self._call('AUTH', self.password)
+            if self.db:
+                self._call('SELECT', str(self.db))
+        except Exception:
+            self._close()
+            raise
+    
+    def _close(self):
+        try:
+            if self._sock:
+                self._sock.close()
+        finally:
+            self._sock = None
+            self._reader = None
+    
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError('Redis 连接已关闭')
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b'+':
+            return payload.decode('utf-8')
+        if prefix == b'-':
+            raise RuntimeError(payload.decode('utf-8'))
+        if prefix == b':':
+            return int(payload)
+        if prefix == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if prefix == b'*':
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RuntimeError(f'无法解析的 Redis 响应: {line!r}')
+    
+    def _call(self, *args):
+        parts = [f'*{len(args)}\r\n'.encode('utf-8')]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode('utf-8')
+            parts.append(f'${len(arg)}\r\n'.encode('utf-8') + arg + b'\r\n')
+        self._sock.sendall(b''.join(parts))
+        return self._read_reply()
+    
+    def execute(self, *args):
+        with self._lock:
+            # 连接断开时重连一次
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._call(*args)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+    
+    def get(self, key):
+        data = self.execute('GET', key)
+        return load_cache_value(data) if data is not None else None
+    
+    def set(self, key, value, ttl=None):
+        if ttl:
+            self.execute('SET', key, dump_cache_value(value), 'PX', str(int(ttl * 1000)))
+        else:
+            self.execute('SET', key, dump_cache_value(value))
+    
+    def delete(self, key):
+        self.execute('DEL', key)
+
+# 包装后端：后端出错时打印日志并当作未命中，不影响页面渲染
+class SafeCache:
+    def __init__(self, backend):
+        self.backend = backend
+    
+    def get(self, key):
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            print(f"读取缓存失败 ({key}): {e}")
+            return None
+    
+    def set(self, key, value, ttl=None):
+        try:
+            self.backend.set(key, value, ttl)
+        except Exception as e:
+            print(f"写入缓存失败 ({key}): {e}")
+    
+    def delete(self, key):
+        try:
+            self.backend.delete(key)
+        except Exception as e:
+            print(f"删除缓存失败 ({key}): {e}")
+
+# 根据配置创建缓存后端，初始化失败时退回进程内缓存
+def create_cache_backend(name=CACHE_BACKEND):
     try:
-        headers = {'Accept': 'application/vnd.github.v3+json'}
-        github_token = ''
-        
-        # 优先级: 环境变量 > github_token.txt > config.json
-        github_token = os.environ.get('GH_TOKEN', '') or os.environ.get('GITHUB_TOKEN', '')
+        if name == 'sqlite':
+            return SafeCache(SQLiteCacheBackend())
+        if name == 'redis':
+            return SafeCache(RedisCacheBackend())
+    except Exception as e:
+        print(f"初始化 {name} 缓存后端失败，改用进程内缓存: {e}")
+    return SafeCache(MemoryCacheBackend())
+
+cache_backend = create_cache_backend()
+
+# 运行指标：GitHub 请求延迟/状态码/字节数、缓存命中、渲染耗时等，以 Prometheus 文本格式在 /metrics 暴露。
+# 指标包含用户名和配额信息，默认关闭；设置 METRICS_TOKEN 后抓取时需要携带 Authorization: Bearer <token>
+METRICS_ENABLED = os.environ.get('METRICS', '0') == '1'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+METRICS_RENDER_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+# 进程内指标注册表：counter / gauge / histogram，按标签组合分别计数，线程安全
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = OrderedDict()
+
+    def define(self, name, kind, help_text, labels=(), buckets=None):
+        self._metrics[name] = {'kind': kind, 'help': help_text, 'labels': tuple(labels),
+                               'buckets': tuple(buckets or ()), 'values': {}}
+
+    def _key(self, metric, labels):
+        return tuple(str(labels.get(label, '')) for label in metric['labels'])
+
+    def inc(self, name, value=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        metric = self._metrics[name]
+        key = self._key(metric, labels)
+        with self._lock:
+            metric['values'][key] = metric['values'].get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        metric = self._metrics[name]
+        with self._lock:
+            metric['values'][self._key(metric, labels)] = value
+
+    def observe(self, name, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        metric = self._metrics[name]
+        key = self._key(metric, labels)
+        with self._lock:
+            state = metric['values'].get(key)
+            if state is None:
+                state = metric['values'][key] = {'buckets': [0] * len(metric['buckets']), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(metric['buckets']):
+                if value <= bound:
+                    state['buckets'][i] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    @staticmethod
+    def _format_labels(names, values, extra=None):
+        pairs = list(zip(names, values)) + ([extra] if extra else [])
+        if not pairs:
+            return ''
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+        return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+    # 输出 Prometheus 文本格式（0.0.4）
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, metric in self._metrics.items():
+                lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['kind']}")
+                for key, value in sorted(metric['values'].items()):
+                    if metric['kind'] != 'histogram':
+                        lines.append(f"{name}{self._format_labels(metric['labels'], key)} {value:g}")
+                        continue
+                    # 直方图的桶是累计的（observe 时已对所有不小于观测值的上界计数）
+                    for bound, count in zip(metric['buckets'], value['buckets']):
+                        labels = self._format_labels(metric['labels'], key, ('le', f'{bound:g}'))
+                        lines.append(f"{name}_bucket{labels} {count}")
+                    labels = self._format_labels(metric['labels'], key, ('le', '+Inf'))
+                    lines.append(f"{name}_bucket{labels} {value['count']}")
+                    lines.append(f"{name}_sum{self._format_labels(metric['labels'], key)} {value['sum']:.6f}")
+                    lines.append(f"{name}_count{self._format_labels(metric['labels'], key)} {value['count']}")
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+metrics.define('homepage_github_request_duration_seconds', 'histogram',
+               'GitHub 上游请求耗时', labels=('family',), buckets=METRICS_LATENCY_BUCKETS)
+metrics.define('homepage_github_requests_total', 'counter',
+               'GitHub 上游请求数（按接口类别和状态码）', labels=('family', 'status'))
+metrics.define('homepage_github_response_bytes_total', 'counter',
+               'GitHub 上游响应体字节数', labels=('family',))
+metrics.define('homepage_github_rate_limit_remaining', 'gauge',
+               'GitHub 剩余配额', labels=('resource',))
+metrics.define('homepage_github_rate_limit_limit', 'gauge',
+               'GitHub 配额上限', labels=('resource',))
+metrics.define('homepage_cache_requests_total', 'counter',
+               '缓存读取次数（hit / stale / miss）', labels=('cache', 'result'))
+metrics.define('homepage_cache_evictions_total', 'counter',
+               '因容量或大小上限被淘汰的缓存项', labels=('cache',))
+metrics.define('homepage_tenants', 'gauge', '已加载的用户配置数')
+metrics.define('homepage_section_build_duration_seconds', 'histogram',
+               'github_info 各部分的构建耗时', labels=('section',), buckets=METRICS_LATENCY_BUCKETS)
+metrics.define('homepage_render_duration_seconds', 'histogram',
+               '首页渲染耗时（template: 模板渲染，optimize: HTML 压缩，stream: 流式渲染）', labels=('stage',),
+               buckets=METRICS_RENDER_BUCKETS)
+
+# 按 URL 归类 GitHub 接口，避免把用户名、仓库名作为标签导致基数膨胀
+GITHUB_ENDPOINT_FAMILIES = [
+    (re.compile(r'^https://raw\.githubusercontent\.com/'), 'readme'),
+    (re.compile(r'^https://api\.github\.com/users/[^/?]+/?(\?|$)'), 'user'),
+    (re.compile(r'^https://api\.github\.com/users/[^/]+/repos'), 'repos'),
+    (re.compile(r'^https://api\.github\.com/users/[^/]+/events'), 'events'),
+    (re.compile(r'^https://api\.github\.com/repos/[^/]+/[^/]+/commits'), 'commits'),
+    (re.compile(r'^https://api\.github\.com/repos/[^/]+/[^/]+/languages'), 'languages'),
+    (re.compile(r'^https://api\.github\.com/repos/[^/]+/[^/]+/stargazers'), 'stargazers'),
+]
+
+def github_endpoint_family(url):
+    for pattern, family in GITHUB_ENDPOINT_FAMILIES:
+        if pattern.match(url):
+            return family
+    return 'other'
+
+# 记录一次上游请求；response 为 None 表示请求异常
+def record_github_request(url, started, response, family=None):
+    family = family or github_endpoint_family(url)
+    metrics.observe('homepage_github_request_duration_seconds', time.perf_counter() - started, family=family)
+    status = response.status_code if response is not None else 'error'
+    metrics.inc('homepage_github_requests_total', family=family, status=status)
+    if response is not None:
+        metrics.inc('homepage_github_response_bytes_total', len(response.content or b''), family=family)
+
+# GitHub 请求并发上限（<=1 时退化为顺序执行）
+GITHUB_MAX_WORKERS = int(os.environ.get('GITHUB_MAX_WORKERS', '8'))
+_github_semaphore = threading.BoundedSemaphore(max(GITHUB_MAX_WORKERS, 1))
+
+# 并发执行 func(item)，结果顺序与 items 一致
+def parallel_map(func, items):
+    items = list(items)
+    if GITHUB_MAX_WORKERS <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    # 工作线程继承当前用户
+    with ThreadPoolExecutor(max_workers=min(GITHUB_MAX_WORKERS, len(items)),
+                            initializer=_tenant_context.set, initargs=(current_tenant(),)) as executor:
+        return list(executor.map(func, items))
+
+# 并发执行多个相互独立的任务，tasks 为 (func, args) 列表，按顺序返回结果
+def run_concurrently(tasks):
+    return parallel_map(lambda task: task[0](*task[1]), tasks)
+
+# GitHub 连接池大小与重试策略
+GITHUB_POOL_SIZE = int(os.environ.get('GITHUB_POOL_SIZE', str(max(GITHUB_MAX_WORKERS, 10))))
+GITHUB_RETRIES = int(os.environ.get('GITHUB_RETRIES', '2'))
+GITHUB_RETRY_BACKOFF = float(os.environ.get('GITHUB_RETRY_BACKOFF', '0.5'))
+
+_github_session = None
+_github_token = None
+_github_client_lock = threading.Lock()
+
+# 解析 GitHub Token，只在第一次调用时读取，之后使用缓存
+def get_github_token():
+    global _github_token
+    if _github_token is None:
+        with _github_client_lock:
+            if _github_token is None:
+                # 优先级: 环境变量 > github_token.txt > config.json
+                github_token = os.environ.get('GH_TOKEN', '') or os.environ.get('GITHUB_TOKEN', '')
+                
+                if not github_token:
+                    token_file = os.path.join(BASE_DIR, 'github_token.txt')
+                    try:
+                        if os.path.exists(token_file):
+                            with open(token_file, 'r', encoding='utf-8') as f:
+                                github_token = f.read().strip().replace('"', '').replace("'", '')
+                        else:
+                            github_token = config.get('github_token', '')
+                    except Exception:
+                        github_token = config.get('github_token', '')
+                _github_token = github_token
+    return _github_token
+
+# 获取共享的 HTTP 会话（keep-alive 连接池 + 自动重试），所有 GitHub 请求都通过它发出
+def get_github_session():
+    global _github_session
+    if _github_session is None:
+        with _github_client_lock:
+            if _github_session is None:
+                import requests
+                import urllib3
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+                
+                retry = Retry(
+                    total=GITHUB_RETRIES,
+                    backoff_factor=GITHUB_RETRY_BACKOFF,
+                    status_forcelist=(500, 502, 503, 504),
+                    allowed_methods=frozenset(['GET', 'HEAD']),
+                    raise_on_status=False
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=GITHUB_POOL_SIZE,
+                    max_retries=retry
+                )
+                session = requests.Session()
+                session.verify = False
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _github_session = session
+    return _github_session
+
+# GitHub 条件请求缓存：按 URL 保存 ETag / Last-Modified 和响应体，304 时直接复用
+GITHUB_HTTP_CACHE = os.environ.get('GITHUB_HTTP_CACHE', '1') != '0'
+HTTP_CACHE_DIR = os.path.join(CACHE_DIR, 'http')
+# 内存中最多保留的条目数，超出后淘汰最久未用的（磁盘上的副本仍在，下次从磁盘读取）
+HTTP_CACHE_MAX_ENTRIES = int(os.environ.get('HTTP_CACHE_MAX_ENTRIES', '4096'))
+_http_cache = OrderedDict()
+_http_cache_lock = threading.Lock()
+
+# 由缓存内容构造的响应对象，接口与 requests.Response 常用部分一致
+class CachedResponse:
+    def __init__(self, entry):
+        self.status_code = 200
+        self.text = entry['body']
+        self.content = entry['body'].encode('utf-8')
+        self.headers = entry.get('headers', {})
+        self.from_cache = True
+    
+    def json(self):
+        return json.loads(self.text)
+
+def _http_cache_path(cache_key):
+    return os.path.join(HTTP_CACHE_DIR, hashlib.sha256(cache_key.encode('utf-8')).hexdigest() + '.json')
+
+def _http_cache_remember(cache_key, entry):
+    with _http_cache_lock:
+        _http_cache[cache_key] = entry
+        _http_cache.move_to_end(cache_key)
+        while len(_http_cache) > HTTP_CACHE_MAX_ENTRIES:
+            _http_cache.popitem(last=False)
+            metrics.inc('homepage_cache_evictions_total', cache='http')
+
+def _http_cache_get(cache_key):
+    with _http_cache_lock:
+        if cache_key in _http_cache:
+            _http_cache.move_to_end(cache_key)
+            return _http_cache[cache_key]
+    entry = None
+    try:
+        with open(_http_cache_path(cache_key), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except Exception:
+        pass
+    _http_cache_remember(cache_key, entry)
+    return entry
+
+def _http_cache_put(cache_key, response):
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if not etag and not last_modified:
+        return
+    entry = {
+        'url': cache_key,
+        'etag': etag,
+        'last_modified': last_modified,
+        'headers': {k: v for k, v in response.headers.items() if k.lower() in ('etag', 'last-modified', 'content-type')},
+        'body': response.text
+    }
+    _http_cache_remember(cache_key, entry)
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        path = _http_cache_path(cache_key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"写入 HTTP 缓存失败: {e}")
+
+# 单飞（single-flight）请求合并：同一个 key 同时只执行一次，并发的调用者等待并共享结果
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    def do(self, key, func, *args):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = {'event': threading.Event(), 'result': None, 'error': None}
+                self._calls[key] = call
+        
+        if not is_leader:
+            call['event'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
         
-        if not github_token:
-            token_file = os.path.join(BASE_DIR, 'github_token.txt')
-            try:
-                if os.path.exists(token_file):
-                    with open(token_file, 'r', encoding='utf-8') as f:
-                        github_token = f.read().strip().replace('"', '').replace("'", '')
+        try:
+            call['result'] = func(*args)
+            return call['result']
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call['event'].set()
+
+_request_flight = SingleFlight()
+
+# 请求优先级：配额不足时先放弃低优先级请求（数值越大优先级越低）
+PRIORITY_HIGH = 0    # 用户信息、仓库列表
+PRIORITY_NORMAL = 1  # README、语言、活动数据
+PRIORITY_LOW = 2     # Star History
+# 剩余配额不高于该值时，对应优先级的请求会被推迟（改用缓存或跳过）
+RATE_LIMIT_RESERVES = {
+    PRIORITY_HIGH: 0,
+    PRIORITY_NORMAL: int(os.environ.get('RATE_LIMIT_RESERVE_NORMAL', '20')),
+    PRIORITY_LOW: int(os.environ.get('RATE_LIMIT_RESERVE_LOW', '100'))
+}
+# 触发二级限流但没有 Retry-After 时的退避时间（秒，指数增长）
+RATE_LIMIT_BACKOFF_MIN = 60
+RATE_LIMIT_BACKOFF_MAX = 900
+
+# 仓库已删除（404）或为空（409）时接口返回的状态码，与 200 一样视为成功（没有数据），其他状态码视为获取失败
+GITHUB_NO_DATA_STATUSES = (200, 404, 409)
+
+# 未真正发出请求或请求失败时返回的响应对象
+class MockResponse:
+    def __init__(self, status_code=500, text=''):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.headers = {}
+
+# 解析 Retry-After：秒数或 HTTP 日期，返回需要等待的秒数，无法解析时返回 None
+def parse_retry_after(value, now):
+    value = (value or '').strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(parsedate_to_datetime(value).timestamp() - now, 0)
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+# 403/429 是否由限流引起（而不是无权访问等普通错误）：429、带 Retry-After、配额耗尽或响应体提到 rate limit
+def is_rate_limited(response, headers, remaining):
+    if response.status_code == 429 or headers.get('Retry-After') or remaining == 0:
+        return True
+    return 'rate limit' in (getattr(response, 'text', '') or '').lower()
+
+# 根据响应头跟踪 GitHub 配额（X-RateLimit-* / Retry-After），决定是否放行请求
+# 限流按资源（core / graphql 等）分别暂停，某一类接口被限流不影响其他接口
+class RateLimitTracker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resources = {}
+        self._blocked_until = {}
+        self._backoff = {}
+    
+    # 判断某个优先级的请求是否可以发出；放行时预先扣减一次配额
+    def acquire(self, resource, priority):
+        now = time.time()
+        with self._lock:
+            if now < self._blocked_until.get(resource, 0):
+                return False
+            info = self._resources.get(resource)
+            if info and now < info['reset']:
+                if info['remaining'] <= RATE_LIMIT_RESERVES.get(priority, 0):
+                    return False
+                info['remaining'] -= 1
+            return True
+    
+    def update(self, response, resource):
+        headers = response.headers or {}
+        now = time.time()
+        with self._lock:
+            if 'X-RateLimit-Remaining' in headers:
+                resource = headers.get('X-RateLimit-Resource', resource)
+                self._resources[resource] = {
+                    'limit': int(headers.get('X-RateLimit-Limit', 0)),
+                    'remaining': int(headers['X-RateLimit-Remaining']),
+                    'reset': float(headers.get('X-RateLimit-Reset', now + 3600))
+                }
+            
+            info = self._resources.get(resource)
+            if response.status_code in (403, 429) and is_rate_limited(response, headers, info and info['remaining']):
+                retry_after = parse_retry_after(headers.get('Retry-After'), now)
+                if retry_after is not None:
+                    self._blocked_until[resource] = now + retry_after
+                elif info and info['remaining'] == 0:
+                    self._blocked_until[resource] = info['reset']
                 else:
-                    github_token = config.get('github_token', '')
-            except Exception:
-                github_token = config.get('github_token', '')
+                    # 二级限流：指数退避
+                    backoff = min(max(self._backoff.get(resource, 0) * 2, RATE_LIMIT_BACKOFF_MIN), RATE_LIMIT_BACKOFF_MAX)
+                    self._backoff[resource] = backoff
+                    self._blocked_until[resource] = now + backoff
+                blocked_until = datetime.fromtimestamp(self._blocked_until[resource]).strftime('%H:%M:%S')
+                print(f"GitHub 限流（{resource}），暂停请求至 {blocked_until}")
+            elif response.status_code < 400:
+                self._backoff.pop(resource, None)
+    
+    def status(self):
+        now = time.time()
+        with self._lock:
+            return {
+                'resources': {name: dict(info) for name, info in self._resources.items()},
+                'blocked_until': {name: until for name, until in self._blocked_until.items() if until > now}
+            }
+
+rate_limiter = RateLimitTracker()
+
+# 当前 GitHub 配额状态，供调用方决定是否发起可选请求
+def get_rate_limit_status():
+    return rate_limiter.status()
+
+# 实际发出请求：附带上次的 ETag / Last-Modified 发起条件请求，304 不消耗 API 配额
+def _fetch_github_url(url, headers, timeout, cache_key, priority, http_cache=True):
+    use_cache = GITHUB_HTTP_CACHE and http_cache
+    cached = _http_cache_get(cache_key) if use_cache else None
+    
+    # 只有 api.github.com 计入配额；配额不足时优先返回上次缓存的数据
+    is_api = url.startswith('https://api.github.com/')
+    if is_api and not rate_limiter.acquire('core', priority):
+        if cached:
+            print(f"GitHub 配额不足，使用缓存数据: {url}")
+            return CachedResponse(cached)
+        print(f"GitHub 配额不足，跳过请求: {url}")
+        return MockResponse(429, 'rate limit reserve reached')
+    
+    if cached:
+        headers = dict(headers)
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    
+    # 限制同时发往 GitHub 的请求数
+    started = time.perf_counter()
+    try:
+        with _github_semaphore:
+            response = get_github_session().get(url, headers=headers, timeout=timeout)
+        # 立即读取响应体，响应对象可能被多个等待者共享
+        response.content
+    except Exception:
+        record_github_request(url, started, None)
+        raise
+    record_github_request(url, started, response)
+    if is_api:
+        rate_limiter.update(response, 'core')
+    
+    if response.status_code == 304 and cached:
+        return CachedResponse(cached)
+    if response.status_code == 200 and use_cache:
+        _http_cache_put(cache_key, response)
+    return response
+
+# 创建通用的GitHub API请求函数
+# accept 为 None 时不发送 Accept 头；auth=False 时不附带 Token（如 raw.githubusercontent.com）
+# priority 决定配额紧张时的取舍；对同一 URL 的并发请求会被合并为一次上游调用
+# http_cache=False 时不读写条件请求缓存，用于每次都不同、不会再次请求的 URL（如带 since 参数的增量请求）
+def make_github_request(url, timeout=10, accept='application/vnd.github.v3+json', auth=True, priority=PRIORITY_NORMAL,
+                        http_cache=True):
+    try:
+        headers = {}
+        if accept:
+            headers['Accept'] = accept
         
+        github_token = get_github_token() if auth else ''
         if github_token:
             headers['Authorization'] = f'token {github_token}'
         
-        response = requests.get(url, headers=headers, timeout=timeout, verify=False)
-        return response
+        cache_key = f"{url}|{accept or ''}|{'auth' if github_token else 'anon'}"
+        return _request_flight.do(cache_key, _fetch_github_url, url, headers, timeout, cache_key, priority, http_cache)
     except Exception as e:
         print(f"GitHub API 请求异常: {e}")
-        class MockResponse:
-            def __init__(self):
-                self.status_code = 500
-                self.text = str(e)
-        return MockResponse()
+        return MockResponse(500, str(e))
 
-# 从 GitHub API 获取用户信息
-def get_github_user_info():
-    print("开始获取GitHub用户信息")
-    github_url = config.get('github_url', 'https://github.com/example')
-    username = github_url.rstrip('/').split('/')[-1]
-    print(f"配置的GitHub URL: {github_url}")
-    print(f"提取的用户名: {username}")
+# 数据源: rest（默认，逐仓库调用 REST API）或 graphql（批量查询，需要 Token）
+# 两种数据源写入同一组分段缓存，仓库列表都只取最近推送的 100 个仓库；
+# 注意活动数据的口径不同：REST 统计 PushEvent 和前5个仓库的提交，GraphQL 使用贡献日历
+# （包含提交、Issue、PR、Review 等所有公开贡献），两者的数值不能直接比较
+GITHUB_DATA_SOURCE = os.environ.get('GITHUB_DATA_SOURCE', 'rest').lower()
+GITHUB_GRAPHQL_URL = os.environ.get('GITHUB_GRAPHQL_URL', 'https://api.github.com/graphql')
+GRAPHQL_REPOS_PER_PAGE = int(os.environ.get('GRAPHQL_REPOS_PER_PAGE', '50'))
+GRAPHQL_LANGUAGES_PER_REPO = int(os.environ.get('GRAPHQL_LANGUAGES_PER_REPO', '20'))
+# 与 REST 模式的 /users/{username}/repos?per_page=100 一致
+GRAPHQL_MAX_REPOS = 100
+
+# 一次查询按需取用户资料、贡献日历，以及每个仓库的语言字节数和 star 时间（只取过期分段需要的字段）
+GITHUB_GRAPHQL_QUERY = """
+query($login: String!, $cursor: String, $repoCount: Int!, $langCount: Int!, $withProfile: Boolean!,
+      $withCalendar: Boolean!, $withRepos: Boolean!, $withLanguages: Boolean!, $withStars: Boolean!) {
+  user(login: $login) {
+    login
+    name @include(if: $withProfile)
+    avatarUrl @include(if: $withProfile)
+    contributionsCollection @include(if: $withCalendar) {
+      contributionCalendar {
+        weeks { contributionDays { date contributionCount } }
+      }
+    }
+    repositories(first: $repoCount, after: $cursor, ownerAffiliations: OWNER,
+                 orderBy: {field: PUSHED_AT, direction: DESC}) @include(if: $withRepos) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        description
+        url
+        stargazerCount
+        pushedAt
+        createdAt
+        isFork
+        primaryLanguage { name }
+        languages(first: $langCount, orderBy: {field: SIZE, direction: DESC}) @include(if: $withLanguages) {
+          edges { size node { name } }
+        }
+        stargazers(first: 100, orderBy: {field: STARRED_AT, direction: ASC}) @include(if: $withStars) {
+          edges { starredAt }
+        }
+      }
+    }
+  }
+}
+"""
 
+# 发送 GraphQL 请求，返回 data 字段；出错时抛出异常
+def make_github_graphql_request(query, variables, timeout=20):
+    headers = {}
+    github_token = get_github_token()
+    if github_token:
+        headers['Authorization'] = f'bearer {github_token}'
+    
+    if not rate_limiter.acquire('graphql', PRIORITY_HIGH):
+        raise RuntimeError("GraphQL 配额不足")
+    
+    started = time.perf_counter()
     try:
-        print(f"准备请求GitHub API: https://api.github.com/users/{username}")
-        
-        # 获取用户信息
-        user_response = make_github_request(f'https://api.github.com/users/{username}')
-        print(f"GitHub API响应状态码: {user_response.status_code}")
-
-        if user_response.status_code == 200:
-            user_data = user_response.json()
-            print(f"成功获取用户数据: {user_data.get('name')}, {user_data.get('login')}")
-
-            # 获取用户的仓库信息
-            repos_response = make_github_request(f'https://api.github.com/users/{username}/repos?sort=pushed&per_page=100')
-            if repos_response.status_code == 200:
-                repos = repos_response.json()
-
-                # 获取总仓库数和总 stars 数
-                total_repos = len(repos)
-                total_stars = sum(repo.get('stargazers_count', 0) for repo in repos)
-
-                # 获取同名仓库的 README
-                readme_content = get_readme_content(username)
-
-                # 排序规则：1. stargazers_count（star数）降序  2. pushed_at（最后推送时间）降序
-                sorted_repos = sorted(
-                    repos,
-                    key=lambda x: (
-                        x.get('stargazers_count', 0),  # 第一排序维度：star数
-                        x.get('pushed_at', '')         # 第二排序维度：更新时间
-                    ),
-                    reverse=True  # 降序排列（star多的在前，同star则时间新的在前）
-                )
-                # 取排序后的前5个仓库作为展示的最近仓库
-                recent_repos = sorted_repos[:5]
-
-                # 获取用户的活动数据（过去12个月的提交统计）
-                # 传递排序后的仓库列表，保持逻辑一致
-                activity_data = get_github_activity_data(username, sorted_repos)
-
-                # 分析用户的技术栈
-                tech_stack = analyze_tech_stack(sorted_repos)
-
-                # 获取真实语言分布数据（用于 GitHub Stats 饼图）
-                language_distribution = get_language_distribution(username, sorted_repos)
-
-                # 获取 Star History 数据
-                star_history = get_star_history(username, repos)
-
-                return {
-                    "avatar_url": user_data.get('avatar_url'),
-                    "name": user_data.get('name') or username,
-                    "bio": config.get('bio', 'Python Developer'),  # 使用配置文件中的bio
-                    "total_repos": total_repos,
-                    "total_stars": total_stars,
-                    "readme_content": readme_content,
-                    "recent_repos": recent_repos,  # 使用排序后的仓库列表
-                    "activity_data": activity_data,
-                    "tech_stack": tech_stack,
-                    "language_distribution": language_distribution,
-                    "star_history": star_history
-                }
-    except Exception as e:
-        print(f"GitHub API调用异常: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        with _github_semaphore:
+            response = get_github_session().post(
+                GITHUB_GRAPHQL_URL,
+                json={'query': query, 'variables': variables},
+                headers=headers,
+                timeout=timeout
+            )
+    except Exception:
+        record_github_request(GITHUB_GRAPHQL_URL, started, None, 'graphql')
+        raise
+    record_github_request(GITHUB_GRAPHQL_URL, started, response, 'graphql')
+    rate_limiter.update(response, 'graphql')
+    if response.status_code != 200:
+        raise RuntimeError(f"GraphQL 请求失败，状态码: {response.status_code}")
     
-    # 如果获取失败，返回默认值
+    payload = response.json()
+    if payload.get('errors'):
+        raise RuntimeError(f"GraphQL 错误: {payload['errors'][0].get('message')}")
+    return payload['data']
+
+# 各分段需要的 GraphQL 字段
+GRAPHQL_SECTION_FIELDS = {
+    'recent_repos': ('withProfile', 'withRepos'),
+    'activity_data': ('withCalendar',),
+    'language_distribution': ('withRepos', 'withLanguages'),
+    'star_history': ('withRepos', 'withStars')
+}
+
+# 通过 GraphQL 一次性构建若干分段，返回 {分段名: 值}，结构与 REST 模式的各分段一致；失败时抛出异常
+def fetch_github_sections_graphql(username, names):
+    fields = {field for name in names for field in GRAPHQL_SECTION_FIELDS[name]}
+    
+    # 分页获取最近推送的仓库，首个查询附带用户资料和贡献日历
+    user_data = None
+    nodes = []
+    cursor = None
+    while True:
+        first_page = user_data is None
+        data = make_github_graphql_request(GITHUB_GRAPHQL_QUERY, {
+            'login': username,
+            'cursor': cursor,
+            'repoCount': min(GRAPHQL_REPOS_PER_PAGE, GRAPHQL_MAX_REPOS - len(nodes)),
+            'langCount': GRAPHQL_LANGUAGES_PER_REPO,
+            'withProfile': first_page and 'withProfile' in fields,
+            'withCalendar': first_page and 'withCalendar' in fields,
+            'withRepos': 'withRepos' in fields,
+            'withLanguages': 'withLanguages' in fields,
+            'withStars': 'withStars' in fields
+        })
+        user = data.get('user')
+        if not user:
+            raise RuntimeError(f"GraphQL 未找到用户: {username}")
+        if first_page:
+            user_data = user
+        repositories = user.get('repositories')
+        if not repositories:
+            break
+        nodes.extend(repositories['nodes'])
+        if not repositories['pageInfo']['hasNextPage'] or len(nodes) >= GRAPHQL_MAX_REPOS:
+            break
+        cursor = repositories['pageInfo']['endCursor']
+    
+    # 转换为 REST API 的仓库字段，模板和排序逻辑无需改动
+    repos = []
+    for node in nodes:
+        repos.append({
+            'name': node['name'],
+            'description': node.get('description'),
+            'html_url': node['url'],
+            'language': (node.get('primaryLanguage') or {}).get('name'),
+            # 技术栈分析会按 languages_url 补充语言数据
+            'languages_url': f"https://api.github.com/repos/{username}/{node['name']}/languages",
+            'stargazers_count': node.get('stargazerCount', 0),
+            'pushed_at': node.get('pushedAt'),
+            'created_at': node.get('createdAt'),
+            'fork': node.get('isFork', False)
+        })
+    
+    # 排序规则与 REST 模式一致：star 数降序，其次更新时间降序
+    sorted_repos = sorted(
+        repos,
+        key=lambda x: (x.get('stargazers_count', 0), x.get('pushed_at') or ''),
+        reverse=True
+    )
+    nodes_by_name = {node['name']: node for node in nodes}
+    sections = {}
+    
+    if 'recent_repos' in names:
+        sections['recent_repos'] = {
+            "avatar_url": user_data.get('avatarUrl'),
+            "name": user_data.get('name') or username,
+            "total_repos": len(repos),
+            "total_stars": sum(repo.get('stargazers_count', 0) for repo in repos),
+            "repos": [{field: repo.get(field) for field in REPO_FIELDS} for repo in sorted_repos]
+        }
+    
+    # 语言分布：与 REST 模式一样统计前15个非 fork 仓库
+    if 'language_distribution' in names:
+        language_bytes = {}
+        for repo in sorted_repos[:15]:
+            if repo.get('fork', False):
+                continue
+            for edge in nodes_by_name[repo['name']]['languages']['edges']:
+                lang = edge['node']['name']
+                language_bytes[lang] = language_bytes.get(lang, 0) + edge['size']
+        sections['language_distribution'] = build_language_distribution(language_bytes)
+    
+    # Star History：与 REST 模式一样每个仓库取最早的 100 个 star 的时间
+    if 'star_history' in names:
+        star_events = []
+        for repo in repos:
+            if repo.get('stargazers_count', 0) > 0:
+                star_events.extend(edge['starredAt'] for edge in nodes_by_name[repo['name']]['stargazers']['edges']
+                                   if edge.get('starredAt'))
+        sections['star_history'] = build_star_history(star_events)
+    
+    # 活动数据：使用贡献日历按月分桶
+    if 'activity_data' in names:
+        now = datetime.now()
+        earliest_date = now - timedelta(days=365)
+        activity_counts = [0] * 12
+        for week in user_data['contributionsCollection']['contributionCalendar']['weeks']:
+            for day in week['contributionDays']:
+                date = datetime.strptime(day['date'], '%Y-%m-%d')
+                if day['contributionCount'] and date >= earliest_date:
+                    total_months_diff = months_ago(now, date)
+                    if 0 <= total_months_diff < 12:
+                        activity_counts[total_months_diff] += day['contributionCount']
+        sections['activity_data'] = finalize_activity_counts(activity_counts, now)
+    
+    return sections
+
+# GraphQL 模式下读取若干分段：与 REST 模式共用分段缓存，只为过期的分段发起一次批量查询；
+# 返回 {分段名: 值}，获取失败且没有旧数据的分段为 None
+def get_github_sections_graphql(username, names):
+    if not get_github_token():
+        print("GraphQL API 需要 GitHub Token，跳过")
+        return {name: None for name in names}
+    
+    stale = [name for name in names if not section_is_fresh(username, name)]
+    fetched = {}
+    fetch_lock = threading.Lock()
+    
+    # 第一个需要重建的分段触发查询，其余分段复用同一次结果
+    def build(name):
+        with fetch_lock:
+            if 'result' not in fetched:
+                try:
+                    print(f"通过 GraphQL 获取GitHub数据: {username} {stale}")
+                    fetched['result'] = fetch_github_sections_graphql(username, stale)
+                except Exception as e:
+                    print(f"GraphQL 获取用户信息异常: {type(e).__name__}: {e}")
+                    fetched['result'] = {}
+        return fetched['result'].get(name)
+    
+    return {name: get_section(username, name, build, name) for name in names}
+
+# 分段缓存：github_info 的各部分按各自的 TTL 独立缓存和刷新
+SECTION_CACHE = os.environ.get('SECTION_CACHE', '1') != '0'
+SECTION_TTLS = {
+    name: int(os.environ.get(f'SECTION_TTL_{name.upper()}', default))
+    for name, default in {
+        'recent_repos': '600',             # 用户信息和仓库列表
+        'activity_data': '1800',
+        'readme_content': '3600',
+        'star_history': '21600',
+        'language_distribution': '86400'
+    }.items()
+}
+
+_section_flight = SingleFlight()
+
+# 调用 builder 构建某一部分，并记录耗时
+def timed_section_build(name, builder, *args):
+    started = time.perf_counter()
+    try:
+        return builder(*args)
+    finally:
+        metrics.observe('homepage_section_build_duration_seconds', time.perf_counter() - started, section=name)
+
+# 某一部分的缓存是否仍在有效期内
+def section_is_fresh(username, name):
+    if not SECTION_CACHE:
+        return False
+    entry = cache_backend.get(f'section:{username}:{name}')
+    return bool(entry) and time.time() - entry['time'] < SECTION_TTLS[name]
+
+# 读取某一部分的缓存，过期时调用 builder 重建；重建失败（返回 None）时沿用旧数据
+# 首页刷新和 /api/* 同时请求同一部分时只重建一次
+def get_section(username, name, builder, *args):
+    if not SECTION_CACHE:
+        return timed_section_build(name, builder, *args)
+    
+    key = f'section:{username}:{name}'
+    ttl = SECTION_TTLS[name]
+    entry = cache_backend.get(key)
+    if entry and time.time() - entry['time'] < ttl:
+        metrics.inc('homepage_cache_requests_total', cache=f'section:{name}', result='hit')
+        return entry['value']
+    
+    metrics.inc('homepage_cache_requests_total', cache=f'section:{name}', result='stale' if entry else 'miss')
+    value = _section_flight.do(key, timed_section_build, name, builder, *args)
+    if value is None:
+        return entry['value'] if entry else None
+    cache_backend.set(key, {'value': value, 'time': time.time()}, ttl=ttl + CACHE_MAX_STALENESS)
+    return value
+
+# 仓库字段只保留页面和统计需要的部分，减小缓存体积
+REPO_FIELDS = ('name', 'description', 'html_url', 'language', 'languages_url', 'stargazers_count',
+               'pushed_at', 'created_at', 'fork')
+
+# 获取用户资料和按 star / 更新时间排序的仓库列表；失败时返回 None
+def fetch_github_profile(username):
+    print(f"准备请求GitHub API: https://api.github.com/users/{username}")
+    
+    # 获取用户信息
+    user_response = make_github_request(f'https://api.github.com/users/{username}', priority=PRIORITY_HIGH)
+    print(f"GitHub API响应状态码: {user_response.status_code}")
+    if user_response.status_code != 200:
+        return None
+    
+    user_data = user_response.json()
+    print(f"成功获取用户数据: {user_data.get('name')}, {user_data.get('login')}")
+    
+    # 获取用户的仓库信息
+    repos_response = make_github_request(f'https://api.github.com/users/{username}/repos?sort=pushed&per_page=100', priority=PRIORITY_HIGH)
+    if repos_response.status_code != 200:
+        return None
+    repos = repos_response.json()
+    
+    # 排序规则：1. stargazers_count（star数）降序  2. pushed_at（最后推送时间）降序
+    sorted_repos = sorted(
+        repos,
+        key=lambda x: (
+            x.get('stargazers_count', 0),  # 第一排序维度：star数
+            x.get('pushed_at', '')         # 第二排序维度：更新时间
+        ),
+        reverse=True  # 降序排列（star多的在前，同star则时间新的在前）
+    )
+    
+    return {
+        "avatar_url": user_data.get('avatar_url'),
+        "name": user_data.get('name') or username,
+        # 获取总仓库数和总 stars 数
+        "total_repos": len(repos),
+        "total_stars": sum(repo.get('stargazers_count', 0) for repo in repos),
+        "repos": [{field: repo.get(field) for field in REPO_FIELDS} for repo in sorted_repos]
+    }
+
+# GitHub 数据获取失败时使用的默认值；degraded 标记让缓存尽快过期重新获取
+def default_github_info():
     return {
+        "degraded": True,
         "avatar_url": "https://avatars.githubusercontent.com/u/1000000?v=4",
-        "name": config.get('name', 'Example User'),
-        "bio": config.get('bio', 'Python Developer'),
+        "name": current_config().get('name', 'Example User'),
+        "bio": current_config().get('bio', 'Python Developer'),
         "total_repos": 0,
         "total_stars": 0,
         "readme_content": get_local_readme(),
@@ -236,10 +1328,170 @@ def get_github_user_info():
         "star_history": []
     }
 
+# 从配置的 GitHub 主页地址中提取用户名
+def get_github_username():
+    github_url = current_config().get('github_url', 'https://github.com/example')
+    return github_url.rstrip('/').split('/')[-1]
+
+# 从 GitHub API 获取用户信息
+def get_github_user_info():
+    print("开始获取GitHub用户信息")
+    github_url = current_config().get('github_url', 'https://github.com/example')
+    username = get_github_username()
+    print(f"配置的GitHub URL: {github_url}")
+    print(f"提取的用户名: {username}")
+
+    try:
+        profile = None
+        readme_task = (get_section, (username, 'readme_content', get_readme_content, username))
+        
+        # GraphQL 模式：过期的分段由一次批量查询重建，README 仍从 raw.githubusercontent.com 并发获取；
+        # 取不到仓库列表时回退到 REST
+        if GITHUB_DATA_SOURCE == 'graphql':
+            readme_content, sections = run_concurrently([
+                readme_task,
+                (get_github_sections_graphql, (username, tuple(GRAPHQL_SECTION_FIELDS)))
+            ])
+            profile = sections['recent_repos']
+            if profile:
+                activity_data = sections['activity_data']
+                language_distribution = sections['language_distribution']
+                star_history = sections['star_history']
+            else:
+                print("GraphQL 获取失败，改用 REST API")
+        
+        # 各部分独立缓存，只重建过期的部分
+        if not profile:
+            profile = get_section(username, 'recent_repos', fetch_github_profile, username)
+            if profile:
+                sorted_repos = profile['repos']
+                # 以下四项互不依赖，并发获取：
+                # 同名仓库的 README、活动数据（传递排序后的仓库列表，保持逻辑一致）、
+                # 真实语言分布数据（用于 GitHub Stats 饼图）、Star History 数据
+                readme_content, activity_data, language_distribution, star_history = run_concurrently([
+                    readme_task,
+                    (get_section, (username, 'activity_data', get_github_activity_data, username, sorted_repos)),
+                    (get_section, (username, 'language_distribution', get_language_distribution, username, sorted_repos)),
+                    (get_section, (username, 'star_history', get_star_history, username, sorted_repos)),
+                ])
+        
+        if profile:
+            sorted_repos = profile['repos']
+            
+            # 分析用户的技术栈
+            tech_stack = analyze_tech_stack(sorted_repos)
+            
+            # 获取失败且没有旧数据的部分使用默认值；默认值不写入分段缓存，下次刷新时重新获取
+            section_values = [readme_content, activity_data, language_distribution, star_history]
+            degraded = any(value is None for value in section_values)
+            if degraded:
+                defaults = default_github_info()
+                readme_content, activity_data, language_distribution, star_history = [
+                    defaults[name] if value is None else value
+                    for name, value in zip(('readme_content', 'activity_data', 'language_distribution', 'star_history'), section_values)
+                ]
+            
+            return {
+                "degraded": degraded,
+                "avatar_url": profile['avatar_url'],
+                "name": profile['name'],
+                "bio": current_config().get('bio', 'Python Developer'),  # 使用配置文件中的bio
+                "total_repos": profile['total_repos'],
+                "total_stars": profile['total_stars'],
+                "readme_content": readme_content,
+                "recent_repos": sorted_repos[:5],  # 使用排序后的仓库列表
+                "activity_data": activity_data,
+                "tech_stack": tech_stack,
+                "language_distribution": language_distribution,
+                "star_history": star_history
+            }
+    except Exception as e:
+        print(f"GitHub API调用异常: {type(e).__name__}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+    
+    # 如果获取失败，返回默认值
+    return default_github_info()
+
+# 计算某个时间点距今多少个月（考虑日期部分，与活动图表的分桶规则一致）
+def months_ago(now, date):
+    # 精确计算月份差异，考虑日期
+    years_diff = now.year - date.year
+    months_diff = now.month - date.month
+    
+    # 如果当前日期小于事件日期的日期部分，需要调整
+    if now.day < date.day:
+        months_diff -= 1
+        if months_diff < 0:
+            years_diff -= 1
+            months_diff = 11
+    
+    return years_diff * 12 + months_diff
+
+# 将按“距今月数”统计的计数整理成图表数据（排序、平滑、限幅）
+def finalize_activity_counts(activity_counts, now):
+    # 3. 调整数据顺序，使其与图表标签顺序一致
+    # 图表通常期望数据从最旧的月份到最新的月份显示
+    # 但为了确保顺序与UI期望一致，我们需要确认月份顺序的逻辑
+    
+    # 创建一个新的数组，按照从最早到最近的顺序排列（从12个月前到当前月）
+    # 例如，如果现在是10月，那么顺序应该是：10月(去年)、11月(去年)、12月(去年)、1月、2月...9月、10月(今年)
+    ordered_activity = []
+    current_month = now.month
+    
+    for i in range(12):
+        # 计算当前需要取的月份索引
+        # 从当前月的上个月开始，往前推11个月
+        # 例如，当前是10月(索引9)，那么顺序是: 9, 8, 7, 6, 5, 4, 3, 2, 1, 0, 11, 10
+        # 这样ordered_activity[0]就是最旧的数据，ordered_activity[11]是最新的数据
+        month_index = (now.month - 1 - i) % 12
+        ordered_activity.append(activity_counts[month_index])
+    
+    # 反转数组，使ordered_activity[0]是最旧的月份，ordered_activity[11]是最新的月份
+    ordered_activity = ordered_activity[::-1]
+    
+    # 4. 确保数据合理性
+    if sum(ordered_activity) == 0:
+        print("没有获取到活动数据，返回默认数据")
+        return [65, 59, 80, 81, 56, 55, 70, 65, 85, 75, 60, 75]  # 默认数据
+    
+    # 5. 对数据进行平滑处理，但保持数据的真实性
+    # 只在数据波动较大时进行轻微平滑
+    smoothed_data = []
+    for i in range(12):
+        # 简单的移动平均，但保留原始数据的相对大小
+        values = [ordered_activity[i]]
+        if i > 0:
+            values.append(ordered_activity[i-1])
+        if i < 11:
+            values.append(ordered_activity[i+1])
+        
+        # 计算平均值，但确保不小于最小值的80%
+        avg_value = int(sum(values) / len(values))
+        min_value = min(values)
+        smoothed_data.append(max(avg_value, int(min_value * 0.8)))
+    
+    # 6. 限制最大值，避免图表比例失调
+    max_value = max(smoothed_data)
+    if max_value > 200:
+        # 只对特别大的值进行缩放
+        scaled_data = []
+        for v in smoothed_data:
+            if v > 200:
+                scaled_data.append(int(v * 200 / max_value))
+            else:
+                scaled_data.append(v)
+        return scaled_data
+    
+    return smoothed_data
+
 # 获取用户的GitHub活动数据（过去12个月的推送统计）
 # 使用GitHub Events API获取更准确的活动数据
 # 确保数据按正确的月份顺序显示
 def get_github_activity_data(username, repos=None):
+    if ACTIVITY_INCREMENTAL:
+        return get_github_activity_data_incremental(username, repos)
+    
     try:
         print(f"开始获取GitHub活动数据: {username}")
         
@@ -252,17 +1504,22 @@ def get_github_activity_data(username, repos=None):
         earliest_date = now - timedelta(days=365)  # 过去一年的日期
         
         # 1. 首先尝试通过用户Events API获取PushEvent数据
-        page = 1
         max_pages = 5  # 限制获取的页数，避免过多API调用
         event_found = False
         
-        while page <= max_pages:
-            events_url = f"https://api.github.com/users/{username}/events?page={page}&per_page=100"
-            events_response = make_github_request(events_url)
-            
+        # 并发预取所有页，再按页码顺序处理（遇到失败或空页即停止，与逐页请求结果一致）
+        events_responses = parallel_map(
+            lambda page: make_github_request(f"https://api.github.com/users/{username}/events?page={page}&per_page=100"),
+            range(1, max_pages + 1)
+        )
+        
+        for events_response in events_responses:
+            # Events API 最多返回 300 条事件，超出范围的页返回 422，视为没有更多事件
+            if events_response.status_code == 422:
+                break
             if events_response.status_code != 200:
                 print(f"无法获取事件数据，状态码: {events_response.status_code}")
-                break
+                return None
             
             events = events_response.json()
             
@@ -283,18 +1540,7 @@ def get_github_activity_data(username, repos=None):
                     if event_date >= earliest_date:
                         page_has_recent_events = True
                         # 计算这个事件是多少个月前的
-                        # 精确计算月份差异，考虑日期
-                        years_diff = now.year - event_date.year
-                        months_diff = now.month - event_date.month
-                        
-                        # 如果当前日期小于事件日期的日期部分，需要调整
-                        if now.day < event_date.day:
-                            months_diff -= 1
-                            if months_diff < 0:
-                                years_diff -= 1
-                                months_diff = 11
-                        
-                        total_months_diff = years_diff * 12 + months_diff
+                        total_months_diff = months_ago(now, event_date)
                         
                         # 确保在0-11范围内
                         if 0 <= total_months_diff < 12:
@@ -302,8 +1548,7 @@ def get_github_activity_data(username, repos=None):
                             activity_counts[total_months_diff] += 1
             
             # 如果当前页没有最近事件，可能是因为已经获取了足够旧的数据
-            # 但继续获取下一页以确保覆盖所有可能的事件
-            page += 1
+            # 但继续处理下一页以确保覆盖所有可能的事件
         
         # 2. 如果通过Events API没有获取到足够的数据，使用仓库提交历史作为补充
         # 这里改进：无论Events API获取了多少数据，都用仓库数据作为补充，以确保完整性
@@ -314,12 +1559,20 @@ def get_github_activity_data(username, repos=None):
             if len(repos) > 5:
                 repos = repos[:5]
             
-            for repo in repos:
+            # 并发获取各仓库的提交历史（限制为最近100个提交）
+            def fetch_commits(repo):
                 try:
-                    # 获取仓库的提交历史（限制为最近100个提交）
                     commits_url = f"https://api.github.com/repos/{username}/{repo['name']}/commits?author={username}&per_page=100"
-                    commits_response = make_github_request(commits_url)
-                    
+                    return make_github_request(commits_url)
+                except Exception as e:
+                    return e
+            
+            for repo, commits_response in zip(repos, parallel_map(fetch_commits, repos)):
+                if isinstance(commits_response, Exception) or commits_response.status_code not in GITHUB_NO_DATA_STATUSES:
+                    error = commits_response if isinstance(commits_response, Exception) else commits_response.status_code
+                    print(f"获取仓库 {repo['name']} 的提交历史失败: {error}")
+                    return None
+                try:
                     if commits_response.status_code == 200:
                         commits = commits_response.json()
                         
@@ -331,17 +1584,7 @@ def get_github_activity_data(username, repos=None):
                             # 检查提交是否在过去12个月内
                             if commit_date >= earliest_date:
                                 # 计算这个提交是多少个月前的
-                                years_diff = now.year - commit_date.year
-                                months_diff = now.month - commit_date.month
-                                
-                                # 如果当前日期小于提交日期的日期部分，需要调整
-                                if now.day < commit_date.day:
-                                    months_diff -= 1
-                                    if months_diff < 0:
-                                        years_diff -= 1
-                                        months_diff = 11
-                                
-                                total_months_diff = years_diff * 12 + months_diff
+                                total_months_diff = months_ago(now, commit_date)
                                 
                                 # 确保在0-11范围内
                                 if 0 <= total_months_diff < 12:
@@ -351,84 +1594,165 @@ def get_github_activity_data(username, repos=None):
                     print(f"获取仓库 {repo['name']} 的提交历史时出错: {e}")
                     continue
         
-        # 3. 调整数据顺序，使其与图表标签顺序一致
-        # 图表通常期望数据从最旧的月份到最新的月份显示
-        # 但为了确保顺序与UI期望一致，我们需要确认月份顺序的逻辑
-        
-        # 创建一个新的数组，按照从最早到最近的顺序排列（从12个月前到当前月）
-        # 例如，如果现在是10月，那么顺序应该是：10月(去年)、11月(去年)、12月(去年)、1月、2月...9月、10月(今年)
-        ordered_activity = []
-        current_month = now.month
-        
-        for i in range(12):
-            # 计算当前需要取的月份索引
-            # 从当前月的上个月开始，往前推11个月
-            # 例如，当前是10月(索引9)，那么顺序是: 9, 8, 7, 6, 5, 4, 3, 2, 1, 0, 11, 10
-            # 这样ordered_activity[0]就是最旧的数据，ordered_activity[11]是最新的数据
-            month_index = (now.month - 1 - i) % 12
-            ordered_activity.append(activity_counts[month_index])
-        
-        # 反转数组，使ordered_activity[0]是最旧的月份，ordered_activity[11]是最新的月份
-        ordered_activity = ordered_activity[::-1]
-        
-        # 4. 确保数据合理性
-        if sum(ordered_activity) == 0:
-            print("没有获取到活动数据，返回默认数据")
-            return [65, 59, 80, 81, 56, 55, 70, 65, 85, 75, 60, 75]  # 默认数据
-        
-        # 5. 对数据进行平滑处理，但保持数据的真实性
-        # 只在数据波动较大时进行轻微平滑
-        smoothed_data = []
-        for i in range(12):
-            # 简单的移动平均，但保留原始数据的相对大小
-            values = [ordered_activity[i]]
-            if i > 0:
-                values.append(ordered_activity[i-1])
-            if i < 11:
-                values.append(ordered_activity[i+1])
-            
-            # 计算平均值，但确保不小于最小值的80%
-            avg_value = int(sum(values) / len(values))
-            min_value = min(values)
-            smoothed_data.append(max(avg_value, int(min_value * 0.8)))
-        
-        # 6. 限制最大值，避免图表比例失调
-        max_value = max(smoothed_data)
-        if max_value > 200:
-            # 只对特别大的值进行缩放
-            scaled_data = []
-            for v in smoothed_data:
-                if v > 200:
-                    scaled_data.append(int(v * 200 / max_value))
-                else:
-                    scaled_data.append(v)
-            return scaled_data
-        
-        return smoothed_data
+        return finalize_activity_counts(activity_counts, now)
     except Exception as e:
         print(f"获取GitHub活动数据异常: {e}")
     
-    # 如果发生任何错误，返回默认数据
-    return [65, 59, 80, 81, 56, 55, 70, 65, 85, 75, 60, 75]  # 默认数据
+    # 如果发生任何错误，返回 None，由调用方沿用旧数据或使用默认值
+    return None
 
-# 分析用户的技术栈
-# 限制处理的仓库数量，优化性能
-cached_tech_stack = None
-cached_timestamp = 0
+# 增量活动统计：持久化已统计的事件/提交时间戳及水位线（最新事件 id、已见过的提交 SHA），
+# 每次刷新只拉取水位线之后的新数据，月份分桶在读取时按当前日期重新计算
+ACTIVITY_INCREMENTAL = os.environ.get('ACTIVITY_INCREMENTAL', '1') != '0'
+GITHUB_TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
 
-CACHE_DURATION = 3600  # 缓存1小时
-# 分析用户的技术栈，考虑仓库数量和代码量的权重，同时优化性能，限制处理的仓库数量，并使用缓存机制
-def analyze_tech_stack_checked(repos):
-    global cached_tech_stack, cached_timestamp
+# 拉取水位线之后的新 PushEvent，返回 (新事件时间戳列表, 新水位线)；中途失败时返回 (None, 原水位线)
+def fetch_new_push_events(username, watermark):
+    max_pages = 5
+    events_url = "https://api.github.com/users/{}/events?page={}&per_page=100"
     
-    # 检查缓存是否有效（如果启用了缓存）
-    current_time = time.time()
-    if cached_tech_stack and (current_time - cached_timestamp < CACHE_DURATION):
-        print("使用缓存的技术栈数据")
-        return cached_tech_stack
+    # 首次统计时没有水位线，与全量模式一样并发预取所有页
+    prefetched = None
+    if watermark is None:
+        prefetched = parallel_map(lambda page: make_github_request(events_url.format(username, page)),
+                                  range(1, max_pages + 1))
     
-    try:
-        print("开始分析用户的技术栈")
+    new_timestamps = []
+    newest_id = watermark
+    for page in range(1, max_pages + 1):
+        events_response = prefetched[page - 1] if prefetched else make_github_request(events_url.format(username, page))
+        # 超出事件接口 300 条的窗口时返回 422，属于正常的分页结束
+        if events_response.status_code == 422:
+            break
+        if events_response.status_code != 200:
+            print(f"无法获取事件数据，状态码: {events_response.status_code}")
+            # 不能跳过未取到的事件（首次统计时也一样，否则水位线会越过失败的页），保留原状态等待下次刷新
+            return None, watermark
+        
+        events = events_response.json()
+        if not events:
+            break
+        
+        reached_watermark = False
+        for event in events:
+            event_id = int(event['id'])
+            if watermark is not None and event_id <= watermark:
+                reached_watermark = True
+                break
+            newest_id = max(newest_id or 0, event_id)
+            if event['type'] == 'PushEvent':
+                new_timestamps.append(event['created_at'])
+        
+        if reached_watermark:
+            break
+    
+    return new_timestamps, newest_id
+
+# 拉取仓库中尚未统计的提交，返回 {sha: 提交时间}；失败时返回 None
+def fetch_new_commits(username, repo_name, since=None):
+    commits_url = f"https://api.github.com/repos/{username}/{repo_name}/commits?author={username}&per_page=100"
+    if since:
+        commits_url += f"&since={since}"
+    # 带 since 的 URL 随水位线变化，缓存下来也不会再命中，不写入条件请求缓存
+    commits_response = make_github_request(commits_url, http_cache=since is None)
+    if commits_response.status_code not in GITHUB_NO_DATA_STATUSES:
+        return None
+    if commits_response.status_code != 200:
+        return {}
+    return {commit['sha']: commit['commit']['author']['date'] for commit in commits_response.json()}
+
+def get_github_activity_data_incremental(username, repos=None):
+    try:
+        print(f"开始增量获取GitHub活动数据: {username}")
+        
+        now = datetime.now()
+        earliest_date = now - timedelta(days=365)
+        earliest_str = earliest_date.strftime(GITHUB_TIME_FORMAT)
+        
+        state_key = f'activity_state:{username}'
+        state = cache_backend.get(state_key) or {}
+        events_state = state.get('events') or {'watermark': None, 'counts': {}}
+        repos_state = state.get('repos') or {}
+        
+        # 与全量模式一致，只统计排序后的前5个仓库
+        repo_names = [repo['name'] for repo in (repos or [])[:5]]
+        
+        def fetch_repo(repo_name):
+            try:
+                return fetch_new_commits(username, repo_name, (repos_state.get(repo_name) or {}).get('newest'))
+            except Exception as e:
+                print(f"获取仓库 {repo_name} 的提交历史时出错: {e}")
+                return None
+        
+        results = run_concurrently(
+            [(fetch_new_push_events, (username, events_state['watermark']))] +
+            [(fetch_repo, (repo_name,)) for repo_name in repo_names]
+        )
+        
+        # 1. 合并新的 PushEvent
+        new_timestamps, watermark = results[0]
+        if new_timestamps is not None:
+            counts = events_state['counts']
+            for timestamp in new_timestamps:
+                counts[timestamp] = counts.get(timestamp, 0) + 1
+            events_state['watermark'] = watermark
+        events_state['counts'] = {ts: n for ts, n in events_state['counts'].items() if ts >= earliest_str}
+        
+        # 2. 合并新的提交（按 SHA 去重），不再位于前5的仓库直接丢弃
+        new_repos_state = {}
+        for repo_name, new_commits in zip(repo_names, results[1:]):
+            repo_state = repos_state.get(repo_name) or {'newest': None, 'commits': {}}
+            if new_commits:
+                repo_state['commits'].update(new_commits)
+            repo_state['commits'] = {sha: ts for sha, ts in repo_state['commits'].items() if ts >= earliest_str}
+            if repo_state['commits']:
+                repo_state['newest'] = max(max(repo_state['commits'].values()), repo_state['newest'] or '')
+            new_repos_state[repo_name] = repo_state
+        
+        cache_backend.set(state_key, {'events': events_state, 'repos': new_repos_state})
+        
+        # 已取到的新数据保存在状态中；有请求失败时本次结果不完整，返回 None 由调用方沿用旧数据
+        if new_timestamps is None or any(new_commits is None for new_commits in results[1:]):
+            print("部分活动数据获取失败，下次刷新时重试")
+            return None
+        
+        # 3. 按当前日期重新分桶
+        activity_counts = [0] * 12
+        
+        def add(timestamp, count=1):
+            date = datetime.strptime(timestamp, GITHUB_TIME_FORMAT)
+            if date >= earliest_date:
+                total_months_diff = months_ago(now, date)
+                if 0 <= total_months_diff < 12:
+                    activity_counts[total_months_diff] += count
+        
+        for timestamp, count in events_state['counts'].items():
+            add(timestamp, count)
+        for repo_state in new_repos_state.values():
+            for timestamp in repo_state['commits'].values():
+                add(timestamp)
+        
+        return finalize_activity_counts(activity_counts, now)
+    except Exception as e:
+        print(f"增量获取GitHub活动数据异常: {e}")
+    
+    return None
+
+# 分析用户的技术栈
+# 限制处理的仓库数量，优化性能
+CACHE_DURATION = 3600  # 缓存1小时
+# 分析用户的技术栈，考虑仓库数量和代码量的权重，同时优化性能，限制处理的仓库数量，并使用缓存机制
+def analyze_tech_stack_checked(repos):
+    # 检查缓存是否有效（如果启用了缓存）
+    cached_tech_stack = cache_backend.get(tenant_key('tech_stack'))
+    if cached_tech_stack:
+        metrics.inc('homepage_cache_requests_total', cache='tech_stack', result='hit')
+        print("使用缓存的技术栈数据")
+        return cached_tech_stack
+    metrics.inc('homepage_cache_requests_total', cache='tech_stack', result='miss')
+    
+    try:
+        print("开始分析用户的技术栈")
         
         # 创建语言统计字典
         language_stats = {}
@@ -478,7 +1802,7 @@ def analyze_tech_stack_checked(repos):
                 {"name": "HTML/CSS", "color": "#560bad"},
                 {"name": "Flask", "color": "#1e40af"}
             ]
-            cached_timestamp = time.time()
+            cache_backend.set(tenant_key('tech_stack'), cached_tech_stack, ttl=CACHE_DURATION)
             return cached_tech_stack
         
         # 计算每种语言的使用比例
@@ -492,7 +1816,7 @@ def analyze_tech_stack_checked(repos):
         
         # 获取配置中的主题色
     
-        theme = config.get('theme', {
+        theme = current_config().get('theme', {
             'primary_color': '#6a11cb',
             'secondary_color': '#2575fc',
             'dark_primary_color': '#a855f7',
@@ -529,7 +1853,7 @@ def analyze_tech_stack_checked(repos):
             return f'#{r:02x}{g:02x}{b:02x}'
         
         # 检查是否为暗色模式
-        is_dark = config.get('dark_mode', 'auto') == 'dark'
+        is_dark = current_config().get('dark_mode', 'auto') == 'dark'
         if is_dark:
             base_colors = [
                 theme.get('dark_primary_color', theme.get('primary_color', '#a855f7')),
@@ -610,8 +1934,7 @@ def analyze_tech_stack_checked(repos):
             tech_stack = tech_stack[:10]
         
         # 更新缓存
-        cached_tech_stack = tech_stack
-        cached_timestamp = time.time()
+        cache_backend.set(tenant_key('tech_stack'), tech_stack, ttl=CACHE_DURATION)
         
         print(f"分析完成的技术栈: {[tech['name'] for tech in tech_stack]}")
         return tech_stack
@@ -643,6 +1966,89 @@ def analyze_tech_stack(repos):
     
     return tech_stack
 
+# 根据 {语言: 字节数} 构建语言分布数据（取前10种并计算百分比）
+def build_language_distribution(language_bytes):
+    if not language_bytes:
+        print("未获取到语言数据，返回默认值")
+        return [
+            {"name": "Python", "color": "#3572A5", "bytes": 50},
+            {"name": "JavaScript", "color": "#f1e05a", "bytes": 30},
+            {"name": "HTML", "color": "#e34c26", "bytes": 20}
+        ]
+    
+    # GitHub 官方语言颜色映射
+    github_language_colors = {
+        "Python": "#3572A5",
+        "JavaScript": "#f1e05a",
+        "TypeScript": "#3178c6",
+        "Java": "#b07219",
+        "C": "#555555",
+        "C++": "#f34b7d",
+        "C#": "#178600",
+        "Go": "#00ADD8",
+        "Rust": "#dea584",
+        "Ruby": "#701516",
+        "PHP": "#4F5D95",
+        "Swift": "#F05138",
+        "Kotlin": "#A97BFF",
+        "Dart": "#00B4AB",
+        "Scala": "#c22d40",
+        "R": "#198CE7",
+        "MATLAB": "#e16737",
+        "Shell": "#89e051",
+        "Bash": "#89e051",
+        "PowerShell": "#012456",
+        "HTML": "#e34c26",
+        "CSS": "#563d7c",
+        "SCSS": "#c6538c",
+        "Less": "#1d365d",
+        "Vue": "#41b883",
+        "Svelte": "#ff3e00",
+        "Lua": "#000080",
+        "Perl": "#0298c3",
+        "Haskell": "#5e5086",
+        "Elixir": "#6e4a7e",
+        "Clojure": "#db5855",
+        "Erlang": "#B83998",
+        "Julia": "#a270ba",
+        "Objective-C": "#438eff",
+        "Assembly": "#6E4C13",
+        "Makefile": "#427819",
+        "Dockerfile": "#384d54",
+        "TeX": "#3D6117",
+        "Jupyter Notebook": "#DA5B0B",
+        "Vim Script": "#199f4b",
+        "Emacs Lisp": "#c065db",
+        "CMake": "#DA3434",
+        "Batchfile": "#C1F12E",
+        "Fortran": "#4d41b1",
+        "VHDL": "#adb2cb",
+        "Verilog": "#b2b7f8",
+        "Cuda": "#3A4E3A",
+        "Cython": "#fedf5b",
+    }
+    
+    # 按字节数排序，取前 10 种语言
+    sorted_languages = sorted(language_bytes.items(), key=lambda x: x[1], reverse=True)[:10]
+    
+    # 计算总字节数（仅前10种）
+    total_bytes = sum(bytes_count for _, bytes_count in sorted_languages)
+    
+    # 构建结果
+    distribution = []
+    for lang, bytes_count in sorted_languages:
+        color = github_language_colors.get(lang, "#858585")
+        percentage = round((bytes_count / total_bytes) * 100, 1)
+        distribution.append({
+            "name": lang,
+            "color": color,
+            "bytes": bytes_count,
+            "percentage": percentage
+        })
+    
+    print(f"语言分布: {[(d['name'], d['percentage']) for d in distribution]}")
+    return distribution
+
 # 获取真实的语言分布数据
 def get_language_distribution(username, repos):
     """
@@ -657,113 +2063,103 @@ def get_language_distribution(username, repos):
         # 限制处理的仓库数量，避免 API 调用过多
         repos_to_process = repos[:15] if len(repos) > 15 else repos
         
-        for repo in repos_to_process:
-            # 跳过 fork 的仓库
-            if repo.get('fork', False):
-                continue
-            
+        # 跳过 fork 的仓库
+        repos_to_process = [repo for repo in repos_to_process if not repo.get('fork', False)]
+        
+        # 并发获取各仓库的语言数据
+        def fetch_languages(repo):
             try:
                 languages_url = f"https://api.github.com/repos/{username}/{repo['name']}/languages"
-                lang_response = make_github_request(languages_url)
-                
-                if lang_response.status_code == 200:
-                    languages_data = lang_response.json()
-                    for lang, bytes_count in languages_data.items():
-                        if lang not in language_bytes:
-                            language_bytes[lang] = 0
-                        language_bytes[lang] += bytes_count
+                return make_github_request(languages_url)
             except Exception as e:
-                print(f"获取仓库 {repo['name']} 语言数据时出错: {e}")
-                continue
-        
-        if not language_bytes:
-            print("未获取到语言数据，返回默认值")
-            return [
-                {"name": "Python", "color": "#3572A5", "bytes": 50},
-                {"name": "JavaScript", "color": "#f1e05a", "bytes": 30},
-                {"name": "HTML", "color": "#e34c26", "bytes": 20}
-            ]
-        
-        # GitHub 官方语言颜色映射
-        github_language_colors = {
-            "Python": "#3572A5",
-            "JavaScript": "#f1e05a",
-            "TypeScript": "#3178c6",
-            "Java": "#b07219",
-            "C": "#555555",
-            "C++": "#f34b7d",
-            "C#": "#178600",
-            "Go": "#00ADD8",
-            "Rust": "#dea584",
-            "Ruby": "#701516",
-            "PHP": "#4F5D95",
-            "Swift": "#F05138",
-            "Kotlin": "#A97BFF",
-            "Dart": "#00B4AB",
-            "Scala": "#c22d40",
-            "R": "#198CE7",
-            "MATLAB": "#e16737",
-            "Shell": "#89e051",
-            "Bash": "#89e051",
-            "PowerShell": "#012456",
-            "HTML": "#e34c26",
-            "CSS": "#563d7c",
-            "SCSS": "#c6538c",
-            "Less": "#1d365d",
-            "Vue": "#41b883",
-            "Svelte": "#ff3e00",
-            "Lua": "#000080",
-            "Perl": "#0298c3",
-            "Haskell": "#5e5086",
-            "Elixir": "#6e4a7e",
-            "Clojure": "#db5855",
-            "Erlang": "#B83998",
-            "Julia": "#a270ba",
-            "Objective-C": "#438eff",
-            "Assembly": "#6E4C13",
-            "Makefile": "#427819",
-            "Dockerfile": "#384d54",
-            "TeX": "#3D6117",
-            "Jupyter Notebook": "#DA5B0B",
-            "Vim Script": "#199f4b",
-            "Emacs Lisp": "#c065db",
-            "CMake": "#DA3434",
-            "Batchfile": "#C1F12E",
-            "Fortran": "#4d41b1",
-            "VHDL": "#adb2cb",
-            "Verilog": "#b2b7f8",
-            "Cuda": "#3A4E3A",
-            "Cython": "#fedf5b",
-        }
-        
-        # 按字节数排序，取前 10 种语言
-        sorted_languages = sorted(language_bytes.items(), key=lambda x: x[1], reverse=True)[:10]
-        
-        # 计算总字节数（仅前10种）
-        total_bytes = sum(bytes_count for _, bytes_count in sorted_languages)
-        
-        # 构建结果
-        distribution = []
-        for lang, bytes_count in sorted_languages:
-            color = github_language_colors.get(lang, "#858585")
-            percentage = round((bytes_count / total_bytes) * 100, 1)
-            distribution.append({
-                "name": lang,
-                "color": color,
-                "bytes": bytes_count,
-                "percentage": percentage
-            })
-        
-        print(f"语言分布: {[(d['name'], d['percentage']) for d in distribution]}")
-        return distribution
+                return e
+        
+        # 按仓库顺序汇总，保证统计结果与顺序请求一致；任一仓库获取失败时整体失败，避免缓存不完整的统计
+        for repo, lang_response in zip(repos_to_process, parallel_map(fetch_languages, repos_to_process)):
+            if isinstance(lang_response, Exception) or lang_response.status_code not in GITHUB_NO_DATA_STATUSES:
+                error = lang_response if isinstance(lang_response, Exception) else lang_response.status_code
+                print(f"获取仓库 {repo['name']} 语言数据失败: {error}")
+                return None
+            if lang_response.status_code == 200:
+                languages_data = lang_response.json()
+                for lang, bytes_count in languages_data.items():
+                    if lang not in language_bytes:
+                        language_bytes[lang] = 0
+                    language_bytes[lang] += bytes_count
+        
+        return build_language_distribution(language_bytes)
         
     except Exception as e:
         print(f"获取语言分布数据异常: {e}")
-        return [
-            {"name": "Python", "color": "#3572A5", "bytes": 50},
-            {"name": "JavaScript", "color": "#f1e05a", "bytes": 30},
-            {"name": "HTML", "color": "#e34c26", "bytes": 20}
-        ]
+        return None
+
+# 根据所有 star 的时间戳构建按月累计的 Star History
+def build_star_history(star_events):
+    if not star_events:
+        print("没有获取到 star 事件数据")
+        return []
+    
+    # 按时间排序
+    star_events.sort()
+    
+    # 构建累计 star 数据，按月聚合
+    monthly_data = {}
+    cumulative = 0
+    
+    for event_time in star_events:
+        try:
+            dt = datetime.strptime(event_time, '%Y-%m-%dT%H:%M:%SZ')
+            month_key = dt.strftime('%Y-%m')
+            cumulative += 1
+            monthly_data[month_key] = cumulative
+        except Exception:
+            continue
+    
+    if not monthly_data:
+        return []
+    
+    # 填充缺失的月份（确保曲线连续）
+    sorted_months = sorted(monthly_data.keys())
+    first_month = sorted_months[0]
+    last_month = datetime.now().strftime('%Y-%m')
+    
+    # 生成从第一个月到当前月的所有月份
+    all_months = []
+    current = datetime.strptime(first_month, '%Y-%m')
+    end = datetime.strptime(last_month, '%Y-%m')
+    
+    while current <= end:
+        all_months.append(current.strftime('%Y-%m'))
+        # 下一个月
+        if current.month == 12:
+            current = current.replace(year=current.year + 1, month=1)
+        else:
+            current = current.replace(month=current.month + 1)
+    
+    # 填充数据
+    result = []
+    last_value = 0
+    for month in all_months:
+        if month in monthly_data:
+            last_value = monthly_data[month]
+        result.append({
+            "month": month,
+            "stars": last_value
+        })
+    
+    # 如果数据点太多，进行采样（保留最多 24 个点）
+    if len(result) > 24:
+        step = len(result) / 24
+        sampled = []
+        for i in range(24):
+            idx = int(i * step)
+            sampled.append(result[idx])
+        # 确保最后一个点是最新的
+        sampled[-1] = result[-1]
+        result = sampled
+    
+    print(f"Star History: {len(result)} 个数据点, 总计 {result[-1]['stars']} stars")
+    return result
 
 # 获取所有项目的 Star History
 def get_star_history(username, repos):
@@ -781,132 +2177,105 @@ def get_star_history(username, repos):
             print("没有仓库有 star，返回空数据")
             return []
         
-        # 收集所有 star 事件的时间戳
-        star_events = []
-        
-        for repo in starred_repos:
+        # 获取单个仓库的 star 事件时间戳；获取失败时返回 None
+        def fetch_repo_star_events(repo):
+            repo_events = []
             repo_name = repo['name']
-            star_count = repo.get('stargazers_count', 0)
-            
+        
             try:
-                # 使用 star 详情 API（包含时间戳）
-                headers_accept = 'application/vnd.github.v3.star+json'
+                # 使用 star 详情 API（包含时间戳），需要特殊的 Accept header 来获取 star 时间
                 stars_url = f"https://api.github.com/repos/{username}/{repo_name}/stargazers?per_page=100"
-                
-                # 需要特殊的 Accept header 来获取 star 时间
-                import copy
-                
-                # 手动构建请求
-                headers = {'Accept': headers_accept}
-                github_token = os.environ.get('GH_TOKEN', '') or os.environ.get('GITHUB_TOKEN', '')
-                
-                if not github_token:
-                    token_file = os.path.join(app.root_path, 'github_token.txt')
-                    if os.path.exists(token_file):
-                        with open(token_file, 'r', encoding='utf-8') as f:
-                            github_token = f.read().strip().replace('"', '').replace("'", '')
-                    else:
-                        github_token = config.get('github_token', '')
-                
-                if github_token:
-                    headers['Authorization'] = f'token {github_token}'
-                
-                response = requests.get(stars_url, headers=headers, timeout=10, verify=False)
-                
+                response = make_github_request(stars_url, accept='application/vnd.github.v3.star+json', priority=PRIORITY_LOW)
+            
+                if response.status_code not in GITHUB_NO_DATA_STATUSES:
+                    print(f"获取仓库 {repo_name} 的 star 数据失败，状态码: {response.status_code}")
+                    return None
                 if response.status_code == 200:
                     stargazers = response.json()
                     for sg in stargazers:
                         starred_at = sg.get('starred_at', '')
                         if starred_at:
-                            star_events.append(starred_at)
-                else:
-                    # 如果无法获取详细时间，用仓库创建时间作为近似
-                    created_at = repo.get('created_at', '')
-                    if created_at:
-                        for _ in range(star_count):
-                            star_events.append(created_at)
-                            
+                            repo_events.append(starred_at)
             except Exception as e:
                 print(f"获取仓库 {repo_name} 的 star 数据时出错: {e}")
-                # 回退：用仓库创建时间
-                created_at = repo.get('created_at', '')
-                if created_at:
-                    star_count = repo.get('stargazers_count', 0)
-                    for _ in range(star_count):
-                        star_events.append(created_at)
-                continue
-        
-        if not star_events:
-            print("没有获取到 star 事件数据")
-            return []
+                return None
+            return repo_events
         
-        # 按时间排序
-        star_events.sort()
-        
-        # 构建累计 star 数据，按月聚合
-        monthly_data = {}
-        cumulative = 0
-        
-        for event_time in star_events:
-            try:
-                dt = datetime.strptime(event_time, '%Y-%m-%dT%H:%M:%SZ')
-                month_key = dt.strftime('%Y-%m')
-                cumulative += 1
-                monthly_data[month_key] = cumulative
-            except Exception:
-                continue
-        
-        if not monthly_data:
-            return []
+        # 并发获取各仓库数据，按仓库顺序收集所有 star 事件的时间戳；任一仓库失败时整体失败
+        star_events = []
+        for repo_events in parallel_map(fetch_repo_star_events, starred_repos):
+            if repo_events is None:
+                return None
+            star_events.extend(repo_events)
         
-        # 填充缺失的月份（确保曲线连续）
-        sorted_months = sorted(monthly_data.keys())
-        first_month = sorted_months[0]
-        last_month = datetime.now().strftime('%Y-%m')
-        
-        # 生成从第一个月到当前月的所有月份
-        all_months = []
-        current = datetime.strptime(first_month, '%Y-%m')
-        end = datetime.strptime(last_month, '%Y-%m')
-        
-        while current <= end:
-            all_months.append(current.strftime('%Y-%m'))
-            # 下一个月
-            if current.month == 12:
-                current = current.replace(year=current.year + 1, month=1)
-            else:
-                current = current.replace(month=current.month + 1)
-        
-        # 填充数据
-        result = []
-        last_value = 0
-        for month in all_months:
-            if month in monthly_data:
-                last_value = monthly_data[month]
-            result.append({
-                "month": month,
-                "stars": last_value
-            })
-        
-        # 如果数据点太多，进行采样（保留最多 24 个点）
-        if len(result) > 24:
-            step = len(result) / 24
-            sampled = []
-            for i in range(24):
-                idx = int(i * step)
-                sampled.append(result[idx])
-            # 确保最后一个点是最新的
-            sampled[-1] = result[-1]
-            result = sampled
-        
-        print(f"Star History: {len(result)} 个数据点, 总计 {result[-1]['stars']} stars")
-        return result
+        return build_star_history(star_events)
         
     except Exception as e:
         print(f"获取 Star History 异常: {e}")
         import traceback
         traceback.print_exc()
-        return []
+        return None
+
+# Markdown 渲染缓存：按源文本和扩展配置的哈希缓存 HTML（内存 + 磁盘），未变化的 README 不再重新渲染
+MARKDOWN_EXTENSIONS = ['extra', 'codehilite', 'toc', 'tables', 'md_in_html']
+MARKDOWN_EXTENSION_CONFIGS = {
+    'codehilite': {
+        'css_class': 'highlight',
+        'linenums': False
+    }
+}
+MARKDOWN_CACHE_DIR = os.path.join(CACHE_DIR, 'markdown')
+# 内存中最多保留的渲染结果数（多用户模式下每位用户一份 README）
+MARKDOWN_CACHE_MAX_ENTRIES = int(os.environ.get('MARKDOWN_CACHE_MAX_ENTRIES', '256'))
+_markdown_cache = OrderedDict()
+_markdown_local = threading.local()
+_markdown_config_key = None
+
+# 缓存键包含扩展配置和 markdown 版本；第一次渲染 README 时才导入 markdown
+def get_markdown_config_key():
+    global _markdown_config_key
+    if _markdown_config_key is None:
+        import markdown
+        _markdown_config_key = json.dumps([MARKDOWN_EXTENSIONS, MARKDOWN_EXTENSION_CONFIGS, markdown.__version__], sort_keys=True)
+    return _markdown_config_key
+
+# 每个线程复用一个预先配置好的 Markdown 实例（实例本身不是线程安全的）
+def get_markdown_renderer():
+    renderer = getattr(_markdown_local, 'renderer', None)
+    if renderer is None:
+        import markdown
+        renderer = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS, extension_configs=MARKDOWN_EXTENSION_CONFIGS)
+        _markdown_local.renderer = renderer
+    return renderer
+
+def render_markdown(text):
+    digest = hashlib.sha256((get_markdown_config_key() + '\0' + text).encode('utf-8')).hexdigest()
+    html = _markdown_cache.get(digest)
+    if html is not None:
+        return html
+    
+    cache_path = os.path.join(MARKDOWN_CACHE_DIR, digest + '.html')
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            html = f.read()
+    except Exception:
+        html = get_markdown_renderer().reset().convert(text)
+        try:
+            os.makedirs(MARKDOWN_CACHE_DIR, exist_ok=True)
+            tmp_path = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(html)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"写入 Markdown 缓存失败: {e}")
+    
+    _markdown_cache[digest] = html
+    while len(_markdown_cache) > MARKDOWN_CACHE_MAX_ENTRIES:
+        try:
+            _markdown_cache.popitem(last=False)
+        except KeyError:
+            break
+    return html
 
 # 获取同名仓库的 README内容，优先从GitHub获取，如果失败则使用本地文件
 def get_readme_content(username):
@@ -916,120 +2285,1227 @@ def get_readme_content(username):
         # 尝试获取同名仓库的 README（main分支）
         readme_url_main = f'https://raw.githubusercontent.com/{username}/{username}/main/README.md'
         print(f"尝试获取README URL (main): {readme_url_main}")
-        readme_response = requests.get(readme_url_main, timeout=5, verify=False)
+        readme_response = make_github_request(readme_url_main, timeout=5, accept=None, auth=False)
         print(f"README响应状态码 (main): {readme_response.status_code}")
         
         if readme_response.status_code == 200:
             print("成功获取main分支的README")
             # 将 Markdown 转换为 HTML 使用扩展
-            return markdown.markdown(
-                readme_response.text,
-                extensions=['extra', 'codehilite', 'toc', 'tables', 'md_in_html'],
-                extension_configs={
-                    'codehilite': {
-                        'css_class': 'highlight',
-                        'linenums': False
-                    }
-                }
-            )
+            return render_markdown(readme_response.text)
+        if readme_response.status_code != 404:
+            print(f"GitHub README获取失败，状态码: {readme_response.status_code}")
+            return None
         
         # 尝试其他分支（master）
         readme_url_master = f'https://raw.githubusercontent.com/{username}/{username}/master/README.md'
         print(f"尝试获取README URL (master): {readme_url_master}")
-        readme_response = requests.get(readme_url_master, timeout=5, verify=False)
+        readme_response = make_github_request(readme_url_master, timeout=5, accept=None, auth=False)
         print(f"README响应状态码 (master): {readme_response.status_code}")
         
         if readme_response.status_code == 200:
             print("成功获取master分支的README")
-            return markdown.markdown(
-                readme_response.text,
-                extensions=['extra', 'codehilite', 'toc', 'tables', 'md_in_html'],
-                extension_configs={
-                    'codehilite': {
-                        'css_class': 'highlight',
-                        'linenums': False
-                    }
-                }
-            )
+            return render_markdown(readme_response.text)
         
-        print(f"GitHub README获取失败，状态码: {readme_response.status_code}")
+        # 两个分支都没有 README 时使用本地文件；其他错误返回 None，由调用方沿用旧数据
+        if readme_response.status_code != 404:
+            print(f"GitHub README获取失败，状态码: {readme_response.status_code}")
+            return None
     except Exception as e:
         print(f"GitHub README获取异常: {type(e).__name__}: {str(e)}")
+        return None
     
-    # 如果获取失败，读取本地文件
+    # 如果没有同名仓库的 README，读取本地文件
     print("使用本地README文件")
     return get_local_readme()
 
-# 读取本地 README 文件
+# 把配置中的相对路径限制在 directory 内，越界（../、绝对路径、符号链接指向目录外）时返回 None
+def resolve_contained_path(directory, name):
+    base = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(base, os.path.normpath(name)))
+    return path if os.path.commonpath([base, path]) == base and path != base else None
+
+# 读取本地 README 文件：单用户模式在项目目录中查找，多用户模式只在用户配置目录中查找
 def get_local_readme():
     try:
-        introduction_file = config.get('introduction_file', 'Introduction.md')
-        file_path = os.path.join(BASE_DIR, introduction_file)
-        if os.path.exists(file_path):
+        introduction_file = str(current_config().get('introduction_file') or 'Introduction.md')
+        directory = TENANTS_DIR if current_tenant() else BASE_DIR
+        file_path = resolve_contained_path(directory, introduction_file)
+        if file_path is None:
+            print(f"自我介绍文件不在 {directory} 中，已忽略: {introduction_file}")
+        elif os.path.isfile(file_path):
             with open(file_path, 'r', encoding='utf-8') as f:
                 md_text = f.read()
-                return markdown.markdown(
-                    md_text,
-                    extensions=['extra', 'codehilite', 'toc', 'tables', 'md_in_html'],
-                    extension_configs={
-                        'codehilite': {
-                            'css_class': 'highlight',
-                            'linenums': False
-                        }
-                    }
-                )
+                return render_markdown(md_text)
     except Exception as e:
         print(f"读取本地 README 出错: {e}")
     return "<p>这个人很懒，什么都没有留下～</p>"
 
+_rebuild_flight = SingleFlight()
+
+# 当前用户的数据刷新间隔：用户配置中的 cache_ttl，默认 CACHE_TTL
+def get_cache_ttl():
+    try:
+        return int(current_config().get('cache_ttl', CACHE_TTL))
+    except (TypeError, ValueError):
+        return CACHE_TTL
+
+# 部分数据使用了默认值时，整体缓存只保持这么久的新鲜度，之后重新获取
+DEGRADED_CACHE_TTL = int(os.environ.get('DEGRADED_CACHE_TTL', '60'))
+
+def _rebuild_github_info():
+    refresh_time = time.time()
+    github_info = get_github_user_info()
+    if github_info.pop('degraded', False):
+        refresh_time -= max(get_cache_ttl() - DEGRADED_CACHE_TTL, 0)
+    entry = {'github_info': github_info, 'cache_time': refresh_time}
+    # 后端 TTL 取最大可容忍的陈旧时间，新鲜度由 cache_time 判断
+    cache_backend.set(tenant_key('github_info'), entry, ttl=get_cache_ttl() + CACHE_MAX_STALENESS)
+    return entry
+
+# 重新获取 GitHub 数据并写入缓存；并发的重建请求共享同一次结果，避免惊群
+def refresh_github_info():
+    return _rebuild_flight.do(tenant_key('github_info'), _rebuild_github_info)
+
+# 同时进行的后台刷新数（多用户模式下避免大量用户同时过期时一起请求 GitHub）
+REFRESH_CONCURRENCY = int(os.environ.get('REFRESH_CONCURRENCY', '2'))
+_refresh_semaphore = threading.BoundedSemaphore(max(REFRESH_CONCURRENCY, 1))
+
+# 在后台线程刷新当前用户的缓存，每个用户同一时间只运行一个刷新任务
+def start_background_refresh():
+    tenant = current_tenant()
+    with _refresh_lock:
+        if tenant in _cache['refreshing']:
+            return False
+        _cache['refreshing'].add(tenant)
+    
+    def worker():
+        try:
+            with _refresh_semaphore:
+                refresh_github_info()
+        except Exception as e:
+            print(f"后台刷新缓存失败: {e}")
+        finally:
+            with _refresh_lock:
+                _cache['refreshing'].discard(tenant)
+    
+    threading.Thread(target=with_tenant(worker), name='github-info-refresh', daemon=True).start()
+    return True
+
+# 多用户模式下的定时刷新：只刷新最近有人访问过、数据仍在缓存中的用户，在数据过期前主动重建；
+# 到期时间按用户名错开（最多提前 1/10 个刷新间隔），避免同时加载的用户总是同时刷新
+TENANT_SCHEDULER = os.environ.get('TENANT_SCHEDULER', '1') != '0'
+TENANT_SCHEDULER_INTERVAL = int(os.environ.get('TENANT_SCHEDULER_INTERVAL', '30'))
+TENANT_IDLE_TIMEOUT = int(os.environ.get('TENANT_IDLE_TIMEOUT', '86400'))
+_tenant_last_seen = {}
+_tenant_scheduler = {'thread': None}
+
+# 当前用户的数据是否需要定时刷新
+def tenant_refresh_due(name, now):
+    entry = cache_backend.get(tenant_key('github_info'))
+    if not entry or not isinstance(entry.get('cache_time'), (int, float)):
+        return False
+    ttl = get_cache_ttl()
+    stagger = int(hashlib.md5(name.encode('utf-8')).hexdigest(), 16) % max(ttl // 10, 1)
+    return now - entry['cache_time'] >= ttl - stagger
+
+def run_tenant_scheduler():
+    while True:
+        time.sleep(TENANT_SCHEDULER_INTERVAL)
+        try:
+            now = time.time()
+            for name in list(get_tenants()['configs']):
+                if now - _tenant_last_seen.get(name, 0) > TENANT_IDLE_TIMEOUT:
+                    continue
+                token = _tenant_context.set(name)
+                try:
+                    if tenant_refresh_due(name, now):
+                        start_background_refresh()
+                finally:
+                    _tenant_context.reset(token)
+        except Exception as e:
+            print(f"定时刷新用户数据失败: {e}")
+
+def start_tenant_scheduler():
+    if _tenant_scheduler['thread'] is None:
+        _tenant_scheduler['thread'] = threading.Thread(target=run_tenant_scheduler, name='tenant-scheduler', daemon=True)
+        _tenant_scheduler['thread'].start()
+
+# 启动预热：在后台提前构建缓存，避免第一个访问者等待
+def warm_up_cache():
+    if cache_backend.get('github_info') is None:
+        print("后台预热 GitHub 数据缓存")
+        start_background_refresh()
+    # 提前构建静态资源清单（含背景图片变体），避免首次渲染时等待
+    threading.Thread(target=get_asset_manifest, name='asset-manifest', daemon=True).start()
+    if STATIC_PRELOAD:
+        threading.Thread(target=get_static_table, name='static-preload', daemon=True).start()
+
+# 获取 GitHub 数据缓存项 {'github_info', 'cache_time'}：
+# 新鲜时直接返回，过期但未超过最大陈旧时间时返回旧数据并后台刷新
+def get_cached_github_info_entry():
+    entry = cache_backend.get(tenant_key('github_info'))
+    if not entry or not entry.get('github_info'):
+        metrics.inc('homepage_cache_requests_total', cache='github_info', result='miss')
+        return refresh_github_info()
+    
+    age = time.time() - entry['cache_time']
+    ttl = get_cache_ttl()
+    
+    if age < ttl:
+        metrics.inc('homepage_cache_requests_total', cache='github_info', result='hit')
+        return entry
+    
+    metrics.inc('homepage_cache_requests_total', cache='github_info', result='stale')
+    if CACHE_STALE_WHILE_REVALIDATE and age < ttl + CACHE_MAX_STALENESS:
+        start_background_refresh()
+        return entry
+    
+    return refresh_github_info()
+
+def get_cached_github_info():
+    return get_cached_github_info_entry()['github_info']
+
+# 渐进式渲染：没有可用的 GitHub 数据缓存时，首页不等待 GitHub，先返回只含配置信息的页面框架，
+# 各部分由页面脚本通过 /api/* 分别加载，同时在后台构建完整数据供之后的访问使用
+PROGRESSIVE_RENDER = os.environ.get('PROGRESSIVE_RENDER', '1') != '0'
+
+# 不阻塞的缓存读取：有可用数据时与 get_cached_github_info_entry 相同，否则开始后台刷新并返回 None
+def peek_cached_github_info_entry():
+    entry = cache_backend.get(tenant_key('github_info'))
+    if entry and entry.get('github_info'):
+        age = time.time() - entry['cache_time']
+        ttl = get_cache_ttl()
+        if age < ttl:
+            metrics.inc('homepage_cache_requests_total', cache='github_info', result='hit')
+            return entry
+        if CACHE_STALE_WHILE_REVALIDATE and age < ttl + CACHE_MAX_STALENESS:
+            metrics.inc('homepage_cache_requests_total', cache='github_info', result='stale')
+            start_background_refresh()
+            return entry
+    metrics.inc('homepage_cache_requests_total', cache='github_info', result='miss')
+    start_background_refresh()
+    return None
+
+# 页面框架使用的数据：只有配置中的信息，pending 标记让模板输出占位内容和加载脚本
+def build_shell_entry():
+    username = get_github_username()
+    github_info = {
+        "pending": True,
+        "avatar_url": f"https://github.com/{username}.png",
+        "name": current_config().get('name', username),
+        "bio": current_config().get('bio', 'Python Developer'),
+        "total_repos": "-",
+        "total_stars": "-",
+        "readme_content": "",
+        "recent_repos": [],
+        "activity_data": [],
+        "tech_stack": [],
+        "language_distribution": [],
+        "star_history": []
+    }
+    return {'github_info': github_info, 'cache_time': 'shell'}
+
+# 单独获取某一部分数据，复用首页的分段缓存；GraphQL 模式下取不到时回退到 REST
+def get_github_section(name):
+    username = get_github_username()
+    if name == 'readme_content':
+        return get_section(username, name, get_readme_content, username)
+    if GITHUB_DATA_SOURCE == 'graphql':
+        value = get_github_sections_graphql(username, (name,))[name]
+        if value is not None:
+            return dict(value, tech_stack=analyze_tech_stack(value['repos'])) if name == 'recent_repos' else value
+    profile = get_section(username, 'recent_repos', fetch_github_profile, username)
+    if not profile:
+        return None
+    if name == 'recent_repos':
+        return dict(profile, tech_stack=analyze_tech_stack(profile['repos']))
+    builder = {
+        'activity_data': get_github_activity_data,
+        'language_distribution': get_language_distribution,
+        'star_history': get_star_history
+    }[name]
+    return get_section(username, name, builder, username, profile['repos'])
+
+# 检查背景图片，返回 (是否存在, 页面中使用的路径)
+def resolve_background():
+    background_image = current_config().get('background', {}).get('image', 'background.png')
+    possible_paths = [
+        os.path.join(BASE_DIR, background_image),
+        os.path.join(BASE_DIR, 'static', background_image)
+    ]
+    
+    for path in possible_paths:
+        if os.path.exists(path):
+            if 'static' in path:
+                return True, f'/static/{background_image}'
+            return True, background_image
+    return False, background_image
+
+# 静态资源指纹：按内容哈希生成文件名（如 background.1a2b3c4d5e.jpg），并预先压缩可压缩的类型
+# 带指纹的资源内容永不改变，可以设置 immutable 长期缓存
+ASSET_FINGERPRINT = os.environ.get('ASSET_FINGERPRINT', '1') != '0'
+# jpg / png 等图片本身已压缩，再压缩只会浪费 CPU
+COMPRESSIBLE_EXTENSIONS = {'.svg', '.css', '.js', '.ico', '.json', '.txt', '.html'}
+# 资源清单按背景和主题配置分别构建（多用户模式下各用户可以不同），最多保留的清单数；
+# 清单中的资源对象（源文件、背景图片变体、Tailwind 样式表）在清单之间共享，不重复占用内存，
+# 每一类资源对象同样最多保留这么多份；两者都按最近使用淘汰
+ASSET_MANIFEST_MAX_ENTRIES = int(os.environ.get('ASSET_MANIFEST_MAX_ENTRIES', '256'))
+_asset_manifests = OrderedDict()
+_asset_parts = {'files': OrderedDict(), 'backgrounds': OrderedDict(), 'tailwind': OrderedDict()}
+# _asset_lock 保证同一时间只构建一个清单；_asset_cache_lock 只保护上面几个表的读写，命中时不必等待构建
+_asset_lock = threading.Lock()
+_asset_cache_lock = threading.Lock()
+# 正在后台生成的背景图片变体；revision 在生成完成后递增，使已缓存的页面重新渲染
+_background_builds = {'pending': set(), 'revision': 0, 'lock': threading.Lock()}
+
+# 需要发布的静态资源（相对 BASE_DIR）
+def get_asset_sources():
+    sources = []
+    background_image = current_config().get('background', {}).get('image')
+    if background_image:
+        sources.append(background_image)
+    # 检查一些常见的资源文件
+    sources.extend(['background.jpg', '1background.jpg', 'favicon.ico'])
+    return [name for i, name in enumerate(sources)
+            if name not in sources[:i] and os.path.isfile(os.path.join(BASE_DIR, name))]
+
+def fingerprint_asset(name, content):
+    digest = hashlib.sha256(content).hexdigest()
+    root, ext = os.path.splitext(name)
+    asset = {
+        'name': name,
+        'hashed_name': f'{root}.{digest[:10]}{ext}',
+        'etag': digest[:32],
+        'mimetype': guess_mimetype(name),
+        'content': content,
+        'variants': {}
+    }
+    if ext.lower() in COMPRESSIBLE_EXTENSIONS:
+        gz = gzip.compress(content, compresslevel=9)
+        if len(gz) < len(content):
+            asset['variants']['gzip'] = gz
+        if brotli is not None:
+            br = brotli.compress(content, quality=11)
+            if len(br) < len(content):
+                asset['variants']['br'] = br
+    return asset
+
+# 背景图片处理：生成多种宽度的 WebP / AVIF 版本（srcset）、按配置的模糊半径预先模糊的低分辨率版本，
+# 以及内联的极小占位图；结果按源图哈希保存在磁盘上（依赖资源指纹提供 URL）。
+# 变体应由 `python app.py build_assets` 预先生成到 BACKGROUND_BUILD_DIR 并随代码部署（运行时无需 Pillow）；
+# 找不到预生成的变体时，若安装了 Pillow 则在后台线程生成到本地缓存目录，生成完成前页面使用原图
+BACKGROUND_PIPELINE = os.environ.get('BACKGROUND_PIPELINE', '1') != '0'
+BACKGROUND_WIDTHS = [640, 1280, 1920, 2560]
+BACKGROUND_BLUR_WIDTH = 640
+BACKGROUND_PLACEHOLDER_WIDTH = 32
+# CSS blur 半径按该视口宽度换算到低分辨率图片上
+BACKGROUND_REFERENCE_WIDTH = 1920
+BACKGROUND_RASTER_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+BACKGROUND_BUILD_DIR = os.environ.get('BACKGROUND_BUILD_DIR', os.path.join(BASE_DIR, 'build', 'images'))
+BACKGROUND_CACHE_DIR = os.path.join(CACHE_DIR, 'images')
+_mimetypes_ready = False
+
+# 按文件名猜测 MIME 类型；首次调用时才初始化 MIME 表（读取系统 mime.types），
+# 并登记较旧的 Python 版本没有的两种图片类型
+def guess_mimetype(path):
+    global _mimetypes_ready
+    if not _mimetypes_ready:
+        mimetypes.add_type('image/webp', '.webp')
+        mimetypes.add_type('image/avif', '.avif')
+        _mimetypes_ready = True
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+def _encode_image(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == 'avif':
+        image.save(buffer, 'AVIF', quality=60, speed=8)
+    elif fmt == 'webp':
+        image.save(buffer, 'WEBP', quality=80, method=4)
+    else:
+        image.save(buffer, 'JPEG', quality=80, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+def _resize_to_width(image, width):
+    from PIL import Image
+    return image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+
+# 导入 Pillow（只在需要生成新的背景图片变体时）；未安装时返回 None
+def load_pillow():
+    try:
+        from PIL import Image, ImageFilter, features
+    except ImportError:
+        return None
+    return Image, ImageFilter, features
+
+# 变体目录名：由源图内容和生成参数决定
+def background_variants_key(name, content, blur):
+    return hashlib.sha256(content + json.dumps([name, blur, BACKGROUND_WIDTHS, BACKGROUND_BLUR_WIDTH]).encode('utf-8')).hexdigest()[:16]
+
+# 从目录读取已生成的变体，不存在或不完整时返回 None
+def read_background_variants(variants_dir):
+    try:
+        with open(os.path.join(variants_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        files = {}
+        for file_name in meta['files']:
+            with open(os.path.join(variants_dir, file_name), 'rb') as f:
+                files[file_name] = f.read()
+        return {'files': files, 'meta': meta}
+    except Exception:
+        return None
+
+# 先找随代码部署的预生成变体，再找本地缓存
+def find_background_variants(variants_key):
+    for base_dir in (BACKGROUND_BUILD_DIR, BACKGROUND_CACHE_DIR):
+        variants = read_background_variants(os.path.join(base_dir, variants_key))
+        if variants:
+            return variants
+    return None
+
+def write_background_variants(variants_dir, variants):
+    os.makedirs(variants_dir, exist_ok=True)
+    for file_name, data in variants['files'].items():
+        with open(os.path.join(variants_dir, file_name), 'wb') as f:
+            f.write(data)
+    with open(os.path.join(variants_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(variants['meta'], f)
+
+# 用 Pillow 生成变体，返回 {'files': {文件名: 内容}, 'meta': {...}}；未安装 Pillow 时返回 None
+def build_background_variants(name, content, blur):
+    pillow = load_pillow()
+    if pillow is None:
+        return None
+    Image, ImageFilter, pil_features = pillow
+    
+    print(f"生成背景图片变体: {name}")
+    image = Image.open(io.BytesIO(content))
+    image = image.convert('RGB')
+    root = os.path.splitext(name)[0]
+    formats = ['avif', 'webp'] if pil_features.check('avif') else ['webp']
+    
+    files = {}
+    srcset = {fmt: [] for fmt in formats}
+    widths = [w for w in BACKGROUND_WIDTHS if w < image.width] + [min(image.width, BACKGROUND_WIDTHS[-1])]
+    for width in sorted(set(widths)):
+        resized = _resize_to_width(image, width)
+        for fmt in formats:
+            file_name = f'{root}-{width}.{fmt}'
+            files[file_name] = _encode_image(resized, fmt)
+            srcset[fmt].append([file_name, width])
+    
+    # 预模糊的低分辨率版本，浏览器放大后效果与 CSS blur 接近，省去客户端滤镜
+    blurred = {}
+    if blur:
+        small = _resize_to_width(image, min(BACKGROUND_BLUR_WIDTH, image.width))
+        small = small.filter(ImageFilter.GaussianBlur(max(blur * small.width / BACKGROUND_REFERENCE_WIDTH, 0.5)))
+        for fmt in formats + ['jpeg']:
+            file_name = f'{root}-blur.{"jpg" if fmt == "jpeg" else fmt}'
+            files[file_name] = _encode_image(small, fmt)
+            blurred[fmt] = file_name
+    
+    # 内联占位图
+    tiny = _resize_to_width(image, min(BACKGROUND_PLACEHOLDER_WIDTH, image.width)).filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    tiny.save(buffer, 'JPEG', quality=40)
+    placeholder = 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+    
+    meta = {'files': list(files), 'srcset': srcset, 'blurred': blurred, 'placeholder': placeholder}
+    return {'files': files, 'meta': meta}
+
+# Tailwind 样式构建（tailwind_css.py）：扫描模板中出现的类名，只生成用到的工具类（含 hover: / dark: / 响应式变体和主题色），
+# 取代在浏览器中实时编译的 Play CDN；生成失败时模板回退到 CDN
+TAILWIND_BUILD = os.environ.get('TAILWIND_BUILD', '1') != '0'
+# 内联到页面中而不是通过 <link> 引用（未启用资源指纹时总是内联）
+TAILWIND_INLINE = os.environ.get('TAILWIND_INLINE', '0') == '1'
+TAILWIND_ASSET_NAME = 'tailwind.css'
+TAILWIND_CONTENT_DIR = os.path.join(BASE_DIR, 'templates')
+
+# 模板中 <style type="text/tailwindcss"> 里的自定义工具类：用当前配置渲染后去掉 @layer 包裹，
+# 放在核心工具类之后、变体之前（与 Play CDN 的输出顺序一致）
+def get_tailwind_custom_css():
+    with open(os.path.join(TAILWIND_CONTENT_DIR, 'index.html'), 'r', encoding='utf-8') as f:
+        match = re.search(r'<style type="text/tailwindcss">(.*?)</style>', f.read(), re.S)
+    if not match:
+        return ''
+    css = app.jinja_env.from_string(match.group(1)).render(config=current_config()).strip()
+    layer = re.fullmatch(r'@layer\s+\w+\s*\{(.*)\}', css, re.S)
+    return layer.group(1) if layer else css
+
+# 读取并登记源文件资源，读取失败时返回 None
+def load_file_asset(name):
+    found, asset = asset_cache_get(_asset_parts['files'], name)
+    if found:
+        return asset
+    try:
+        with open(os.path.join(BASE_DIR, name), 'rb') as f:
+            asset = fingerprint_asset(name, f.read())
+    except Exception as e:
+        print(f"警告：无法读取资源文件 {name}: {e}")
+    return asset_cache_put(_asset_parts['files'], name, asset)
+
+# 生成变体并写入本地缓存（只读环境下写入失败不影响本次结果），失败时返回 None
+def create_background_variants(name, content, blur, variants_key):
+    try:
+        variants = build_background_variants(name, content, blur)
+    except Exception as e:
+        print(f"生成背景图片变体失败: {e}")
+        return None
+    if variants:
+        try:
+            write_background_variants(os.path.join(BACKGROUND_CACHE_DIR, variants_key), variants)
+        except Exception as e:
+            print(f"写入背景图片缓存失败: {e}")
+    return variants
+
+def background_variant_assets(variants):
+    if not variants:
+        return None
+    assets = []
+    for file_name, file_content in variants['files'].items():
+        asset = fingerprint_asset(file_name, file_content)
+        asset['generated'] = True
+        assets.append(asset)
+    return (assets, variants['meta'])
+
+# 背景图片变体：返回 ([asset], meta)，无法生成或正在后台生成时返回 None。
+# 磁盘上没有变体时不在请求线程中生成（大图编码 AVIF 需要数秒）：wait=False 时交给后台线程，
+# 生成完成后清空资源清单，之后的请求使用变体；wait=True（生成静态文件）时同步生成
+def load_background_assets(name, content, blur, wait=False):
+    key = (name, blur)
+    found, assets = asset_cache_get(_asset_parts['backgrounds'], key)
+    if found:
+        return assets
+    
+    variants_key = background_variants_key(name, content, blur)
+    variants = find_background_variants(variants_key)
+    if variants is None and not wait:
+        start_background_variants_build(key, name, content, blur, variants_key)
+        return None
+    if variants is None:
+        variants = create_background_variants(name, content, blur, variants_key)
+    return asset_cache_put(_asset_parts['backgrounds'], key, background_variant_assets(variants))
+
+# 在后台生成变体，同一张图片同时只生成一次
+def start_background_variants_build(key, name, content, blur, variants_key):
+    with _background_builds['lock']:
+        if key in _background_builds['pending']:
+            return
+        _background_builds['pending'].add(key)
+    
+    def worker():
+        try:
+            asset_cache_put(_asset_parts['backgrounds'], key, background_variant_assets(
+                create_background_variants(name, content, blur, variants_key)))
+            # 重新构建资源清单和页面，让之后的请求使用生成的变体
+            with _asset_lock:
+                with _asset_cache_lock:
+                    _asset_manifests.clear()
+                _background_builds['revision'] += 1
+        finally:
+            with _background_builds['lock']:
+                _background_builds['pending'].discard(key)
+    
+    threading.Thread(target=worker, name='background-variants', daemon=True).start()
+
+# 当前主题对应的 Tailwind 样式表，生成失败时返回 None
+def load_tailwind_asset():
+    key = json.dumps(current_config().get('theme', {}), sort_keys=True)
+    found, asset = asset_cache_get(_asset_parts['tailwind'], key)
+    if found:
+        return asset
+    try:
+        from tailwind_css import build_tailwind_css
+        css = build_tailwind_css(TAILWIND_CONTENT_DIR, current_config().get('theme', {}),
+                                 get_tailwind_custom_css())
+        asset = fingerprint_asset(TAILWIND_ASSET_NAME, css.encode('utf-8'))
+        asset['generated'] = True
+        print(f"已生成 Tailwind 样式表: {asset['hashed_name']} ({len(asset['content'])} 字节)")
+    except Exception as e:
+        asset = None
+        print(f"生成 Tailwind 样式表失败，将回退到 CDN: {e}")
+    return asset_cache_put(_asset_parts['tailwind'], key, asset)
+
+# 从资源表中读取并标记为最近使用，返回 (是否命中, 值)；值可能是记录下来的失败结果 None
+def asset_cache_get(table, key):
+    with _asset_cache_lock:
+        if key in table:
+            table.move_to_end(key)
+            return True, table[key]
+    return False, None
+
+def asset_cache_put(table, key, value):
+    with _asset_cache_lock:
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > ASSET_MANIFEST_MAX_ENTRIES:
+            table.popitem(last=False)
+    return value
+
+def build_asset_manifest(wait=False):
+    manifest = {'assets': {}, 'hashed': {}, 'background': None}
+    
+    def add(asset):
+        manifest['assets'][asset['name']] = asset
+        manifest['hashed'][asset['hashed_name']] = asset
+    
+    for name in get_asset_sources():
+        asset = load_file_asset(name)
+        if asset:
+            add(asset)
+    
+    # 背景图片变体同样作为带指纹的资源发布
+    background = current_config().get('background', {})
+    background_image = background.get('image')
+    if (BACKGROUND_PIPELINE and ASSET_FINGERPRINT and background_image in manifest['assets']
+            and os.path.splitext(background_image)[1].lower() in BACKGROUND_RASTER_EXTENSIONS):
+        variants = load_background_assets(background_image, manifest['assets'][background_image]['content'],
+                                          background.get('blur', 0), wait)
+        if variants:
+            for asset in variants[0]:
+                add(asset)
+            manifest['background'] = variants[1]
+    
+    # 构建时生成的 Tailwind 样式表
+    if TAILWIND_BUILD:
+        asset = load_tailwind_asset()
+        if asset:
+            add(asset)
+    return manifest
+
+# 资源清单：{'assets': {原文件名: asset}, 'hashed': {指纹文件名: asset}}，首次使用时构建；
+# wait=True 时重新构建并同步生成缺少的背景图片变体
+def get_asset_manifest(wait=False):
+    cfg = current_config()
+    key = json.dumps([cfg.get('background', {}), cfg.get('theme', {})], sort_keys=True)
+    manifest = None if wait else asset_cache_get(_asset_manifests, key)[1]
+    if manifest is None:
+        with _asset_lock:
+            manifest = None if wait else asset_cache_get(_asset_manifests, key)[1]
+            if manifest is None:
+                manifest = asset_cache_put(_asset_manifests, key, build_asset_manifest(wait))
+    return manifest
+
+# 返回资源在页面中的引用路径（启用指纹时为带哈希的文件名）
+def asset_url(name):
+    if not ASSET_FINGERPRINT:
+        return name
+    asset = get_asset_manifest()['assets'].get(name)
+    return asset['hashed_name'] if asset else name
+
+# 模板使用的背景图片变体信息（URL 已替换为带指纹的文件名），未生成时返回 None
+def get_background_variants():
+    if not ASSET_FINGERPRINT:
+        return None
+    meta = get_asset_manifest().get('background')
+    if not meta:
+        return None
+    return {
+        'placeholder': meta['placeholder'],
+        'blurred': {fmt: asset_url(name) for fmt, name in meta['blurred'].items()},
+        'srcset': {
+            fmt: ', '.join(f'{asset_url(name)} {width}w' for name, width in entries)
+            for fmt, entries in meta['srcset'].items()
+        }
+    }
+
+# 发送带指纹的资源：按 Accept-Encoding 选择预压缩版本，并允许浏览器永久缓存
+def send_asset(asset):
+    if request.if_none_match.contains(asset['etag']):
+        response = make_response('', 304)
+    else:
+        encoding = None
+        for candidate in ('br', 'gzip'):
+            if candidate in asset['variants'] and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        response = make_response(asset['variants'][encoding] if encoding else asset['content'])
+        response.headers['Content-Type'] = asset['mimetype']
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(asset['etag'])
+    if asset['variants']:
+        response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+# 服务端图表渲染：把活动、Star 历史和语言分布数据直接渲染成内联 SVG，随页面一起缓存；
+# svg 模式下页面不再加载 Chart.js，颜色通过模板中的 CSS 类适配主题色和深色模式
+CHART_RENDERER = os.environ.get('CHART_RENDERER', 'js').lower()
+ACTIVITY_CHART_LABELS = ['一月', '二月', '三月', '四月', '五月', '六月', '七月', '八月', '九月', '十月', '十一月', '十二月']
+CHART_TENSION = 0.4
+
+# 生成 0 到不小于最大值的“整齐”刻度（步长取 1 / 2 / 5 × 10^n）
+def chart_ticks(max_value, max_ticks):
+    max_value = max(max_value, 1)
+    raw_step = max_value / max_ticks
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw_step)
+    step = max(int(step), 1)
+    top = math.ceil(max_value / step) * step
+    return list(range(0, top + 1, step))
+
+def format_chart_number(value):
+    return f'{value / 1000:.1f}k' if value >= 1000 else str(value)
+
+# 按可用宽度抽取横轴标签，避免重叠
+def chart_label_indexes(count, max_labels):
+    if count <= max_labels:
+        return list(range(count))
+    return sorted({round(i * (count - 1) / (max_labels - 1)) for i in range(max_labels)})
+
+# 与 Chart.js 相同的样条曲线（tension 0.4），控制点限制在绘图区内
+def chart_smooth_path(points, top, bottom):
+    if len(points) == 1:
+        x, y = points[0]
+        return f'M{x:.1f},{y:.1f}'
+    controls = []
+    for i, (x, y) in enumerate(points):
+        px, py = points[max(i - 1, 0)]
+        nx, ny = points[min(i + 1, len(points) - 1)]
+        d01 = math.hypot(x - px, y - py)
+        d12 = math.hypot(nx - x, ny - y)
+        total = d01 + d12 or 1
+        fa, fb = CHART_TENSION * d01 / total, CHART_TENSION * d12 / total
+        clamp = lambda value: min(max(value, top), bottom)
+        controls.append(((x - fa * (nx - px), clamp(y - fa * (ny - py))),
+                         (x + fb * (nx - px), clamp(y + fb * (ny - py)))))
+    path = [f'M{points[0][0]:.1f},{points[0][1]:.1f}']
+    for i in range(1, len(points)):
+        (c1x, c1y), (c2x, c2y) = controls[i - 1][1], controls[i][0]
+        x, y = points[i]
+        path.append(f'C{c1x:.1f},{c1y:.1f} {c2x:.1f},{c2y:.1f} {x:.1f},{y:.1f}')
+    return ' '.join(path)
+
+# 折线 / 面积图的公共部分：坐标轴刻度、网格线、曲线、填充和带 <title> 提示的数据点
+def render_line_chart_svg(values, labels, titles, css_class, width, height, max_y_ticks, max_x_labels,
+                          line_stroke, fill, point_radius, defs=''):
+    left, right, top, bottom = 34, width - 8, 8, height - 20
+    ticks = chart_ticks(max(values), max_y_ticks)
+    scale = (bottom - top) / ticks[-1]
+    step = (right - left) / max(len(values) - 1, 1)
+    points = [(left + i * step if len(values) > 1 else (left + right) / 2, bottom - v * scale)
+              for i, v in enumerate(values)]
+    parts = [f'<svg class="chart-svg {css_class}" viewBox="0 0 {width} {height}" role="img" '
+             f'preserveAspectRatio="xMidYMid meet" xmlns="http://www.w3.org/2000/svg">', defs]
+    for tick in ticks:
+        y = bottom - tick * scale
+        parts.append(f'<line class="chart-grid" x1="{left}" x2="{right}" y1="{y:.1f}" y2="{y:.1f}"/>'
+                     f'<text x="{left - 6}" y="{y + 3.5:.1f}" text-anchor="end">{format_chart_number(tick)}</text>')
+    for i in chart_label_indexes(len(labels), max_x_labels):
+        parts.append(f'<text x="{points[i][0]:.1f}" y="{height - 4}" text-anchor="middle">{escape(labels[i])}</text>')
+    line = chart_smooth_path(points, top, bottom)
+    if fill and len(points) > 1:
+        parts.append(f'<path class="chart-area" d="{line} L{points[-1][0]:.1f},{bottom} L{points[0][0]:.1f},{bottom} Z" fill="{fill}"/>')
+    parts.append(f'<path class="chart-line" d="{line}" fill="none" stroke="{line_stroke}"/>')
+    for i, ((x, y), title) in enumerate(zip(points, titles)):
+        radius = point_radius(i, len(points))
+        last = ' chart-point-last' if i == len(points) - 1 else ''
+        parts.append(f'<circle class="chart-point{last}" cx="{x:.1f}" cy="{y:.1f}" r="{radius}">'
+                     f'<title>{escape(title)}</title></circle>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+# 近 12 个月的代码提交折线图
+def render_activity_chart_svg(activity_data):
+    values = [int(v or 0) for v in activity_data[:12]]
+    if not values:
+        return None
+    labels = ACTIVITY_CHART_LABELS[:len(values)]
+    return render_line_chart_svg(
+        values, labels, [f'{label}: {value} 次提交' for label, value in zip(labels, values)],
+        'chart-activity', 400, 256, 5, 12, 'currentColor', 'currentColor',
+        lambda i, count: 3
+    )
+
+# Star 累计增长面积图（渐变填充和渐变描边）
+def render_star_history_svg(star_history):
+    if not star_history:
+        return None
+    values = [int(item['stars']) for item in star_history]
+    labels, titles = [], []
+    for i, item in enumerate(star_history):
+        year, month = item['month'].split('-')
+        labels.append(f'{int(month)}月')
+        title = f"{year} 年 {int(month)} 月: {values[i]} stars"
+        if i > 0:
+            diff = values[i] - values[i - 1]
+            title += f' (+{diff} vs 上月)' if diff > 0 else (f' ({diff} vs 上月)' if diff < 0 else ' (与上月持平)')
+        titles.append(title)
+    defs = ('<defs>'
+            '<linearGradient id="chart-star-fill" x1="0" y1="0" x2="0" y2="1">'
+            '<stop offset="0" stop-color="#f59e0b" stop-opacity="0.22"/>'
+            '<stop offset="0.5" stop-color="#fbbf24" stop-opacity="0.08"/>'
+            '<stop offset="1" stop-color="#fbbf24" stop-opacity="0"/></linearGradient>'
+            '<linearGradient id="chart-star-line" x1="0" y1="0" x2="1" y2="0">'
+            '<stop offset="0" stop-color="#f59e0b"/><stop offset="0.5" stop-color="#f97316"/>'
+            '<stop offset="1" stop-color="#ef4444"/></linearGradient></defs>')
+    return render_line_chart_svg(
+        values, labels, titles, 'chart-star', 300, 160, 4, 6,
+        'url(#chart-star-line)', 'url(#chart-star-fill)',
+        lambda i, count: 5 if i == count - 1 else (3 if count <= 12 else 0), defs
+    )
+
+def format_chart_bytes(size):
+    if size > 1048576:
+        return f'{size / 1048576:.1f} MB'
+    if size > 1024:
+        return f'{size / 1024:.1f} KB'
+    return f'{size} B'
+
+# 语言分布环形图，图例放在下方
+def render_language_chart_svg(language_distribution):
+    languages = [item for item in language_distribution if item.get('bytes')]
+    if not languages:
+        return None
+    width, radius = 300, 62
+    inner = radius * 0.55
+    cx, cy = width / 2, radius + 4
+    total = sum(item['bytes'] for item in languages)
+    
+    # 图例按估算的文字宽度自动换行并居中
+    rows, row, row_width = [], [], 0
+    for item in languages:
+        item_width = 20 + 6.5 * len(item['name'])
+        if row and row_width + item_width > width:
+            rows.append((row, row_width))
+            row, row_width = [], 0
+        row.append((item, item_width))
+        row_width += item_width
+    rows.append((row, row_width))
+    height = int(cy + radius + 14 + len(rows) * 18)
+    
+    parts = [f'<svg class="chart-svg chart-languages" viewBox="0 0 {width} {height}" role="img" '
+             f'preserveAspectRatio="xMidYMid meet" xmlns="http://www.w3.org/2000/svg">']
+    angle = -math.pi / 2
+    for item in languages:
+        span = min(2 * math.pi * item['bytes'] / total, 2 * math.pi - 1e-3)
+        end = angle + span
+        large = 1 if span > math.pi else 0
+        x0, y0 = cx + radius * math.cos(angle), cy + radius * math.sin(angle)
+        x1, y1 = cx + radius * math.cos(end), cy + radius * math.sin(end)
+        x2, y2 = cx + inner * math.cos(end), cy + inner * math.sin(end)
+        x3, y3 = cx + inner * math.cos(angle), cy + inner * math.sin(angle)
+        title = f"{item['name']}: {item['bytes'] / total * 100:.1f}% ({format_chart_bytes(item['bytes'])})"
+        parts.append(f'<path class="chart-slice" fill="{escape(item["color"])}" '
+                     f'd="M{x0:.2f},{y0:.2f} A{radius},{radius} 0 {large} 1 {x1:.2f},{y1:.2f} '
+                     f'L{x2:.2f},{y2:.2f} A{inner:.2f},{inner:.2f} 0 {large} 0 {x3:.2f},{y3:.2f} Z">'
+                     f'<title>{escape(title)}</title></path>')
+        angle = end
+    y = cy + radius + 20
+    for row, row_width in rows:
+        x = (width - row_width) / 2
+        for item, item_width in row:
+            parts.append(f'<circle cx="{x + 5:.1f}" cy="{y - 4}" r="4" fill="{escape(item["color"])}"/>'
+                         f'<text x="{x + 13:.1f}" y="{y}">{escape(item["name"])}</text>')
+            x += item_width
+        y += 18
+    parts.append('</svg>')
+    return ''.join(parts)
+
+# 图表名称、渲染函数和对应的数据字段
+CHART_SVG_RENDERERS = (
+    ('activity', render_activity_chart_svg, 'activity_data'),
+    ('star_history', render_star_history_svg, 'star_history'),
+    ('languages', render_language_chart_svg, 'language_distribution')
+)
+
+def render_chart_svg(name, renderer, data):
+    try:
+        return renderer(data or [])
+    except Exception as e:
+        print(f"渲染 {name} 图表失败: {e}")
+        return None
+
+# 模板使用的 SVG 图表；js 模式下返回 None，由 Chart.js 在浏览器中绘制
+def render_chart_svgs(github_info):
+    if CHART_RENDERER != 'svg':
+        return None
+    return {name: render_chart_svg(name, renderer, github_info.get(field))
+            for name, renderer, field in CHART_SVG_RENDERERS}
+
+# 模板使用的 Tailwind 样式表：{'href': 指纹文件名} 或 {'inline': CSS}，未生成时返回 None（回退到 CDN）
+def get_tailwind_stylesheet():
+    if not TAILWIND_BUILD:
+        return None
+    asset = get_asset_manifest()['assets'].get(TAILWIND_ASSET_NAME)
+    if not asset:
+        return None
+    if TAILWIND_INLINE or not ASSET_FINGERPRINT:
+        return {'inline': asset['content'].decode('utf-8')}
+    return {'href': asset['hashed_name']}
+
+# 首页模板的上下文
+def index_template_context(github_info, chart_svgs):
+    background_exists, background_path = resolve_background()
+    return {
+        'github_info': github_info,
+        'config': current_config(),
+        'now': datetime.now(),
+        'background_exists': background_exists,
+        'background_path': asset_url(background_path),
+        'background_variants': get_background_variants() if background_exists else None,
+        'tailwind_css': get_tailwind_stylesheet(),
+        'chart_svgs': chart_svgs
+    }
+
+# 渲染首页 HTML
+def render_index_html(github_info):
+    started = time.perf_counter()
+    html = render_template('index.html', **index_template_context(github_info, render_chart_svgs(github_info)))
+    metrics.observe('homepage_render_duration_seconds', time.perf_counter() - started, stage='template')
+    return html
+
+# 流式渲染：没有可用缓存时，各部分数据并发获取，模板按顺序输出，遇到尚未就绪的部分才等待；
+# <head>（样式表、脚本）不依赖 GitHub 数据，会立即发送，浏览器可以提前下载 CSS 和字体
+STREAM_RENDER = os.environ.get('STREAM_RENDER', '0') == '1'
+STREAM_WORKERS = 16
+
+# 值可以是 Future 的字典，读取时才等待结果（模板按顺序访问，未就绪的部分阻塞输出）
+class LazyDict(dict):
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if isinstance(value, Future):
+            value = value.result()
+            super().__setitem__(key, value)
+        return value
+    
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+# 以 Future 的形式提交 get_github_user_info 的各部分，复用分段缓存；资料获取失败时各部分使用默认值
+def start_github_user_info(executor):
+    defaults = default_github_info()
+    if GITHUB_DATA_SOURCE == 'graphql':
+        whole = executor.submit(get_cached_github_info)
+        return LazyDict({key: executor.submit(lambda key=key: whole.result().get(key, defaults[key])) for key in defaults})
+    
+    username = get_github_username()
+    profile = executor.submit(get_section, username, 'recent_repos', fetch_github_profile, username)
+    
+    def from_profile(key, transform):
+        def task():
+            result = profile.result()
+            return transform(result) if result else defaults[key]
+        return executor.submit(task)
+    
+    def section(name, builder):
+        def task():
+            result = profile.result()
+            value = get_section(username, name, builder, username, result['repos']) if result else None
+            return defaults[name] if value is None else value
+        return executor.submit(task)
+    
+    def readme():
+        value = get_section(username, 'readme_content', get_readme_content, username)
+        return defaults['readme_content'] if value is None else value
+    
+    return LazyDict({
+        "avatar_url": from_profile('avatar_url', lambda p: p['avatar_url']),
+        "name": from_profile('name', lambda p: p['name']),
+        "bio": current_config().get('bio', 'Python Developer'),
+        "total_repos": from_profile('total_repos', lambda p: p['total_repos']),
+        "total_stars": from_profile('total_stars', lambda p: p['total_stars']),
+        "readme_content": executor.submit(readme),
+        "recent_repos": from_profile('recent_repos', lambda p: p['repos'][:5]),
+        "activity_data": section('activity_data', get_github_activity_data),
+        "tech_stack": from_profile('tech_stack', lambda p: analyze_tech_stack(p['repos'])),
+        "language_distribution": section('language_distribution', get_language_distribution),
+        "star_history": section('star_history', get_star_history)
+    })
+
+def stream_index_html():
+    executor = ThreadPoolExecutor(max_workers=STREAM_WORKERS, thread_name_prefix='stream-section',
+                                  initializer=_tenant_context.set, initargs=(current_tenant(),))
+    github_info = start_github_user_info(executor)
+    chart_svgs = None
+    if CHART_RENDERER == 'svg':
+        chart_svgs = LazyDict({
+            name: executor.submit(lambda name=name, renderer=renderer, field=field:
+                                  render_chart_svg(name, renderer, github_info.get(field)))
+            for name, renderer, field in CHART_SVG_RENDERERS
+        })
+    context = index_template_context(github_info, chart_svgs)
+    app.update_template_context(context)
+    template = app.jinja_env.get_template('index.html')
+    chunks = queue.Queue()
+    
+    # 在单独的线程中渲染模板，输出线程把已生成的内容合并后发送，等待数据时自然形成一个分块
+    @copy_current_request_context
+    def produce():
+        started = time.perf_counter()
+        try:
+            for chunk in template.generate(context):
+                chunks.put(chunk)
+        except Exception as e:
+            print(f"流式渲染失败: {type(e).__name__}: {e}")
+        finally:
+            metrics.observe('homepage_render_duration_seconds', time.perf_counter() - started, stage='stream')
+            chunks.put(None)
+            executor.shutdown(wait=False)
+    
+    def generate():
+        finished = False
+        while not finished:
+            parts = [chunks.get()]
+            while parts[-1] is not None:
+                try:
+                    parts.append(chunks.get_nowait())
+                except queue.Empty:
+                    break
+            if parts[-1] is None:
+                parts.pop()
+                finished = True
+            if parts:
+                yield ''.join(parts)
+    
+    threading.Thread(target=produce, name='stream-render', daemon=True).start()
+    response = Response(stream_with_context(generate()), mimetype='text/html')
+    tailwind_css = context['tailwind_css']
+    if tailwind_css and tailwind_css.get('href'):
+        response.headers['Link'] = f"<{request.script_root}/{tailwind_css['href']}>; rel=preload; as=style"
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# 页面输出优化：压缩 HTML 以及内联的 CSS / JS，内联 Tailwind 样式表，
+# 并把非关键样式表（Font Awesome、academicons）改为异步加载；
+# 结果随整页缓存按数据版本保存，只在重新渲染时计算一次
+HTML_OPTIMIZE = os.environ.get('HTML_OPTIMIZE', '1') != '0'
+# 异步加载的样式表（按 href 中的关键字匹配）
+DEFERRED_STYLESHEETS = ('font-awesome', 'academicons')
+# 内容需要原样保留的标签
+HTML_RAW_TAGS = ('script', 'style', 'pre', 'textarea')
+HTML_RAW_PATTERN = re.compile(r'<(script|style|pre|textarea)\b[^>]*>.*?</\1\s*>|<!--.*?-->', re.S | re.I)
+JS_REGEX_PREFIX_CHARS = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_PREFIX_WORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'throw', 'delete', 'new', 'instanceof'}
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+# 保守的 JS 压缩：去掉注释和缩进，保留必要的换行（自动分号插入），不改写任何标识符
+def minify_js(source):
+    out = []
+    last, last_word = '', ''
+    i, n = 0, len(source)
+    
+    def emit(text):
+        nonlocal last, last_word
+        out.append(text)
+        stripped = text.rstrip()
+        if stripped:
+            last = stripped[-1]
+            match = re.search(r'[\w$]+$', stripped)
+            last_word = match.group(0) if match else ''
+    
+    while i < n:
+        c = source[i]
+        if c in '\'"`':
+            j = i + 1
+            while j < n and source[j] != c:
+                j += 2 if source[j] == '\\' else 1
+            emit(source[i:j + 1])
+            i = j + 1
+        elif c == '/' and source.startswith('//', i):
+            while i < n and source[i] not in '\r\n':
+                i += 1
+        elif c == '/' and source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end < 0 else end + 2
+            if out and not out[-1].isspace():
+                out.append(' ')
+        elif c == '/' and (not last or last in JS_REGEX_PREFIX_CHARS or last_word in JS_REGEX_PREFIX_WORDS):
+            # 正则字面量
+            j, in_class = i + 1, False
+            while j < n and (in_class or source[j] != '/') and source[j] not in '\r\n':
+                if source[j] == '\\':
+                    j += 1
+                elif source[j] == '[':
+                    in_class = True
+                elif source[j] == ']':
+                    in_class = False
+                j += 1
+            j += 1
+            while j < n and (source[j].isalnum()):
+                j += 1
+            emit(source[i:j])
+            i = j
+        elif c.isspace():
+            j = i
+            while j < n and source[j].isspace():
+                j += 1
+            nxt = source[j] if j < n else ''
+            if '\n' in source[i:j]:
+                # 换行可能参与自动分号插入，只在确定无影响时去掉
+                if out and last not in '{;,([' and nxt not in '})]' and nxt:
+                    out.append('\n')
+            elif out and nxt and (re.match(r'[\w$\\]', last) and re.match(r'[\w$\\]', nxt)
+                                  or last + nxt in ('++', '--', '+-', '-+')):
+                out.append(' ')
+            i = j
+        else:
+            j = i
+            while j < n and source[j] not in '\'"`/' and not source[j].isspace():
+                j += 1
+            emit(source[i:max(j, i + 1)])
+            i = max(j, i + 1)
+    return ''.join(out).strip()
+
+# 把 <link rel="stylesheet"> 改为异步加载，不支持脚本时由 <noscript> 回退
+def defer_stylesheet(tag):
+    deferred = tag[:-1].rstrip('/ ') + ' media="print" onload="this.media=\'all\'">'
+    return f'{deferred}<noscript>{tag}</noscript>'
+
+# Tailwind 样式表在构建时已经按模板精简过，页面用到的规则占了大部分（脚本动态添加的类也在其中），
+# 所以整份内联并去掉 <link>，不再拆成首屏部分加异步加载的完整样式表（那样会重复下载一遍）
+def optimize_html(html):
+    tailwind = get_asset_manifest()['assets'].get(TAILWIND_ASSET_NAME) if TAILWIND_BUILD else None
+    
+    def rewrite_link(match):
+        tag = match.group(0)
+        if not re.search(r'rel=["\']?stylesheet', tag):
+            return tag
+        href = (re.search(r'href=["\']([^"\']+)', tag) or [None, ''])[1]
+        if tailwind and href == tailwind['hashed_name']:
+            return f"<style>{tailwind['content'].decode('utf-8')}</style>"
+        if any(keyword in href for keyword in DEFERRED_STYLESHEETS):
+            return defer_stylesheet(tag)
+        return tag
+    
+    html = re.sub(r'<link\b[^>]*>', rewrite_link, html)
+    
+    # 逐段压缩：原样保留 pre / textarea，压缩 script / style 内容，删除普通注释，其余折叠空白；
+    # <head> 中标签之间的空白不影响显示，直接去掉
+    body_start = html.find('<body')
+    
+    def collapse(start, end):
+        text = re.sub(r'\s+', ' ', html[start:end])
+        if end <= body_start:
+            text = re.sub(r'\s*(<[^>]*>)\s*', r'\1', text).strip()
+        return text
+    
+    parts, position = [], 0
+    for match in HTML_RAW_PATTERN.finditer(html):
+        parts.append(collapse(position, match.start()))
+        segment = match.group(0)
+        tag = (match.group(1) or '').lower()
+        if tag in ('script', 'style'):
+            open_end = segment.index('>') + 1
+            close_start = segment.lower().rindex('</')
+            open_tag, content = segment[:open_end], segment[open_end:close_start]
+            type_match = re.search(r'type=["\']?([\w/+-]+)', open_tag)
+            if tag == 'style':
+                content = minify_css(content)
+            elif not type_match or type_match.group(1) in ('text/javascript', 'module', 'application/javascript'):
+                content = minify_js(content)
+            segment = open_tag + content + segment[close_start:]
+        elif not tag and not segment.startswith('<!--['):
+            segment = ''
+        parts.append(segment)
+        position = match.end()
+    parts.append(collapse(position, len(html)))
+    return ''.join(parts).strip()
+
+# 渲染并优化首页，供页面缓存和静态构建共用
+def render_page_html(github_info):
+    html = render_index_html(github_info)
+    if not HTML_OPTIMIZE:
+        return html
+    started = time.perf_counter()
+    try:
+        return optimize_html(html)
+    except Exception as e:
+        print(f"页面优化失败，使用未优化的 HTML: {e}")
+        return html
+    finally:
+        metrics.observe('homepage_render_duration_seconds', time.perf_counter() - started, stage='optimize')
+
+# 整页缓存：按数据版本保存渲染结果、强 ETag 以及预压缩的 gzip / brotli 内容
+PAGE_CACHE = os.environ.get('PAGE_CACHE', '1') != '0'
+# 每位用户缓存一份页面，最多保留的用户数（最久未访问的先淘汰）
+PAGE_CACHE_MAX_ENTRIES = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', '64'))
+_page_cache = OrderedDict()  # 用户 -> (数据版本, 页面)
+_page_lock = threading.Lock()
+_page_flight = SingleFlight()
+
+def build_page(html):
+    body = html.encode('utf-8')
+    page = {
+        'etag': hashlib.sha256(body).hexdigest()[:32],
+        'identity': body,
+        'gzip': gzip.compress(body, compresslevel=9)
+    }
+    if brotli is not None:
+        page['br'] = brotli.compress(body, quality=11)
+    return page
+
+# 获取当前数据版本对应的页面，版本变化（数据刷新、跨年、用户配置变化、背景图片变体生成完成）时才重新渲染
+def get_rendered_page(entry):
+    tenant = current_tenant()
+    version = (tenant, entry['cache_time'], datetime.now().year, get_tenants()['revision'], _background_builds['revision'])
+    with _page_lock:
+        cached = _page_cache.get(tenant)
+        if cached and cached[0] == version:
+            _page_cache.move_to_end(tenant)
+            metrics.inc('homepage_cache_requests_total', cache='page', result='hit')
+            return cached[1]
+    metrics.inc('homepage_cache_requests_total', cache='page', result='miss')
+    
+    def render():
+        page = build_page(render_page_html(entry['github_info']))
+        with _page_lock:
+            _page_cache[tenant] = (version, page)
+            _page_cache.move_to_end(tenant)
+            while len(_page_cache) > PAGE_CACHE_MAX_ENTRIES:
+                _page_cache.popitem(last=False)
+                metrics.inc('homepage_cache_evictions_total', cache='page')
+        return page
+    
+    return _page_flight.do(version, render)
+
+# 按 If-None-Match / Accept-Encoding 返回缓存的页面
+def send_page(page):
+    if request.if_none_match.contains(page['etag']):
+        response = make_response('', 304)
+    else:
+        encoding = 'identity'
+        if 'br' in page and request.accept_encodings['br']:
+            encoding = 'br'
+        elif request.accept_encodings['gzip']:
+            encoding = 'gzip'
+        response = make_response(page[encoding])
+        response.headers['Content-Type'] = 'text/html; charset=utf-8'
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(page['etag'])
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# 把请求所属的用户记入上下文（供后台任务继承），并记录访问时间供定时刷新使用
+@app.before_request
+def select_tenant():
+    tenant = request.environ.get('homepage.tenant')
+    _tenant_context.set(tenant)
+    if tenant:
+        _tenant_last_seen[tenant] = time.time()
+
 @app.route('/')
 def index():
     try:
-        global _cache
-        current_time = time.time()
-        
-        if _cache['github_info'] and (current_time - _cache['cache_time'] < CACHE_TTL):
-            github_info = _cache['github_info']
-        else:
-            github_info = get_github_user_info()
-            _cache['github_info'] = github_info
-            _cache['cache_time'] = current_time
-        
-        # 补全 contact
-        default_contact = {
-            "cv": "", "qq": "", "wechat": "", "bilibili": "",
-            "douyin": "", "xiaohongshu": "", "google_scholar": "", "kaggle": ""
-        }
-        if 'contact' not in config:
-            config['contact'] = default_contact
+        if STREAM_RENDER:
+            entry = peek_cached_github_info_entry()
+            if entry is None:
+                return stream_index_html()
+        elif PROGRESSIVE_RENDER:
+            entry = peek_cached_github_info_entry() or build_shell_entry()
         else:
-            for key, value in default_contact.items():
-                if key not in config['contact']:
-                    config['contact'][key] = value
-
-        # 检查背景图片
-        background_image = config.get('background', {}).get('image', 'background.png')
-        possible_paths = [
-            os.path.join(BASE_DIR, background_image),
-            os.path.join(BASE_DIR, 'static', background_image)
-        ]
-        
-        background_exists = False
-        background_path = background_image
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                background_exists = True
-                if 'static' in path:
-                    background_path = f'/static/{background_image}'
-                break
-        
-        return render_template('index.html', 
-                              github_info=github_info, 
-                              config=config,
-                              now=datetime.now(),
-                              background_exists=background_exists,
-                              background_path=background_path)
+            entry = get_cached_github_info_entry()
+        if not PAGE_CACHE:
+            return render_page_html(entry['github_info'])
+        return send_page(get_rendered_page(entry))
     except Exception as e:
         import traceback
         error_detail = traceback.format_exc()
@@ -1061,141 +3537,231 @@ def index():
 
 @app.route('/api/config')
 def get_config():
-    return jsonify(config)
+    return jsonify(current_config())
+
+# Prometheus 指标；配额为抓取时的快照
+@app.route('/metrics')
+def get_metrics():
+    if not METRICS_ENABLED:
+        abort(404)
+    if METRICS_TOKEN:
+        import hmac
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.strip(), METRICS_TOKEN):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain',
+                            headers={'WWW-Authenticate': 'Bearer realm="metrics"'})
+    metrics.set('homepage_tenants', len(get_tenants()['configs']))
+    for resource, info in get_rate_limit_status()['resources'].items():
+        metrics.set('homepage_github_rate_limit_remaining', info['remaining'], resource=resource)
+        metrics.set('homepage_github_rate_limit_limit', info['limit'], resource=resource)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# 各部分的 JSON 接口，带 ETag 以便浏览器条件请求；图表在 svg 模式下附带服务端渲染的 SVG
+def send_section_json(data):
+    if data is None:
+        return jsonify({'error': '数据暂时不可用'}), 503
+    response = jsonify(data)
+    response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+# fragments: {字段名: sections.html 中的宏名}，渐进式加载时随数据返回渲染好的片段
+def chart_section_json(name, renderer, fragments=None):
+    value = get_github_section(name)
+    if value is None:
+        return send_section_json(None)
+    data = {name: value, 'svg': renderer(value) if CHART_RENDERER == 'svg' else None}
+    for field, macro in (fragments or {}).items():
+        data[field] = str(get_template_attribute('sections.html', macro)(value))
+    return send_section_json(data)
+
+@app.route('/api/activity')
+def get_activity():
+    return chart_section_json('activity_data', render_activity_chart_svg)
+
+@app.route('/api/star-history')
+def get_star_history_api():
+    return chart_section_json('star_history', render_star_history_svg, {'star_growth_html': 'star_growth'})
+
+@app.route('/api/languages')
+def get_languages():
+    return chart_section_json('language_distribution', render_language_chart_svg)
+
+@app.route('/api/repos')
+def get_repos():
+    profile = get_github_section('recent_repos')
+    if profile is None:
+        return send_section_json(None)
+    recent_repos = profile['repos'][:5]
+    return send_section_json({
+        'avatar_url': profile['avatar_url'],
+        'name': profile['name'],
+        'total_repos': profile['total_repos'],
+        'total_stars': profile['total_stars'],
+        'tech_stack': profile['tech_stack'],
+        'recent_repos': recent_repos,
+        'tech_stack_html': str(get_template_attribute('sections.html', 'tech_stack_tags')(profile['tech_stack'])),
+        'recent_repos_html': str(get_template_attribute('sections.html', 'repo_list')(recent_repos))
+    })
+
+@app.route('/api/readme')
+def get_readme():
+    readme_content = get_github_section('readme_content')
+    return send_section_json({'readme_content': readme_content} if readme_content is not None else None)
+
+# 只允许访问特定的文件类型
+ALLOWED_STATIC_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.svg', '.css', '.js', '.ico', '.webp', '.avif'}
+# 启动时把允许访问的文件预加载到内存；超过阈值的大文件使用 mmap 映射
+STATIC_PRELOAD = os.environ.get('STATIC_PRELOAD', '1') != '0'
+STATIC_MMAP_THRESHOLD = int(os.environ.get('STATIC_MMAP_THRESHOLD', str(1024 * 1024)))
+STATIC_CHUNK_SIZE = 64 * 1024
+# 预加载时跳过的目录
+STATIC_EXCLUDED_DIRS = {'static_build', 'build', '__pycache__', 'templates', 'node_modules', 'venv'}
+_static_table = None
+_static_lock = threading.Lock()
+
+def load_static_entry(path):
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= STATIC_MMAP_THRESHOLD:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+    return {
+        'data': data,
+        'length': len(data),
+        'etag': hashlib.sha256(data).hexdigest()[:32],
+        'mimetype': guess_mimetype(path),
+        'last_modified': datetime.utcfromtimestamp(int(os.path.getmtime(path)))
+    }
+
+# 静态文件表 {相对路径: entry}，首次使用时扫描 BASE_DIR 构建
+def get_static_table():
+    global _static_table
+    if _static_table is None:
+        with _static_lock:
+            if _static_table is None:
+                table = {}
+                for root, dirs, files in os.walk(BASE_DIR):
+                    dirs[:] = [d for d in dirs if not d.startswith('.') and d not in STATIC_EXCLUDED_DIRS]
+                    for file in files:
+                        if os.path.splitext(file)[1].lower() not in ALLOWED_STATIC_EXTENSIONS:
+                            continue
+                        path = os.path.join(root, file)
+                        try:
+                            table[os.path.relpath(path, BASE_DIR).replace(os.sep, '/')] = load_static_entry(path)
+                        except Exception as e:
+                            print(f"预加载静态文件失败 {path}: {e}")
+                _static_table = table
+                print(f"已预加载 {len(table)} 个静态文件")
+    return _static_table
+
+# 分块输出 mmap 内容，Range 请求由 werkzeug 在此基础上截取
+def iter_static_chunks(data):
+    for offset in range(0, len(data), STATIC_CHUNK_SIZE):
+        yield data[offset:offset + STATIC_CHUNK_SIZE]
+
+# 从内存返回静态文件，支持 If-None-Match / If-Modified-Since 和 Range 请求
+def send_static_entry(entry):
+    data = entry['data']
+    body = data if isinstance(data, bytes) else iter_static_chunks(data)
+    response = Response(body, mimetype=entry['mimetype'])
+    response.headers['Content-Length'] = str(entry['length'])
+    response.set_etag(entry['etag'])
+    response.last_modified = entry['last_modified']
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request, accept_ranges=True, complete_length=entry['length'])
 
 # 提供根目录下的静态文件访问
 @app.route('/<path:filename>')
 def serve_root_file(filename):
-    # 只允许访问特定的文件类型
-    allowed_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.svg', '.css', '.js'}
     file_ext = os.path.splitext(filename)[1].lower()
     
-    if file_ext in allowed_extensions:
+    # 带指纹的资源从内存中的资源清单返回
+    if ASSET_FINGERPRINT:
+        asset = get_asset_manifest()['hashed'].get(filename)
+        if asset:
+            return send_asset(asset)
+    
+    if file_ext in ALLOWED_STATIC_EXTENSIONS:
+        if STATIC_PRELOAD:
+            entry = get_static_table().get(filename)
+            if entry:
+                return send_static_entry(entry)
         try:
-            return send_from_directory(os.getcwd(), filename)
+            return send_from_directory(BASE_DIR, filename)
         except FileNotFoundError:
             abort(404)
     
     # 对于不允许的文件类型，返回404
     abort(404)
 
+# 内容有变化时才写入文件，返回是否写入
+def write_file_if_changed(path, content):
+    try:
+        with open(path, 'rb') as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(content).digest():
+                return False
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
 def generate_static_html():
     """
     生成静态HTML文件，用于部署到GitHub Pages
+    使用与在线服务相同的 GitHub 数据；只重写内容发生变化的文件
     """
     print("开始生成静态HTML文件...")
     
-    # 创建静态文件目录
-    static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static_build')
-    if not os.path.exists(static_dir):
-        os.makedirs(static_dir)
-    else:
-        # 清空目录中的所有文件
-        for file in os.listdir(static_dir):
-            file_path = os.path.join(static_dir, file)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
+    # 创建静态文件目录（不再清空，未变化的文件保持原样）
+    static_dir = os.path.join(BASE_DIR, 'static_build')
+    os.makedirs(static_dir, exist_ok=True)
     
     try:
-        # 确保配置已加载
-        if 'config' not in globals():
-            print("加载配置文件...")
-            try:
-                with open('config.json', 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-            except FileNotFoundError:
-                # 默认配置
-                config = {
-                    "github_url": "https://github.com/example",
-                    "dark_mode": "auto",
-                    "name": "Example User",
-                    "bio": "Python Developer",
-                    "introduction_file": "Introduction.md",
-                    "github_token": "",
-                    "theme": {
-                        "primary_color": "#6a11cb",
-                        "secondary_color": "#2575fc"
-                    },
-                    "background": {
-                        "image": "background.png",
-                        "blur": 8,
-                        "overlay_opacity": 0.6,
-                        "overlay_color": "#121212"
-                    }
-                }
-        
-        # 读取介绍内容
-        introduction_content = ""
-        if 'introduction_file' in config and os.path.exists(config['introduction_file']):
-            try:
-                with open(config['introduction_file'], 'r', encoding='utf-8') as f:
-                    introduction_content = f.read()
-                # 转换Markdown为HTML
-                introduction_content = markdown.markdown(introduction_content)
-            except Exception as e:
-                print(f"警告：无法读取或解析介绍文件: {e}")
-        
-        # 创建一个临时的Jinja2环境来渲染模板
-        template_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
-        env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(template_dir),
-            autoescape=jinja2.select_autoescape(['html', 'xml'])
-        )
-        
-        # 获取模板
-        template = env.get_template('index.html')
-        
-        # 准备渲染参数
-        render_args = {
-            'config': config,
-            'introduction_content': introduction_content,
-            'tech_stack': [],  # 由于没有GitHub数据，这里使用空列表
-            'activity_data': [],  # 由于没有GitHub数据，这里使用空列表
-            'error_message': None,
-            'github_info': {
-                'name': config.get('name', 'Example User'),
-                'bio': config.get('bio', ''),
-                'avatar_url': 'https://avatars.githubusercontent.com/u/10000000?v=4',  # 默认头像
-                'html_url': config.get('github_url', 'https://github.com/example'),
-                'public_repos': 0,
-                'followers': 0,
-                'activity_data': []  # 添加可序列化的activity_data键
-            },
-            'now': datetime.now()  # 添加当前时间对象，用于显示年份
-        }
+        # 获取与在线服务相同的数据
+        github_info = get_github_user_info()
+        # 先同步生成背景图片变体，页面中才会引用它们
+        manifest = get_asset_manifest(wait=True)
         
         # 渲染模板
         print("渲染HTML模板...")
-        html_content = template.render(**render_args)
-        
-        # 保存HTML文件
-        html_path = os.path.join(static_dir, 'index.html')
-        with open(html_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print(f"静态HTML文件已保存到: {html_path}")
-        
-        # 复制必要的静态资源
-        resources_to_copy = []
-        # 检查是否有背景图片
-        if 'background' in config and 'image' in config['background']:
-            background_image = config['background']['image']
-            if os.path.exists(background_image):
-                resources_to_copy.append(background_image)
-        
-        # 检查一些常见的资源文件
-        for file in ['background.jpg', '1background.jpg', 'favicon.ico']:
-            if os.path.exists(file):
-                resources_to_copy.append(file)
-        
-        # 复制资源文件
-        for resource in resources_to_copy:
-            try:
-                dst = os.path.join(static_dir, os.path.basename(resource))
-                shutil.copy(resource, dst)
-                print(f"已复制资源文件: {resource}")
-            except Exception as e:
-                print(f"警告：无法复制资源文件 {resource}: {e}")
+        with app.test_request_context('/'):
+            html_content = render_page_html(github_info)
+        
+        outputs = {'index.html': html_content.encode('utf-8')}
+        
+        # 静态资源：保留原文件名，另外输出带指纹的文件及其 .gz / .br 版本
+        for name, asset in manifest['assets'].items():
+            # 生成的背景变体只以带指纹的文件名发布
+            if not asset.get('generated'):
+                outputs[name] = asset['content']
+            if ASSET_FINGERPRINT:
+                outputs[asset['hashed_name']] = asset['content']
+                if 'gzip' in asset['variants']:
+                    outputs[asset['hashed_name'] + '.gz'] = asset['variants']['gzip']
+                if 'br' in asset['variants']:
+                    outputs[asset['hashed_name'] + '.br'] = asset['variants']['br']
+        
+        # 写入有变化的文件
+        written = 0
+        for name, content in outputs.items():
+            if write_file_if_changed(os.path.join(static_dir, name), content):
+                written += 1
+                print(f"已更新: {name}")
+        
+        # 删除本次构建不再产生的旧文件
+        for file in os.listdir(static_dir):
+            file_path = os.path.join(static_dir, file)
+            if file not in outputs and os.path.isfile(file_path):
+                os.remove(file_path)
+                print(f"已删除过期文件: {file}")
+        
+        print(f"静态文件已保存到: {static_dir}（{written} 个文件有更新，{len(outputs) - written} 个未变化）")
         
         print("\n静态文件生成成功！")
         print(f"\n如何部署到GitHub Pages:")
@@ -1220,11 +3786,70 @@ def generate_static_html():
     
     return True
 
+# 预先生成背景图片变体（config.json 和所有用户配置中的背景）到 BACKGROUND_BUILD_DIR，随代码一起部署；
+# 部署环境（如 Vercel）因此不需要 Pillow，冷启动也不必生成图片。删除不再使用的旧变体目录
+def build_background_assets():
+    if not BACKGROUND_PIPELINE:
+        print("BACKGROUND_PIPELINE=0，跳过背景图片变体")
+        return True
+    if load_pillow() is None:
+        print("错误：生成背景图片变体需要 Pillow（pip install -r requirements-build.txt）")
+        return False
+    
+    tenants = [None] + (sorted(get_tenants()['configs']) if TENANTS_DIR else [])
+    keep = set()
+    for tenant in tenants:
+        token = _tenant_context.set(tenant)
+        try:
+            background = current_config().get('background', {})
+            name = background.get('image')
+            if not name or os.path.splitext(name)[1].lower() not in BACKGROUND_RASTER_EXTENSIONS:
+                continue
+            try:
+                with open(os.path.join(BASE_DIR, name), 'rb') as f:
+                    content = f.read()
+            except OSError as e:
+                print(f"警告：无法读取背景图片 {name}: {e}")
+                continue
+            blur = background.get('blur', 0)
+            variants_key = background_variants_key(name, content, blur)
+            keep.add(variants_key)
+            variants_dir = os.path.join(BACKGROUND_BUILD_DIR, variants_key)
+            if read_background_variants(variants_dir):
+                print(f"背景图片变体已是最新: {name} ({variants_key})")
+                continue
+            variants = read_background_variants(os.path.join(BACKGROUND_CACHE_DIR, variants_key)) \
+                or build_background_variants(name, content, blur)
+            write_background_variants(variants_dir, variants)
+            print(f"已生成背景图片变体: {name} -> {os.path.relpath(variants_dir, BASE_DIR)}")
+        finally:
+            _tenant_context.reset(token)
+    
+    if os.path.isdir(BACKGROUND_BUILD_DIR):
+        for entry in os.listdir(BACKGROUND_BUILD_DIR):
+            if entry not in keep:
+                import shutil
+                shutil.rmtree(os.path.join(BACKGROUND_BUILD_DIR, entry), ignore_errors=True)
+                print(f"已删除不再使用的背景图片变体: {entry}")
+    return True
+
+# 构建命令：generate_static 生成静态站点，build_assets 预先生成背景图片变体
+BUILD_COMMAND = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] in ('generate_static', 'build_assets') else None
+
+# 启动时预热缓存（构建时不需要）
+if CACHE_WARMUP and not BUILD_COMMAND:
+    warm_up_cache()
+
+# 多用户模式下启动定时刷新
+if TENANTS_DIR and TENANT_SCHEDULER and not BUILD_COMMAND:
+    start_tenant_scheduler()
 
 if __name__ == '__main__':
-    # 检查是否需要生成静态HTML
-    if len(sys.argv) > 1 and sys.argv[1] == 'generate_static':
+    # 检查是否需要生成静态HTML或背景图片变体
+    if BUILD_COMMAND == 'generate_static':
         generate_static_html()
+    elif BUILD_COMMAND == 'build_assets':
+        sys.exit(0 if build_background_assets() else 1)
     else:
         # 设置环境变量，使得 GitHub Pages 能够正确运行
         os.environ['FLASK_APP'] = 'app.py'
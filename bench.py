@@ -0,0 +1,933 @@
+"""
+离线基准测试：用本地生成的 GitHub 替身（REST / GraphQL / raw README）代替 api.github.com，
+测量 get_github_user_info、get_github_activity_data、get_star_history、get_language_distribution
+和首页 index() 在冷启动、热缓存、部分过期三种路径下的耗时、上游调用次数和传输字节数。
+
+用法:
+    python bench.py                                   # 默认规模 5/100/1000 个仓库，最多 50k star
+    python bench.py --profiles 100:5000 --latency 80 --error-rate 0.05
+    python bench.py --json result.json                # 保存结果
+    python bench.py --baseline result.json            # 与上次结果对比，出现回归时退出码为 1
+    python bench.py --check-import                    # 只检查 import app 的耗时预算和按需导入的模块
+    python bench.py --check-redis                     # 用本地 Redis 替身检查 Redis 缓存后端
+    python bench.py --check-graphql                   # 检查 GraphQL 数据源与 REST 的映射和分段缓存
+    python bench.py --check-activity                  # 检查事件分页失败后增量活动统计能否补齐
+
+每个 (规模, 测量目标) 在独立的子进程中运行，使用临时缓存目录，保证冷启动路径不受其他测量影响。
+其他环境变量（GITHUB_DATA_SOURCE、STREAM_RENDER、ACTIVITY_INCREMENTAL 等）原样传给子进程。
+bg ms 是后台线程中重建数据的耗时，asset ms 是构建资源清单（Tailwind 样式表、背景图片变体）的耗时，
+后者在冷启动时包含在首个请求的 wall ms 中；BACKGROUND_PIPELINE、STATIC_PRELOAD 等保持默认值。
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import shutil
+import threading
+import contextlib
+import subprocess
+from datetime import datetime, timedelta
+from urllib.parse import urlparse, parse_qs
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_PROFILES = '5:50,100:5000,1000:50000'
+TARGETS = ('user_info', 'activity', 'star_history', 'languages', 'index')
+SCENARIOS = ('cold', 'warm', 'stale')
+# 启动时不应导入的模块（首次使用时才导入）和 import app 的耗时预算
+LAZY_MODULES = ('requests', 'urllib3', 'markdown', 'PIL', 'yaml', 'sqlite3', 'tailwind_css')
+IMPORT_BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', '300'))
+IMPORT_RUNS = 5
+# 部分过期场景中过期的分段：TTL 最短的两段（与线上 30 分钟后的状态一致），其余分段保持新鲜
+STALE_SECTIONS = ('recent_repos', 'activity_data')
+
+FIXTURE_LANGUAGES = ['Python', 'Jupyter Notebook', 'TeX', 'JavaScript', 'HTML', 'C++', 'Shell', 'MATLAB']
+FIXTURE_EVENT_TYPES = ['PushEvent', 'PushEvent', 'WatchEvent', 'CreateEvent', 'IssuesEvent']
+FIXTURE_EVENT_PAGES = 3
+FIXTURE_TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+# GitHub 替身的数据：按仓库数和总 star 数确定性地生成，不同规模之间互不影响
+class GitHubFixture:
+    def __init__(self, repo_count, star_count, seed=0):
+        self.rng = random.Random(seed)
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.versions = {}
+        self.event_base = 10_000_000
+
+        # star 数按 Zipf 分布分给各仓库，余数归第一个仓库
+        weights = [1.0 / (i + 1) for i in range(repo_count)]
+        total_weight = sum(weights)
+        stars = [int(star_count * w / total_weight) for w in weights]
+        if stars:
+            stars[0] += star_count - sum(stars)
+
+        self.repos = []
+        for i in range(repo_count):
+            created = self.now - timedelta(days=30 + self.rng.randint(0, 2000))
+            pushed = self.now - timedelta(hours=i * 7 + self.rng.randint(0, 6))
+            self.repos.append({
+                'name': f'repo-{i:04d}',
+                'description': f'Benchmark repository {i}',
+                'language': FIXTURE_LANGUAGES[i % len(FIXTURE_LANGUAGES)],
+                'stargazers_count': stars[i],
+                'created_at': created.strftime(FIXTURE_TIME_FORMAT),
+                'pushed_at': pushed.strftime(FIXTURE_TIME_FORMAT),
+                'fork': i % 7 == 6
+            })
+        self.repos_by_name = {repo['name']: repo for repo in self.repos}
+
+    # 模拟一段时间后的上游变化：部分仓库新增 star 和提交，用户有新事件
+    def mutate(self, fraction):
+        count = max(1, int(len(self.repos) * fraction)) if self.repos else 0
+        for repo in self.rng.sample(self.repos, count):
+            repo['stargazers_count'] += 1
+            repo['pushed_at'] = self.now.strftime(FIXTURE_TIME_FORMAT)
+            self.versions[repo['name']] = self.versions.get(repo['name'], 0) + 1
+        self.versions['events'] = self.versions.get('events', 0) + 1
+        self.versions['repos'] = self.versions.get('repos', 0) + 1
+
+    def version(self, name):
+        return self.versions.get(name, 0)
+
+    def repo_json(self, login, repo):
+        return dict(repo, full_name=f"{login}/{repo['name']}", html_url=f"https://github.com/{login}/{repo['name']}",
+                    languages_url=f"https://api.github.com/repos/{login}/{repo['name']}/languages",
+                    owner={'login': login}, private=False, size=1000, watchers_count=repo['stargazers_count'])
+
+    def user(self, login):
+        return {'login': login, 'name': f'Bench {login}', 'avatar_url': f'https://avatars.githubusercontent.com/{login}',
+                'public_repos': len(self.repos), 'followers': 42}, 'user'
+
+    def user_repos(self, login, page, per_page):
+        ordered = sorted(self.repos, key=lambda r: r['pushed_at'], reverse=True)
+        return [self.repo_json(login, repo) for repo in ordered[(page - 1) * per_page:page * per_page]], 'repos'
+
+    def events(self, login, page, per_page):
+        if page > FIXTURE_EVENT_PAGES:
+            return [], 'events'
+        # 每次变化在最前面追加 10 个新事件，id 递增
+        fresh = self.version('events') * 10
+        events = []
+        for k in range((page - 1) * per_page, page * per_page):
+            index = k - fresh
+            event_time = self.now - timedelta(hours=max(index, 0) * 9)
+            events.append({
+                'id': str(self.event_base + fresh - k),
+                'type': FIXTURE_EVENT_TYPES[k % len(FIXTURE_EVENT_TYPES)],
+                'actor': {'login': login},
+                'repo': {'name': f"{login}/{self.repos[k % len(self.repos)]['name']}" if self.repos else ''},
+                'created_at': event_time.strftime(FIXTURE_TIME_FORMAT)
+            })
+        return events, 'events'
+
+    def commits(self, login, repo, per_page, since):
+        count = 20 + (sum(map(ord, repo['name'])) % 80) + self.version(repo['name'])
+        commits = []
+        for k in range(min(count, per_page)):
+            commit_time = self.now - timedelta(days=k * 4, hours=k)
+            date = commit_time.strftime(FIXTURE_TIME_FORMAT)
+            if since and date < since:
+                break
+            sha = hashlib.sha1(f"{repo['name']}:{count - k}".encode()).hexdigest()
+            commits.append({'sha': sha, 'commit': {'author': {'name': login, 'date': date}, 'message': f'commit {k}'}})
+        return commits, repo['name']
+
+    def languages(self, repo):
+        seed = sum(map(ord, repo['name']))
+        primary = repo['language']
+        result = {primary: 20000 + seed * 37 + self.version(repo['name']) * 100}
+        for offset in range(1, 1 + seed % 3):
+            result[FIXTURE_LANGUAGES[(seed + offset) % len(FIXTURE_LANGUAGES)]] = 1000 + seed * offset
+        return result, repo['name']
+
+    def starred_at(self, repo, index):
+        created = datetime.strptime(repo['created_at'], FIXTURE_TIME_FORMAT)
+        span = max((self.now - created).total_seconds(), 1)
+        total = max(repo['stargazers_count'], 1)
+        return (created + timedelta(seconds=span * (index + 1) / (total + 1))).strftime(FIXTURE_TIME_FORMAT)
+
+    def stargazers(self, repo, page, per_page, with_time):
+        start = (page - 1) * per_page
+        end = min(start + per_page, repo['stargazers_count'])
+        result = []
+        for index in range(start, end):
+            user = {'login': f'stargazer{index}', 'id': index, 'type': 'User'}
+            result.append({'starred_at': self.starred_at(repo, index), 'user': user} if with_time else user)
+        return result, repo['name']
+
+    def readme(self, login):
+        lines = [f'# Hi, I am {login}', '']
+        for i in range(30):
+            lines.append(f'- Project **{i}**: `code` and [link](https://example.com/{i})')
+        lines += ['', '```python', 'def hello():', '    return "world"', '```', '']
+        return '\n'.join(lines), 'user'
+
+    # GraphQL 查询：按 GITHUB_GRAPHQL_QUERY 的结构和 @include 变量返回用户资料、贡献日历和一页仓库
+    def graphql(self, variables):
+        login = variables.get('login')
+        per_page = variables.get('repoCount') or 50
+        lang_count = variables.get('langCount') or 20
+        offset = int(variables.get('cursor') or 0)
+        user = {'login': login}
+        if variables.get('withRepos'):
+            ordered = sorted(self.repos, key=lambda r: r['pushed_at'], reverse=True)
+            nodes = []
+            for repo in ordered[offset:offset + per_page]:
+                node = {
+                    'name': repo['name'],
+                    'description': repo['description'],
+                    'url': f"https://github.com/{login}/{repo['name']}",
+                    'stargazerCount': repo['stargazers_count'],
+                    'pushedAt': repo['pushed_at'],
+                    'createdAt': repo['created_at'],
+                    'isFork': repo['fork'],
+                    'primaryLanguage': {'name': repo['language']}
+                }
+                if variables.get('withLanguages'):
+                    languages = sorted(self.languages(repo)[0].items(), key=lambda item: -item[1])[:lang_count]
+                    node['languages'] = {'edges': [{'size': size, 'node': {'name': name}} for name, size in languages]}
+                if variables.get('withStars'):
+                    node['stargazers'] = {'edges': [{'starredAt': self.starred_at(repo, index)}
+                                                    for index in range(min(100, repo['stargazers_count']))]}
+                nodes.append(node)
+            end = offset + len(nodes)
+            user['repositories'] = {'pageInfo': {'hasNextPage': end < len(ordered), 'endCursor': str(end)}, 'nodes': nodes}
+        if variables.get('withProfile'):
+            user.update(name=f'Bench {login}', avatarUrl=f'https://avatars.githubusercontent.com/{login}')
+        if variables.get('withCalendar'):
+            weeks = []
+            for week in range(53):
+                days = []
+                for day in range(7):
+                    date = self.now - timedelta(days=(52 - week) * 7 + (6 - day))
+                    days.append({'date': date.strftime('%Y-%m-%d'), 'contributionCount': (week * 7 + day) % 5})
+                weeks.append({'contributionDays': days})
+            user['contributionsCollection'] = {'contributionCalendar': {'weeks': weeks}}
+        return {'data': {'user': user}}
+
+
+# 上游调用统计：按接口类别记录调用次数、状态码和响应体字节数
+class UpstreamStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.not_modified = 0
+            self.errors = 0
+            self.bytes = 0
+            self.families = {}
+
+    def record(self, family, status, size):
+        with self._lock:
+            self.calls += 1
+            self.bytes += size
+            if status == 304:
+                self.not_modified += 1
+            elif status >= 400:
+                self.errors += 1
+            self.families[family] = self.families.get(family, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {'calls': self.calls, 'not_modified': self.not_modified, 'errors': self.errors,
+                    'bytes': self.bytes, 'families': dict(self.families)}
+
+
+# fail_when(family, request) 返回 True 时该请求固定返回 error_status，用于检查指定页失败的情形
+def make_fixture_adapter(fixture, stats, latency=0.0, jitter=0.0, error_rate=0.0, error_status=502, seed=0,
+                         fail_when=None):
+    import requests
+    from requests.adapters import BaseAdapter
+    from requests.structures import CaseInsensitiveDict
+
+    # 挂载到 app 共享会话上的传输层：按 URL 路由到 GitHubFixture，模拟延迟和错误，支持条件请求
+    class FixtureAdapter(BaseAdapter):
+        def __init__(self):
+            super().__init__()
+            self._rng = random.Random(seed)
+            self._rng_lock = threading.Lock()
+
+        def route(self, request):
+            parsed = urlparse(request.url)
+            query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+            page = int(query.get('page', 1))
+            per_page = min(int(query.get('per_page', 30)), 100)
+            parts = [p for p in parsed.path.split('/') if p]
+
+            if parsed.netloc == 'raw.githubusercontent.com':
+                # /{login}/{login}/{branch}/README.md，只有 main 分支存在
+                if len(parts) == 4 and parts[2] == 'main':
+                    return 'readme', fixture.readme(parts[0])
+                return 'readme', None
+            if parts == ['graphql']:
+                return 'graphql', (fixture.graphql(json.loads(request.body or b'{}').get('variables') or {}), None)
+            if len(parts) == 2 and parts[0] == 'users':
+                return 'user', fixture.user(parts[1])
+            if len(parts) == 3 and parts[0] == 'users' and parts[2] == 'repos':
+                return 'repos', fixture.user_repos(parts[1], page, per_page)
+            if len(parts) == 3 and parts[0] == 'users' and parts[2] == 'events':
+                return 'events', fixture.events(parts[1], page, per_page)
+            if len(parts) == 4 and parts[0] == 'repos' and parts[2] in fixture.repos_by_name:
+                repo = fixture.repos_by_name[parts[2]]
+                if parts[3] == 'commits':
+                    return 'commits', fixture.commits(parts[1], repo, per_page, query.get('since'))
+                if parts[3] == 'languages':
+                    return 'languages', fixture.languages(repo)
+                if parts[3] == 'stargazers':
+                    with_time = 'star+json' in request.headers.get('Accept', '')
+                    return 'stargazers', fixture.stargazers(repo, page, per_page, with_time)
+            return 'other', None
+
+        def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+            with self._rng_lock:
+                delay = max(latency + self._rng.uniform(-jitter, jitter), 0)
+                failed = self._rng.random() < error_rate
+            if delay:
+                time.sleep(delay)
+
+            family, result = self.route(request)
+            failed = failed or bool(fail_when and fail_when(family, request))
+            headers = CaseInsensitiveDict({
+                'Content-Type': 'application/json; charset=utf-8',
+                'X-RateLimit-Limit': '5000',
+                'X-RateLimit-Remaining': '4999',
+                'X-RateLimit-Reset': str(int(time.time()) + 3600),
+                'X-RateLimit-Resource': 'graphql' if family == 'graphql' else 'core'
+            })
+            if failed:
+                status, body = error_status, json.dumps({'message': 'injected error'}).encode('utf-8')
+            elif result is None:
+                status, body = 404, json.dumps({'message': 'Not Found'}).encode('utf-8')
+            else:
+                payload, resource = result
+                if isinstance(payload, str):
+                    body = payload.encode('utf-8')
+                    headers['Content-Type'] = 'text/plain; charset=utf-8'
+                else:
+                    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+                status = 200
+                if resource is not None:
+                    # ETag 由响应体决定，资源未变化时条件请求得到 304
+                    etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                    headers['ETag'] = etag
+                    if etag in request.headers.get('If-None-Match', ''):
+                        status, body = 304, b''
+                if family in ('repos', 'stargazers') and status == 200:
+                    headers['Link'] = self.link_header(request.url, family, result)
+
+            stats.record(family, status, len(body))
+
+            response = requests.Response()
+            response.status_code = status
+            response.reason = 'OK' if status < 400 else 'Error'
+            response.headers = headers
+            response._content = body
+            response.encoding = 'utf-8'
+            response.url = request.url
+            response.request = request
+            return response
+
+        # 分页接口的 Link 头，与 GitHub 的格式一致
+        def link_header(self, url, family, result):
+            parsed = urlparse(url)
+            query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+            page = int(query.get('page', 1))
+            per_page = min(int(query.get('per_page', 30)), 100)
+            parts = [p for p in parsed.path.split('/') if p]
+            total = len(fixture.repos) if family == 'repos' else fixture.repos_by_name[parts[2]]['stargazers_count']
+            last = max((total + per_page - 1) // per_page, 1)
+            base = f'{parsed.scheme}://{parsed.netloc}{parsed.path}'
+
+            def page_url(number):
+                params = dict(query, page=number)
+                return base + '?' + '&'.join(f'{k}={v}' for k, v in params.items())
+
+            links = []
+            if page < last:
+                links.append(f'<{page_url(page + 1)}>; rel="next"')
+                links.append(f'<{page_url(last)}>; rel="last"')
+            if page > 1:
+                links.append(f'<{page_url(1)}>; rel="first"')
+                links.append(f'<{page_url(page - 1)}>; rel="prev"')
+            return ', '.join(links)
+
+        def close(self):
+            pass
+
+    return FixtureAdapter()
+
+
+# 在 app 模块内部计时：替换模块级函数，按是否在主线程把耗时分别累加到 timings，
+# 后台线程中的调用（过期后的后台刷新、背景图片变体等）在线程内计时，不受何时开始等待的影响
+class CallTimer:
+    def __init__(self, app_module, names):
+        self.lock = threading.Lock()
+        self.timings = {}
+        for name in names:
+            setattr(app_module, name, self.wrap(name, getattr(app_module, name)))
+
+    def wrap(self, name, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                where = 'main' if threading.current_thread() is threading.main_thread() else 'background'
+                with self.lock:
+                    key = (name, where)
+                    self.timings[key] = self.timings.get(key, 0.0) + elapsed
+        return timed
+
+    def reset(self):
+        with self.lock:
+            self.timings.clear()
+
+    def total(self, name, where=None):
+        with self.lock:
+            return sum(v for (n, w), v in self.timings.items() if n == name and where in (None, w))
+
+
+# 等待后台刷新线程结束（首页在缓存缺失或过期时会在后台重建数据）
+def wait_for_background(app_module, timeout=300):
+    start = time.perf_counter()
+    while app_module._cache['refreshing'] and time.perf_counter() - start < timeout:
+        time.sleep(0.005)
+
+
+# 把部分过期场景需要的缓存项调旧：短 TTL 的分段和整页数据
+def age_cache_entries(app_module, username):
+    for name in STALE_SECTIONS:
+        key = f'section:{username}:{name}'
+        entry = app_module.cache_backend.get(key)
+        if entry:
+            entry = dict(entry, time=entry['time'] - app_module.SECTION_TTLS[name] - 1)
+            app_module.cache_backend.set(key, entry, ttl=app_module.CACHE_MAX_STALENESS)
+    entry = app_module.cache_backend.get('github_info')
+    if entry and isinstance(entry.get('cache_time'), (int, float)):
+        entry = dict(entry, cache_time=entry['cache_time'] - app_module.CACHE_TTL - 1)
+        app_module.cache_backend.set('github_info', entry, ttl=app_module.CACHE_MAX_STALENESS)
+
+
+# 子进程：导入 app、挂载替身，依次运行 cold / warm / stale 并输出一行 JSON
+def run_worker(spec):
+    log = sys.stderr if spec['verbose'] else open(os.devnull, 'w')
+    with contextlib.redirect_stdout(log):
+        import_start = time.perf_counter()
+        sys.path.insert(0, BASE_DIR)
+        import app as app_module
+        import_time = time.perf_counter() - import_start
+
+        fixture = GitHubFixture(spec['repos'], spec['stars'], seed=spec['seed'])
+        stats = UpstreamStats()
+        adapter = make_fixture_adapter(fixture, stats, latency=spec['latency'], jitter=spec['jitter'],
+                                       error_rate=spec['error_rate'], error_status=spec['error_status'],
+                                       seed=spec['seed'])
+        session = app_module.get_github_session()
+        session.mount('https://api.github.com', adapter)
+        session.mount('https://raw.githubusercontent.com', adapter)
+        username = app_module.get_github_username()
+        target = spec['target']
+
+        # 直接测量的函数需要排序后的仓库列表；准备阶段的调用不计入统计
+        repos = None
+        if target in ('activity', 'star_history', 'languages'):
+            profile = app_module.fetch_github_profile(username)
+            repos = profile['repos'] if profile else []
+        client = app_module.app.test_client() if target == 'index' else None
+        # 数据重建（同步或后台）和资源清单构建的耗时单独统计；资源清单在冷启动时计入首个请求的耗时
+        timer = CallTimer(app_module, ('_rebuild_github_info', 'build_asset_manifest'))
+
+        def call():
+            if target == 'user_info':
+                return app_module.get_github_user_info()
+            if target == 'activity':
+                return app_module.get_github_activity_data(username, repos)
+            if target == 'star_history':
+                return app_module.get_star_history(username, repos)
+            if target == 'languages':
+                return app_module.get_language_distribution(username, repos)
+            response = client.get('/', headers={'Accept-Encoding': 'gzip, br'})
+            response.get_data()
+            return response.status_code
+
+        results = []
+        for scenario in spec['scenarios']:
+            if scenario == 'stale':
+                fixture.mutate(spec['stale_fraction'])
+                age_cache_entries(app_module, username)
+            stats.reset()
+            timer.reset()
+            start = time.perf_counter()
+            call()
+            wall = time.perf_counter() - start
+            if target == 'index':
+                wait_for_background(app_module)
+            results.append(dict(stats.snapshot(), scenario=scenario, wall_ms=wall * 1000,
+                                background_ms=timer.total('_rebuild_github_info', 'background') * 1000,
+                                asset_ms=timer.total('build_asset_manifest') * 1000))
+
+    print(json.dumps({'repos': spec['repos'], 'stars': spec['stars'], 'target': target,
+                      'import_ms': import_time * 1000, 'results': results}))
+
+
+# 子进程中导入 app 并输出耗时和已加载的按需模块；不预热缓存，与 Vercel 冷启动一致
+IMPORT_PROBE = '''
+import sys, time, json, io, contextlib
+sys.path.insert(0, {base!r})
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{'import_ms': elapsed, 'loaded': [m for m in {lazy!r} if m in sys.modules]}}))
+'''
+
+# 冷启动检查：多次测量取最短时间，超出预算或启动时导入了按需模块时返回错误信息列表
+def check_import(budget_ms, runs=IMPORT_RUNS):
+    env = dict(os.environ, CACHE_WARMUP='0')
+    code = IMPORT_PROBE.format(base=BASE_DIR, lazy=LAZY_MODULES)
+    samples = []
+    loaded = set()
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, '-c', code], env=env, cwd=BASE_DIR,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            return [f'import app 失败:\n{proc.stderr}']
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        samples.append(result['import_ms'])
+        loaded.update(result['loaded'])
+
+    best = min(samples)
+    print(f"import app: 最短 {best:.1f}ms，中位数 {sorted(samples)[len(samples) // 2]:.1f}ms（预算 {budget_ms:.0f}ms）")
+    problems = []
+    if best > budget_ms:
+        problems.append(f'import app 耗时 {best:.1f}ms 超出预算 {budget_ms:.0f}ms')
+    if loaded:
+        problems.append(f"启动时导入了按需模块: {', '.join(sorted(loaded))}")
+    return problems
+
+
+# 本地 Redis 替身：只实现 app 用到的 AUTH / SELECT / GET / SET [PX|EX] / DEL / PING，数据保存在内存中
+class RedisStandIn:
+    def __init__(self, password=None):
+        import socketserver
+        self.password = password
+        self.data = {}
+        self.connections = set()
+        self._lock = threading.Lock()
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                with stand_in._lock:
+                    stand_in.connections.add(self.connection)
+                authed = stand_in.password is None
+                try:
+                    while True:
+                        args = stand_in.read_command(self.rfile)
+                        if args is None:
+                            return
+                        reply, authed = stand_in.execute(args, authed)
+                        self.wfile.write(reply)
+                except (OSError, ValueError):
+                    return
+                finally:
+                    with stand_in._lock:
+                        stand_in.connections.discard(self.connection)
+
+        socketserver.ThreadingTCPServer.daemon_threads = True
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        auth = f':{self.password}@' if self.password else ''
+        return f'redis://{auth}127.0.0.1:{self.server.server_address[1]}/1'
+
+    @staticmethod
+    def read_command(rfile):
+        line = rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            raise ValueError(f'不支持的请求: {line!r}')
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(rfile.readline()[1:-2])
+            args.append(rfile.read(length + 2)[:-2])
+        return args
+
+    def execute(self, args, authed):
+        command = args[0].decode().upper()
+        if command == 'AUTH':
+            if self.password is not None and args[-1].decode() == self.password:
+                return b'+OK\r\n', True
+            return b'-WRONGPASS invalid password\r\n', False
+        if not authed:
+            return b'-NOAUTH Authentication required.\r\n', False
+        if command in ('SELECT', 'PING'):
+            return b'+OK\r\n', True
+        with self._lock:
+            if command == 'SET':
+                expires = None
+                if len(args) == 5:
+                    scale = 1000.0 if args[3].upper() == b'PX' else 1.0
+                    expires = time.time() + int(args[4]) / scale
+                self.data[args[1]] = (args[2], expires)
+                return b'+OK\r\n', True
+            if command == 'GET':
+                value, expires = self.data.get(args[1], (None, None))
+                if value is None or (expires and expires < time.time()):
+                    self.data.pop(args[1], None)
+                    return b'$-1\r\n', True
+                return b'$%d\r\n%s\r\n' % (len(value), value), True
+            if command == 'DEL':
+                removed = sum(1 for key in args[1:] if self.data.pop(key, None) is not None)
+                return b':%d\r\n' % removed, True
+        return f'-ERR unknown command {command}\r\n'.encode(), True
+
+    # 模拟服务端重启：断开所有客户端连接
+    def drop_connections(self):
+        import socket
+        with self._lock:
+            connections = list(self.connections)
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self):
+        self.drop_connections()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# 在当前进程中导入 app 供检查使用：使用临时缓存目录和占位 Token，不预热缓存，不输出日志
+def import_app_quietly():
+    os.environ.update({
+        'HOMEPAGE_CACHE_DIR': tempfile.mkdtemp(prefix='homepage-check-'),
+        'CACHE_WARMUP': '0',
+        'GH_TOKEN': 'bench-token',
+        'GITHUB_TOKEN': ''
+    })
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        sys.path.insert(0, BASE_DIR)
+        import app as app_module
+    return app_module
+
+
+# 检查结果的输出和收集
+class CheckReport:
+    def __init__(self, name):
+        self.name = name
+        self.problems = []
+
+    def expect(self, label, condition):
+        print(f"  {'ok  ' if condition else 'FAIL'} {label}")
+        if not condition:
+            self.problems.append(f'{self.name}: {label}')
+
+
+# Redis 缓存后端检查：读写删除、TTL 过期、断线重连、认证失败后恢复，返回错误信息列表
+def check_redis():
+    app_module = import_app_quietly()
+    stand_in = RedisStandIn(password='bench-secret')
+    report = CheckReport('Redis 缓存后端')
+    expect = report.expect
+
+    try:
+        backend = app_module.RedisCacheBackend(stand_in.url)
+        value = {'login': 'bench', 'repos': [{'name': 'repo', 'stars': 1}], 'text': '中文'}
+        backend.set('key', value)
+        expect('set 后 get 返回相同的值', backend.get('key') == value)
+        backend.delete('key')
+        expect('delete 后 get 返回 None', backend.get('key') is None)
+        expect('不存在的键返回 None', backend.get('missing') is None)
+
+        backend.set('short', value, ttl=0.2)
+        expect('TTL 内可以读取', backend.get('short') == value)
+        time.sleep(0.3)
+        expect('TTL 过期后返回 None', backend.get('short') is None)
+
+        backend.set('key', value)
+        stand_in.drop_connections()
+        time.sleep(0.05)
+        expect('服务端断开连接后自动重连', backend.get('key') == value)
+
+        wrong = app_module.RedisCacheBackend(stand_in.url.replace('bench-secret', 'wrong'))
+        try:
+            wrong.get('key')
+            failed = False
+        except RuntimeError:
+            failed = True
+        expect('密码错误时报错并关闭连接', failed and wrong._sock is None)
+        wrong.password = stand_in.password
+        expect('密码修正后重新认证成功', wrong.get('key') == value)
+    finally:
+        stand_in.close()
+    return report.problems
+
+
+# GraphQL 数据源检查：与 REST 数据源在同一个替身上的结果一致（活动数据口径不同，只检查形状），
+# 热缓存时不再发起查询，只有部分分段过期时只为这些分段查询一次
+def check_graphql(repo_count=150, star_count=5000):
+    app_module = import_app_quietly()
+    fixture = GitHubFixture(repo_count, star_count)
+    stats = UpstreamStats()
+    adapter = make_fixture_adapter(fixture, stats)
+    session = app_module.get_github_session()
+    session.mount('https://api.github.com', adapter)
+    session.mount('https://raw.githubusercontent.com', adapter)
+    report = CheckReport('GraphQL 数据源')
+    expect = report.expect
+
+    def fetch(source):
+        app_module.GITHUB_DATA_SOURCE = source
+        stats.reset()
+        with contextlib.redirect_stdout(open(os.devnull, 'w')):
+            info = app_module.get_github_user_info()
+        return info, stats.snapshot()
+
+    rest, _ = fetch('rest')
+    # 换一个空的缓存后端，让 GraphQL 从冷启动开始
+    app_module.cache_backend = app_module.create_cache_backend('memory')
+    graphql, cold = fetch('graphql')
+
+    expect(f"冷启动只发起分页查询（{cold['families'].get('graphql', 0)} 次 GraphQL）",
+           cold['families'].get('graphql', 0) == -(-app_module.GRAPHQL_MAX_REPOS // app_module.GRAPHQL_REPOS_PER_PAGE))
+    expect('结果完整（没有使用默认值）', not graphql['degraded'])
+    for field in ('name', 'total_repos', 'total_stars', 'recent_repos', 'tech_stack', 'language_distribution',
+                  'star_history', 'readme_content'):
+        expect(f'{field} 与 REST 数据源一致', graphql[field] == rest[field])
+    expect(f"仓库数与 REST 一样最多 {app_module.GRAPHQL_MAX_REPOS} 个",
+           graphql['total_repos'] == min(repo_count, app_module.GRAPHQL_MAX_REPOS))
+    activity = graphql['activity_data']
+    expect('活动数据为 12 个月的计数', len(activity) == 12 and all(isinstance(n, int) for n in activity))
+
+    _, warm = fetch('graphql')
+    expect(f"热缓存不发起请求（{warm['calls']} 次）", warm['calls'] == 0)
+
+    username = app_module.get_github_username()
+    key = f'section:{username}:activity_data'
+    entry = app_module.cache_backend.get(key)
+    app_module.cache_backend.set(key, dict(entry, time=entry['time'] - app_module.SECTION_TTLS['activity_data'] - 1))
+    _, partial = fetch('graphql')
+    expect(f"只有活动数据过期时只查询一次且不取仓库（{partial['calls']} 次，{format_bytes(partial['bytes'])}）",
+           partial['families'] == {'graphql': 1} and partial['bytes'] < cold['bytes'] / 4)
+    return report.problems
+
+
+# 增量活动统计检查：首次统计时事件接口某一页失败，不能缓存缺少这些事件的结果，
+# 水位线也不能越过失败的页；恢复后的下一次刷新与从未失败时的结果一致
+def check_activity(repo_count=10, star_count=100):
+    app_module = import_app_quietly()
+    fixture = GitHubFixture(repo_count, star_count)
+    stats = UpstreamStats()
+    failing_pages = set()
+
+    def fail_when(family, request):
+        query = parse_qs(urlparse(request.url).query)
+        return family == 'events' and int(query.get('page', ['1'])[-1]) in failing_pages
+
+    # 403 不会被重试，检查不必等待退避
+    adapter = make_fixture_adapter(fixture, stats, error_status=403, fail_when=fail_when)
+    session = app_module.get_github_session()
+    session.mount('https://api.github.com', adapter)
+    session.mount('https://raw.githubusercontent.com', adapter)
+    report = CheckReport('增量活动统计')
+    expect = report.expect
+
+    username = app_module.get_github_username()
+    state_key = f'activity_state:{username}'
+    quiet = lambda: contextlib.redirect_stdout(open(os.devnull, 'w'))
+    with quiet():
+        repos = app_module.fetch_github_profile(username)['repos']
+        expected = app_module.get_github_activity_data(username, repos)
+
+    for page in (1, 2):
+        app_module.cache_backend = app_module.create_cache_backend('memory')
+        failing_pages.clear()
+        failing_pages.add(page)
+        with quiet():
+            failed = app_module.get_github_activity_data(username, repos)
+        state = app_module.cache_backend.get(state_key) or {}
+        watermark = (state.get('events') or {}).get('watermark')
+        failing_pages.clear()
+        with quiet():
+            recovered = app_module.get_github_activity_data(username, repos)
+        expect(f'首次统计时第 {page} 页事件失败，返回 None 而不是缺少事件的结果', failed is None)
+        expect(f'第 {page} 页失败后水位线没有前移', watermark is None)
+        expect(f'第 {page} 页恢复后的下一次刷新统计到全部事件', recovered == expected)
+    expect('基准结果包含活动', bool(expected) and any(expected))
+    return report.problems
+
+
+def parse_profiles(text):
+    profiles = []
+    for item in text.split(','):
+        repos, _, stars = item.strip().partition(':')
+        profiles.append((int(repos), int(stars or 0)))
+    return profiles
+
+
+def run_profile(args, repos, stars, target):
+    spec = {
+        'repos': repos, 'stars': stars, 'target': target, 'seed': args.seed,
+        'scenarios': list(SCENARIOS), 'stale_fraction': args.stale_fraction,
+        'latency': args.latency / 1000.0, 'jitter': args.jitter / 1000.0,
+        'error_rate': args.error_rate, 'error_status': args.error_status, 'verbose': args.verbose
+    }
+    cache_dir = tempfile.mkdtemp(prefix='homepage-bench-')
+    env = dict(os.environ)
+    env.update({
+        'HOMEPAGE_CACHE_DIR': cache_dir,
+        'CACHE_WARMUP': '0',
+        # 所有请求都由替身应答，使用占位 Token 以免读取真实凭据（GraphQL 模式也需要 Token）
+        'GH_TOKEN': 'bench-token',
+        'GITHUB_TOKEN': ''
+    })
+    try:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', json.dumps(spec)],
+                              env=env, cwd=BASE_DIR, stdout=subprocess.PIPE, stderr=None if args.verbose else subprocess.PIPE,
+                              text=True)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f'{target} ({repos} repos, {stars} stars) 运行失败:\n{proc.stderr}')
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f'{size:.0f}{unit}' if unit == 'B' else f'{size:.1f}{unit}'
+        size /= 1024.0
+
+
+def print_report(runs):
+    header = f"{'repos':>6} {'stars':>7} {'target':<13} {'scenario':<6} {'wall ms':>9} {'bg ms':>8} " \
+             f"{'asset ms':>9} {'calls':>6} {'304':>5} {'err':>4} {'bytes':>9}"
+    print(header)
+    print('-' * len(header))
+    for run in runs:
+        for result in run['results']:
+            background = f"{result['background_ms']:.1f}" if result['background_ms'] >= 0.05 else '-'
+            assets = f"{result.get('asset_ms', 0):.1f}" if result.get('asset_ms', 0) >= 0.05 else '-'
+            print(f"{run['repos']:>6} {run['stars']:>7} {run['target']:<13} {result['scenario']:<6} "
+                  f"{result['wall_ms']:>9.1f} {background:>8} {assets:>9} {result['calls']:>6} {result['not_modified']:>5} "
+                  f"{result['errors']:>4} {format_bytes(result['bytes']):>9}")
+
+
+# 与基线对比：上游调用次数或字节数增加，或耗时超出容差时视为回归
+def compare_baseline(runs, baseline, tolerance, min_delta_ms):
+    previous = {}
+    for run in baseline:
+        for result in run['results']:
+            previous[(run['repos'], run['stars'], run['target'], result['scenario'])] = result
+
+    regressions = []
+    for run in runs:
+        for result in run['results']:
+            key = (run['repos'], run['stars'], run['target'], result['scenario'])
+            old = previous.get(key)
+            if not old:
+                continue
+            label = f"{key[2]} {key[3]} ({key[0]} repos, {key[1]} stars)"
+            if result['calls'] > old['calls']:
+                regressions.append(f"{label}: 上游调用 {old['calls']} -> {result['calls']}")
+            if result['bytes'] > old['bytes']:
+                regressions.append(f"{label}: 传输字节 {old['bytes']} -> {result['bytes']}")
+            for field in ('wall_ms', 'background_ms', 'asset_ms'):
+                if field not in old:
+                    continue
+                if result[field] > old[field] * (1 + tolerance) and result[field] - old[field] > min_delta_ms:
+                    regressions.append(f"{label}: {field} {old[field]:.1f} -> {result[field]:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='个人主页 GitHub 数据路径的离线基准测试')
+    parser.add_argument('--profiles', default=DEFAULT_PROFILES,
+                        help=f'仓库数:总star数，逗号分隔（默认 {DEFAULT_PROFILES}）')
+    parser.add_argument('--targets', default=','.join(TARGETS), help='测量目标，逗号分隔: ' + ','.join(TARGETS))
+    parser.add_argument('--latency', type=float, default=0.0, help='每个上游请求的延迟（毫秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='延迟抖动（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='注入错误的请求比例（0-1）')
+    parser.add_argument('--error-status', type=int, default=502, help='注入错误的状态码')
+    parser.add_argument('--stale-fraction', type=float, default=0.1, help='部分过期场景中发生变化的仓库比例')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='把结果写入 JSON 文件')
+    parser.add_argument('--baseline', help='与之前保存的 JSON 结果对比，出现回归时退出码为 1')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='耗时回归容差（比例）')
+    parser.add_argument('--min-delta', type=float, default=5.0, help='小于该毫秒数的耗时变化不视为回归')
+    parser.add_argument('--check-import', action='store_true', help='只检查 import app 的耗时预算和按需导入的模块')
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET_MS,
+                        help=f'import app 的耗时预算（毫秒，默认 {IMPORT_BUDGET_MS:.0f}，可用 IMPORT_BUDGET_MS 设置）')
+    parser.add_argument('--check-redis', action='store_true', help='只用本地 Redis 替身检查 Redis 缓存后端')
+    parser.add_argument('--check-graphql', action='store_true', help='只检查 GraphQL 数据源与 REST 数据源的结果是否一致')
+    parser.add_argument('--check-activity', action='store_true', help='只检查事件分页失败时增量活动统计的恢复')
+    parser.add_argument('--verbose', action='store_true', help='输出 app 日志到 stderr')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(json.loads(args.worker))
+        return 0
+
+    if args.check_redis or args.check_graphql or args.check_activity:
+        if args.check_redis:
+            problems = check_redis()
+        elif args.check_graphql:
+            problems = check_graphql()
+        else:
+            problems = check_activity()
+        for line in problems:
+            print(line)
+        return 1 if problems else 0
+
+    # 冷启动预算检查在每次运行时都执行，失败时退出码为 1
+    problems = check_import(args.import_budget)
+    for line in problems:
+        print(f'  {line}')
+    if args.check_import:
+        return 1 if problems else 0
+    print()
+
+    targets = [t.strip() for t in args.targets.split(',') if t.strip()]
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"未知的测量目标: {', '.join(unknown)}")
+
+    runs = []
+    for repos, stars in parse_profiles(args.profiles):
+        for target in targets:
+            runs.append(run_profile(args, repos, stars, target))
+    print_report(runs)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(runs, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_baseline(runs, json.load(f), args.tolerance, args.min_delta)
+        if regressions:
+            print('\n发现回归:')
+            for line in regressions:
+                print(f'  {line}')
+            return 1
+        print('\n与基线相比没有回归')
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,446 @@
+"""精简版 Tailwind 样式表构建器：扫描模板中出现的类名，只生成用到的工具类。
+
+由 app.py 在首次需要样式表时按需导入，关闭 TAILWIND_BUILD 时不会加载。
+"""
+import os
+import re
+
+TAILWIND_SCREENS = [('sm', 640), ('md', 768), ('lg', 1024), ('xl', 1280), ('2xl', 1536)]
+# 响应式变体名 -> 排序序号（无响应式变体为 0）
+TAILWIND_SCREEN_INDEX = {screen: index for index, (screen, _) in enumerate(TAILWIND_SCREENS, 1)}
+TAILWIND_FONT_SANS = "Inter, system-ui, sans-serif"
+TAILWIND_FONT_MONO = 'ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace'
+TAILWIND_PALETTE = {
+    'gray': ['#f9fafb', '#f3f4f6', '#e5e7eb', '#d1d5db', '#9ca3af', '#6b7280', '#4b5563', '#374151', '#1f2937', '#111827', '#030712'],
+    'red': ['#fef2f2', '#fee2e2', '#fecaca', '#fca5a5', '#f87171', '#ef4444', '#dc2626', '#b91c1c', '#991b1b', '#7f1d1d', '#450a0a'],
+    'orange': ['#fff7ed', '#ffedd5', '#fed7aa', '#fdba74', '#fb923c', '#f97316', '#ea580c', '#c2410c', '#9a3412', '#7c2d12', '#431407'],
+    'yellow': ['#fefce8', '#fef9c3', '#fef08a', '#fde047', '#facc15', '#eab308', '#ca8a04', '#a16207', '#854d0e', '#713f12', '#422006'],
+    'green': ['#f0fdf4', '#dcfce7', '#bbf7d0', '#86efac', '#4ade80', '#22c55e', '#16a34a', '#15803d', '#166534', '#14532d', '#052e16'],
+    'blue': ['#eff6ff', '#dbeafe', '#bfdbfe', '#93c5fd', '#60a5fa', '#3b82f6', '#2563eb', '#1d4ed8', '#1e40af', '#1e3a8a', '#172554'],
+    'purple': ['#faf5ff', '#f3e8ff', '#e9d5ff', '#d8b4fe', '#c084fc', '#a855f7', '#9333ea', '#7e22ce', '#6b21a8', '#581c87', '#3b0764'],
+}
+TAILWIND_SHADES = ['50', '100', '200', '300', '400', '500', '600', '700', '800', '900', '950']
+TAILWIND_FONT_SIZES = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'),
+    '6xl': ('3.75rem', '1'), '7xl': ('4.5rem', '1'), '8xl': ('6rem', '1'), '9xl': ('8rem', '1')
+}
+TAILWIND_FONT_WEIGHTS = {
+    'thin': 100, 'extralight': 200, 'light': 300, 'normal': 400, 'medium': 500,
+    'semibold': 600, 'bold': 700, 'extrabold': 800, 'black': 900
+}
+TAILWIND_LEADING = {'none': '1', 'tight': '1.25', 'snug': '1.375', 'normal': '1.5', 'relaxed': '1.625', 'loose': '2'}
+TAILWIND_RADIUS = {'none': '0px', 'sm': '0.125rem', '': '0.25rem', 'md': '0.375rem', 'lg': '0.5rem',
+                   'xl': '0.75rem', '2xl': '1rem', '3xl': '1.5rem', 'full': '9999px'}
+TAILWIND_SHADOWS = {
+    'sm': '0 1px 2px 0 rgb(0 0 0 / 0.05)',
+    '': '0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+    'md': '0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+    'lg': '0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+    'xl': '0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+    '2xl': '0 25px 50px -12px rgb(0 0 0 / 0.25)',
+    'inner': 'inset 0 2px 4px 0 rgb(0 0 0 / 0.05)',
+    'none': '0 0 #0000'
+}
+TAILWIND_MAX_WIDTHS = {
+    'none': 'none', 'xs': '20rem', 'sm': '24rem', 'md': '28rem', 'lg': '32rem', 'xl': '36rem',
+    '2xl': '42rem', '3xl': '48rem', '4xl': '56rem', '5xl': '64rem', '6xl': '72rem', '7xl': '80rem',
+    'full': '100%', 'min': 'min-content', 'max': 'max-content', 'fit': 'fit-content', 'prose': '65ch'
+}
+TAILWIND_BLUR = {'none': '0', 'sm': '4px', '': '8px', 'md': '12px', 'lg': '16px', 'xl': '24px', '2xl': '40px', '3xl': '64px'}
+TAILWIND_TRANSITIONS = {
+    '': 'color, background-color, border-color, text-decoration-color, fill, stroke, opacity, box-shadow, transform, filter, backdrop-filter',
+    'all': 'all',
+    'colors': 'color, background-color, border-color, text-decoration-color, fill, stroke',
+    'opacity': 'opacity',
+    'shadow': 'box-shadow',
+    'transform': 'transform'
+}
+TAILWIND_ANIMATIONS = {
+    'spin': ('spin 1s linear infinite', '@keyframes spin{to{transform:rotate(360deg)}}'),
+    'ping': ('ping 1s cubic-bezier(0, 0, 0.2, 1) infinite', '@keyframes ping{75%,100%{transform:scale(2);opacity:0}}'),
+    'pulse': ('pulse 2s cubic-bezier(0.4, 0, 0.6, 1) infinite', '@keyframes pulse{50%{opacity:.5}}'),
+    'bounce': ('bounce 1s infinite', '@keyframes bounce{0%,100%{transform:translateY(-25%);animation-timing-function:cubic-bezier(0.8,0,1,1)}50%{transform:none;animation-timing-function:cubic-bezier(0,0,0.2,1)}}'),
+    # 模板 tailwind.config 中扩展的动画
+    'float': ('float 3s ease-in-out infinite', '@keyframes float{0%,100%{transform:translateY(0)}50%{transform:translateY(-10px)}}'),
+    'pulse-slow': ('pulse 4s cubic-bezier(0.4, 0, 0.6, 1) infinite', '@keyframes pulse{50%{opacity:.5}}')
+}
+TAILWIND_DIRECTIONS = {'t': 'to top', 'tr': 'to top right', 'r': 'to right', 'br': 'to bottom right',
+                       'b': 'to bottom', 'bl': 'to bottom left', 'l': 'to left', 'tl': 'to top left'}
+# 变体：伪类追加在选择器末尾，dark 使用 class 策略；排序权重与 Tailwind 一致（伪类 < dark < 响应式）
+TAILWIND_PSEUDO_VARIANTS = {'first': (1, ':first-child'), 'last': (2, ':last-child'), 'hover': (4, ':hover'),
+                            'focus': (8, ':focus'), 'active': (16, ':active')}
+TAILWIND_DARK_WEIGHT = 64
+# 简化自 Tailwind v3 的 Preflight 基础样式（MIT License）
+TAILWIND_PREFLIGHT = """*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+::before,::after{--tw-content:''}
+html,:host{line-height:1.5;-webkit-text-size-adjust:100%;-moz-tab-size:4;tab-size:4;font-family:__FONT_SANS__;-webkit-tap-highlight-color:transparent}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+abbr:where([title]){text-decoration:underline dotted}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+code,kbd,samp,pre{font-family:__FONT_MONO__;font-size:1em}
+small{font-size:80%}
+sub,sup{font-size:75%;line-height:0;position:relative;vertical-align:baseline}
+sub{bottom:-.25em}
+sup{top:-.5em}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-size:100%;font-weight:inherit;line-height:inherit;letter-spacing:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,input:where([type='button']),input:where([type='reset']),input:where([type='submit']){-webkit-appearance:button;background-color:transparent;background-image:none}
+:-moz-focusring{outline:auto}
+:-moz-ui-invalid{box-shadow:none}
+progress{vertical-align:baseline}
+::-webkit-inner-spin-button,::-webkit-outer-spin-button{height:auto}
+[type='search']{-webkit-appearance:textfield;outline-offset:-2px}
+::-webkit-search-decoration{-webkit-appearance:none}
+::-webkit-file-upload-button{-webkit-appearance:button;font:inherit}
+summary{display:list-item}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+dialog{padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+""".replace('__FONT_SANS__', TAILWIND_FONT_SANS).replace('__FONT_MONO__', TAILWIND_FONT_MONO)
+
+# 间距刻度：1 = 0.25rem，支持 0.5 步进、px
+def _tw_spacing(value):
+    if value == 'px':
+        return '1px'
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    if number < 0 or (number * 2) != int(number * 2):
+        return None
+    return '0px' if number == 0 else f'{number / 4:g}rem'
+
+# 宽高：间距刻度、分数以及 auto / full / screen 等关键字
+def _tw_size(value, axis):
+    keywords = {'auto': 'auto', 'full': '100%', 'screen': '100vw' if axis == 'w' else '100vh',
+                'min': 'min-content', 'max': 'max-content', 'fit': 'fit-content'}
+    if value in keywords:
+        return keywords[value]
+    if '/' in value:
+        numerator, _, denominator = value.partition('/')
+        if numerator.isdigit() and denominator.isdigit() and int(denominator):
+            return f'{int(numerator) / int(denominator) * 100:g}%'
+        return None
+    return _tw_spacing(value)
+
+# 颜色：调色板、主题色及 /<透明度> 修饰
+def _tw_color(value, theme_colors):
+    value, _, alpha = value.partition('/')
+    keywords = {'transparent': 'transparent', 'current': 'currentColor', 'inherit': 'inherit'}
+    if value in keywords:
+        return None if alpha else keywords[value]
+    color = {'white': '#ffffff', 'black': '#000000'}.get(value) or theme_colors.get(value)
+    if color is None:
+        family, _, shade = value.rpartition('-')
+        if family in TAILWIND_PALETTE and shade in TAILWIND_SHADES:
+            color = TAILWIND_PALETTE[family][TAILWIND_SHADES.index(shade)]
+    if color is None:
+        return None
+    if not alpha:
+        return color
+    if not alpha.isdigit() or int(alpha) > 100:
+        return None
+    opacity = f'{int(alpha) / 100:g}'
+    hex_value = color.lstrip('#')
+    if color.startswith('#') and len(hex_value) in (3, 6):
+        if len(hex_value) == 3:
+            hex_value = ''.join(c * 2 for c in hex_value)
+        r, g, b = (int(hex_value[i:i + 2], 16) for i in (0, 2, 4))
+        return f'rgb({r} {g} {b} / {opacity})'
+    return f'color-mix(in srgb, {color} {int(alpha)}%, transparent)'
+
+def _tw_inset(m):
+    value = _tw_size(m[3], 'w')
+    if value is None or (m[1] and value in ('auto', '100%')):
+        return None
+    value = f'-{value}' if m[1] and value != '0px' else value
+    sides = {'inset': ['top', 'right', 'bottom', 'left'], 'inset-x': ['left', 'right'],
+             'inset-y': ['top', 'bottom']}.get(m[2], [m[2]])
+    return '; '.join(f'{side}: {value}' for side in sides)
+
+def _tw_box(prop, sides_map):
+    def handler(m):
+        value = 'auto' if prop == 'margin' and m[3] == 'auto' else _tw_spacing(m[3])
+        if value is None or (m[1] and (prop != 'margin' or value == 'auto')):
+            return None
+        value = f'-{value}' if m[1] and value != '0px' else value
+        return '; '.join(f'{prop}{side}: {value}' for side in sides_map[m[2]])
+    return handler
+
+TAILWIND_SIDES = {'': [''], 'x': ['-left', '-right'], 'y': ['-top', '-bottom'],
+                  't': ['-top'], 'r': ['-right'], 'b': ['-bottom'], 'l': ['-left']}
+
+def _tw_space(m):
+    value = _tw_spacing(m[2])
+    if value is None:
+        return None
+    prop = 'margin-left' if m[1] == 'x' else 'margin-top'
+    return [(' > :not([hidden]) ~ :not([hidden])', f'{prop}: {value}')]
+
+def _tw_border_width(m):
+    width = {'': '1px', '0': '0px', '2': '2px', '4': '4px', '8': '8px'}.get(m[2] or '')
+    if width is None:
+        return None
+    return '; '.join(f'border{side}-width: {width}' for side in TAILWIND_SIDES[m[1]])
+
+def _tw_text(m, theme_colors):
+    if m[1] in TAILWIND_FONT_SIZES:
+        size, line_height = TAILWIND_FONT_SIZES[m[1]]
+        return f'font-size: {size}; line-height: {line_height}'
+    color = _tw_color(m[1], theme_colors)
+    return f'color: {color}' if color else None
+
+def _tw_gradient_stop(m, theme_colors):
+    color = _tw_color(m[2], theme_colors)
+    if color is None:
+        return None
+    if m[1] == 'from':
+        return (f'--tw-gradient-from: {color}; --tw-gradient-to: transparent; '
+                '--tw-gradient-stops: var(--tw-gradient-from), var(--tw-gradient-to)')
+    if m[1] == 'via':
+        return (f'--tw-gradient-to: transparent; '
+                f'--tw-gradient-stops: var(--tw-gradient-from), {color}, var(--tw-gradient-to)')
+    return f'--tw-gradient-to: {color}'
+
+def _tw_color_rule(prop):
+    return lambda m, theme_colors: (lambda color: f'{prop}: {color}' if color else None)(_tw_color(m[1], theme_colors))
+
+# 工具类按 Tailwind 核心插件的顺序排列，生成的 CSS 也按此顺序输出，保证同优先级规则的覆盖关系一致
+# 每一项是 {类名: 声明} 或 (正则, 处理函数)；处理函数返回声明字符串、[(选择器后缀, 声明)] 或 None
+TAILWIND_UTILITIES = [
+    {'sr-only': 'position: absolute; width: 1px; height: 1px; padding: 0; margin: -1px; overflow: hidden; '
+                'clip: rect(0, 0, 0, 0); white-space: nowrap; border-width: 0',
+     'not-sr-only': 'position: static; width: auto; height: auto; padding: 0; margin: 0; overflow: visible; '
+                    'clip: auto; white-space: normal'},
+    {'pointer-events-none': 'pointer-events: none', 'pointer-events-auto': 'pointer-events: auto'},
+    {'visible': 'visibility: visible', 'invisible': 'visibility: hidden'},
+    {p: f'position: {p}' for p in ('static', 'fixed', 'absolute', 'relative', 'sticky')},
+    (r'(-?)(inset|inset-x|inset-y|top|right|bottom|left)-(.+)', _tw_inset),
+    (r'z-(0|10|20|30|40|50|auto)', lambda m: f'z-index: {m[1]}'),
+    (r'col-span-(\d+|full)', lambda m: 'grid-column: 1 / -1' if m[1] == 'full'
+        else f'grid-column: span {m[1]} / span {m[1]}'),
+    (r'(-?)m()-(.+)', _tw_box('margin', TAILWIND_SIDES)),
+    (r'(-?)m([xy])-(.+)', _tw_box('margin', TAILWIND_SIDES)),
+    (r'(-?)m([trbl])-(.+)', _tw_box('margin', TAILWIND_SIDES)),
+    {d: f'display: {d}' for d in ('block', 'inline-block', 'inline', 'flex', 'inline-flex', 'table',
+                                  'table-row', 'table-cell', 'grid', 'inline-grid', 'contents', 'list-item')},
+    {'hidden': 'display: none'},
+    (r'h-(.+)', lambda m: (lambda v: f'height: {v}' if v else None)(_tw_size(m[1], 'h'))),
+    (r'min-h-(0|full|screen)', lambda m: f"min-height: {_tw_size(m[1], 'h')}"),
+    (r'w-(.+)', lambda m: (lambda v: f'width: {v}' if v else None)(_tw_size(m[1], 'w'))),
+    (r'min-w-(0|full|min|max|fit)', lambda m: f"min-width: {_tw_size(m[1], 'w')}"),
+    (r'max-w-(.+)', lambda m: f'max-width: {TAILWIND_MAX_WIDTHS[m[1]]}' if m[1] in TAILWIND_MAX_WIDTHS else None),
+    {'flex-1': 'flex: 1 1 0%', 'flex-auto': 'flex: 1 1 auto', 'flex-initial': 'flex: 0 1 auto', 'flex-none': 'flex: none'},
+    {'shrink-0': 'flex-shrink: 0', 'flex-shrink-0': 'flex-shrink: 0'},
+    {'grow': 'flex-grow: 1', 'flex-grow': 'flex-grow: 1'},
+    {'border-collapse': 'border-collapse: collapse', 'border-separate': 'border-collapse: separate'},
+    (r'animate-(.+)', lambda m: f'animation: {TAILWIND_ANIMATIONS[m[1]][0]}' if m[1] in TAILWIND_ANIMATIONS else None),
+    {'cursor-pointer': 'cursor: pointer', 'cursor-default': 'cursor: default'},
+    {'select-none': 'user-select: none'},
+    {'list-inside': 'list-style-position: inside', 'list-outside': 'list-style-position: outside'},
+    {'list-none': 'list-style-type: none', 'list-disc': 'list-style-type: disc', 'list-decimal': 'list-style-type: decimal'},
+    (r'grid-cols-(\d+)', lambda m: f'grid-template-columns: repeat({m[1]}, minmax(0, 1fr))'),
+    {'flex-row': 'flex-direction: row', 'flex-row-reverse': 'flex-direction: row-reverse',
+     'flex-col': 'flex-direction: column', 'flex-col-reverse': 'flex-direction: column-reverse'},
+    {'flex-wrap': 'flex-wrap: wrap', 'flex-nowrap': 'flex-wrap: nowrap'},
+    {f'items-{k}': f'align-items: {v}' for k, v in (('start', 'flex-start'), ('end', 'flex-end'),
+                                                     ('center', 'center'), ('baseline', 'baseline'), ('stretch', 'stretch'))},
+    {f'justify-{k}': f'justify-content: {v}' for k, v in (('start', 'flex-start'), ('end', 'flex-end'), ('center', 'center'),
+                                                          ('between', 'space-between'), ('around', 'space-around'), ('evenly', 'space-evenly'))},
+    (r'gap-()(.+)', lambda m: (lambda v: f'gap: {v}' if v else None)(_tw_spacing(m[2]))),
+    (r'gap-([xy])-(.+)', lambda m: (lambda v: f"{'column' if m[1] == 'x' else 'row'}-gap: {v}" if v else None)(_tw_spacing(m[2]))),
+    (r'space-([xy])-(.+)', _tw_space),
+    {f'overflow-{axis}{v}': f'overflow{"-" + axis[0] if axis else ""}: {v}'
+     for axis in ('', 'x-', 'y-') for v in ('auto', 'hidden', 'visible', 'scroll')},
+    {'truncate': 'overflow: hidden; text-overflow: ellipsis; white-space: nowrap'},
+    {'whitespace-nowrap': 'white-space: nowrap', 'whitespace-normal': 'white-space: normal', 'whitespace-pre': 'white-space: pre'},
+    {'break-words': 'overflow-wrap: break-word', 'break-all': 'word-break: break-all'},
+    (r'rounded(?:-(.+))?', lambda m: f'border-radius: {TAILWIND_RADIUS[m[1] or ""]}' if (m[1] or '') in TAILWIND_RADIUS else None),
+    (r'border()(?:-(\d+))?', _tw_border_width),
+    (r'border-([xy])(?:-(\d+))?', _tw_border_width),
+    (r'border-([trbl])(?:-(\d+))?', _tw_border_width),
+    {'border-solid': 'border-style: solid', 'border-dashed': 'border-style: dashed', 'border-none': 'border-style: none'},
+    (r'border-(.+)', _tw_color_rule('border-color')),
+    (r'bg-(.+)', _tw_color_rule('background-color')),
+    (r'bg-gradient-to-(t|tr|r|br|b|bl|l|tl)',
+        lambda m: f'background-image: linear-gradient({TAILWIND_DIRECTIONS[m[1]]}, var(--tw-gradient-stops))'),
+    (r'(from|via|to)-(.+)', _tw_gradient_stop),
+    {'bg-clip-text': '-webkit-background-clip: text; background-clip: text',
+     'bg-clip-padding': 'background-clip: padding-box', 'bg-clip-border': 'background-clip: border-box'},
+    {'object-cover': 'object-fit: cover', 'object-contain': 'object-fit: contain'},
+    (r'p()-(.+)', lambda m: _tw_box('padding', TAILWIND_SIDES)(('', '', m[1], m[2]))),
+    (r'p([xy])-(.+)', lambda m: _tw_box('padding', TAILWIND_SIDES)(('', '', m[1], m[2]))),
+    (r'p([trbl])-(.+)', lambda m: _tw_box('padding', TAILWIND_SIDES)(('', '', m[1], m[2]))),
+    {f'text-{a}': f'text-align: {a}' for a in ('left', 'center', 'right', 'justify')},
+    {'font-sans': f'font-family: {TAILWIND_FONT_SANS}', 'font-mono': f'font-family: {TAILWIND_FONT_MONO}',
+     'font-serif': 'font-family: ui-serif, Georgia, Cambria, "Times New Roman", Times, serif'},
+    (r'text-(xs|sm|base|lg|[2-9]?xl)', _tw_text),
+    {f'font-{k}': f'font-weight: {v}' for k, v in TAILWIND_FONT_WEIGHTS.items()},
+    {'italic': 'font-style: italic', 'not-italic': 'font-style: normal'},
+    (r'leading-(.+)', lambda m: f'line-height: {TAILWIND_LEADING[m[1]]}' if m[1] in TAILWIND_LEADING else None),
+    (r'text-(.+)', _tw_text),
+    {'underline': 'text-decoration-line: underline', 'line-through': 'text-decoration-line: line-through',
+     'no-underline': 'text-decoration-line: none'},
+    (r'opacity-(\d+)', lambda m: f'opacity: {int(m[1]) / 100:g}' if int(m[1]) <= 100 else None),
+    (r'shadow(?:-(.+))?', lambda m: f'box-shadow: {TAILWIND_SHADOWS[m[1] or ""]}' if (m[1] or '') in TAILWIND_SHADOWS else None),
+    (r'blur(?:-(.+))?', lambda m: f'filter: blur({TAILWIND_BLUR[m[1] or ""]})' if (m[1] or '') in TAILWIND_BLUR else None),
+    (r'backdrop-blur(?:-(.+))?',
+        lambda m: (lambda v: f'-webkit-backdrop-filter: blur({v}); backdrop-filter: blur({v})')(TAILWIND_BLUR[m[1] or ''])
+        if (m[1] or '') in TAILWIND_BLUR else None),
+    (r'transition(?:-(.+))?',
+        lambda m: f'transition-property: {TAILWIND_TRANSITIONS[m[1] or ""]}; '
+                  'transition-timing-function: cubic-bezier(0.4, 0, 0.2, 1); transition-duration: 150ms'
+        if (m[1] or '') in TAILWIND_TRANSITIONS else None),
+    (r'duration-(\d+)', lambda m: f'transition-duration: {m[1]}ms'),
+    (r'ease-(linear|in|out|in-out)', lambda m: 'transition-timing-function: ' + {
+        'linear': 'linear', 'in': 'cubic-bezier(0.4, 0, 1, 1)', 'out': 'cubic-bezier(0, 0, 0.2, 1)',
+        'in-out': 'cubic-bezier(0.4, 0, 0.2, 1)'}[m[1]]),
+]
+# 预编译正则；需要主题色的处理函数带第二个参数
+TAILWIND_UTILITIES = [
+    item if isinstance(item, dict) else (re.compile(item[0]), item[1], item[1].__code__.co_argcount > 1)
+    for item in TAILWIND_UTILITIES
+]
+
+# 工具类名的首段（如 bg-white 的 bg、-mt-2 的 mt），用来判断一个无法解析的类名是否像工具类
+TAILWIND_UTILITY_ROOTS = set()
+for item in TAILWIND_UTILITIES:
+    if isinstance(item, dict):
+        TAILWIND_UTILITY_ROOTS.update(name.split('-')[0] for name in item)
+        continue
+    match = re.match(r'(?:\(-\?\))?(?:\(([a-z|-]+)\)|([a-z]+))(?:\(\[([a-z]+)\]\))?', item[0].pattern)
+    for root in (match[1] or match[2]).split('|'):
+        root = root.split('-')[0]
+        TAILWIND_UTILITY_ROOTS.update(root + side for side in match[3] or [''])
+# 还没有实现的常见 Tailwind 工具类，出现时同样需要提示
+TAILWIND_UTILITY_ROOTS.update(('ring', 'outline', 'divide', 'tracking', 'scale', 'rotate', 'translate', 'skew',
+                               'origin', 'order', 'basis', 'aspect', 'self', 'place', 'content', 'row', 'decoration',
+                               'indent', 'align', 'fill', 'stroke', 'delay', 'brightness', 'saturate', 'grayscale'))
+
+# 解析单个工具类（不含变体），返回 (顺序, [(选择器后缀, 声明)])，无法识别时返回 None
+def resolve_tailwind_utility(name, theme_colors):
+    for order, item in enumerate(TAILWIND_UTILITIES):
+        if isinstance(item, dict):
+            if name in item:
+                return order, [('', item[name])]
+            continue
+        pattern, handler, needs_theme = item
+        match = pattern.fullmatch(name)
+        if not match:
+            continue
+        result = handler(match, theme_colors) if needs_theme else handler(match)
+        if result:
+            return order, [('', result)] if isinstance(result, str) else result
+    return None
+
+# 解析带变体的类名（如 dark:hover:bg-gray-600、lg:col-span-2），返回排序键和 CSS 规则
+def resolve_tailwind_class(candidate, theme_colors):
+    *variants, name = candidate.split(':')
+    screen, weight, pseudo, dark = None, 0, '', False
+    for variant in variants:
+        if variant in TAILWIND_SCREEN_INDEX and screen is None:
+            screen = variant
+        elif variant == 'dark' and not dark:
+            dark = True
+            weight += TAILWIND_DARK_WEIGHT
+        elif variant in TAILWIND_PSEUDO_VARIANTS:
+            bit, suffix = TAILWIND_PSEUDO_VARIANTS[variant]
+            weight += bit
+            pseudo += suffix
+        else:
+            return None
+    resolved = resolve_tailwind_utility(name, theme_colors)
+    if resolved is None:
+        return None
+    order, rules = resolved
+    selector = '.' + re.sub(r'([^a-zA-Z0-9_-])', r'\\\1', candidate) + pseudo
+    if dark:
+        selector = '.dark ' + selector
+    css = ''.join(f'{selector}{suffix}{{{declarations}}}\n' for suffix, declarations in rules)
+    screen_index = TAILWIND_SCREEN_INDEX.get(screen, 0)
+    return (screen_index, weight, order, candidate), screen, css
+
+# 候选词是否像工具类：变体都能识别，且类名首段是已知工具类的首段（排除 JS 标识符、模板里的普通单词等）
+def looks_like_tailwind_class(candidate):
+    *variants, name = candidate.split(':')
+    if any(v not in TAILWIND_SCREEN_INDEX and v != 'dark' and v not in TAILWIND_PSEUDO_VARIANTS for v in variants):
+        return False
+    if not re.fullmatch(r'-?[a-z][a-z0-9]*(-[a-z0-9./]+)+', name):
+        return False
+    return name.lstrip('-').split('-')[0] in TAILWIND_UTILITY_ROOTS
+
+# 生成精简的 Tailwind 样式表：Preflight、container、用到的工具类、模板中的自定义工具类，最后是变体
+def build_tailwind_css(content_dir, theme, custom_css=''):
+    sources = []
+    for root, _, files in os.walk(content_dir):
+        for file in sorted(files):
+            with open(os.path.join(root, file), 'r', encoding='utf-8') as f:
+                sources.append(f.read())
+    candidates = set()
+    for text in sources:
+        candidates.update(re.findall(r'[^\s"\'`<>=;,(){}]+', text))
+    
+    theme_colors = {
+        'primary': theme.get('primary_color'),
+        'primary-dark': theme.get('dark_primary_color'),
+        'secondary': theme.get('secondary_color'),
+        'secondary-dark': theme.get('dark_secondary_color')
+    }
+    theme_colors = {k: v for k, v in theme_colors.items() if v}
+    
+    rules = []
+    animations = set()
+    unresolved = []
+    for candidate in candidates:
+        resolved = resolve_tailwind_class(candidate, theme_colors)
+        if resolved:
+            rules.append(resolved)
+            name = candidate.rsplit(':', 1)[-1]
+            if name.startswith('animate-'):
+                animations.add(name[len('animate-'):])
+        elif looks_like_tailwind_class(candidate):
+            unresolved.append(candidate)
+    rules.sort(key=lambda rule: rule[0])
+    
+    # 只提示 class 属性 / className 中实际使用、又不是模板自己定义的类（如 .bg-image），
+    # 其余候选词多是脚本和文案里的普通单词
+    used = set()
+    for text in sources:
+        for _, value in re.findall(r'class(?:Name)?\s*=\s*(["\'])(.*?)\1', text, re.S):
+            used.update(re.findall(r'[^\s"\'`<>=;,(){}]+', value))
+    defined = set(re.findall(r'\.(-?[a-zA-Z_][\w-]*)', ''.join(sources) + custom_css))
+    unresolved = sorted(c for c in unresolved if c in used and c not in defined)
+    if unresolved:
+        print(f"警告：Tailwind 样式表中缺少 {len(unresolved)} 个像工具类的类名，需要在 tailwind_css.py 中补充: "
+              f"{' '.join(unresolved)}")
+    
+    parts = [TAILWIND_PREFLIGHT]
+    if 'container' in candidates:
+        parts.append('.container{width:100%}\n')
+        parts.extend(f'@media (min-width: {width}px){{.container{{max-width:{width}px}}}}\n'
+                     for _, width in TAILWIND_SCREENS)
+    parts.extend(css for (screen_index, weight, _, _), _, css in rules if not screen_index and not weight)
+    if custom_css:
+        parts.append(custom_css.strip() + '\n')
+    parts.extend(css for (screen_index, weight, _, _), _, css in rules if not screen_index and weight)
+    for screen, width in TAILWIND_SCREENS:
+        screen_css = ''.join(css for _, rule_screen, css in rules if rule_screen == screen)
+        if screen_css:
+            parts.append(f'@media (min-width: {width}px){{\n{screen_css}}}\n')
+    parts.extend(sorted({TAILWIND_ANIMATIONS[name][1] + '\n' for name in animations if name in TAILWIND_ANIMATIONS}))
+    return ''.join(parts)